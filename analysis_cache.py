@@ -0,0 +1,251 @@
+# analysis_cache.py
+"""
+LittleDuck Analysis Cache
+-------------------------
+Persistent, content-addressed cache of analysis results. An entry is keyed by the SHA-256 of
+the source bytes together with ANALYZER_VERSION, a fingerprint of the grammar and of every
+module whose behaviour shapes the results, so editing any of them invalidates the whole cache
+implicitly. Each entry stores the lexical and syntax diagnostics, the semantic errors and the
+serialized SymbolTable as JSON; a hit lets Compilation skip the ANTLR lexer, parser and the
+SemanticAnalyzer entirely.
+
+The cache directory is capped in bytes. Hits refresh an entry's modification time, and when
+the cap is exceeded the least recently used entries are evicted first.
+
+Usage:
+  python analysis_cache.py stats [--dir DIR]
+  python analysis_cache.py invalidate [<file> ...] [--dir DIR]
+
+  invalidate without files clears the whole cache; with files it drops the entries for their
+  current contents.
+"""
+import sys
+import os
+import argparse
+import hashlib
+import json
+import tempfile
+
+from symbol_table import SymbolTable
+
+DEFAULT_CACHE_DIR = '.littleduck_cache'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Bump when the layout of an entry changes
+CACHE_FORMAT_VERSION = 1
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Files whose contents determine the analysis results; gen/ is derived from the grammar
+_VERSIONED_FILES = ('LittleDuck.g4', 'ast_builder.py', 'ast_nodes.py', 'semantic_analyzer.py',
+                    'symbol_table.py', 'semantic_cube.py')
+
+
+def _compute_analyzer_version():
+    digest = hashlib.sha256(f"format={CACHE_FORMAT_VERSION}".encode())
+    for name in _VERSIONED_FILES:
+        digest.update(name.encode())
+        try:
+            with open(os.path.join(_BASE_DIR, name), 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(b'<missing>')
+    return digest.hexdigest()[:16]
+
+
+ANALYZER_VERSION = _compute_analyzer_version()
+
+
+def hash_source(data):
+    """Cache key for the given source bytes under the current ANALYZER_VERSION."""
+    digest = hashlib.sha256(ANALYZER_VERSION.encode())
+    digest.update(b'\0')
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256(ANALYZER_VERSION.encode())
+    digest.update(b'\0')
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CachedAnalysis:
+    """The analysis results stored for one source. symbol_table is None when analysis stopped after syntax errors."""
+    __slots__ = ('lex_errors', 'syntax_errors', 'semantic_errors', 'symbol_table')
+
+    def __init__(self, lex_errors, syntax_errors, semantic_errors, symbol_table):
+        self.lex_errors = lex_errors           # [(line, column, message), ...]
+        self.syntax_errors = syntax_errors     # [(line, column, message), ...]
+        self.semantic_errors = semantic_errors # Formatted messages, as SemanticAnalyzer reports them
+        self.symbol_table = symbol_table
+
+    def to_dict(self):
+        return {
+            'version': ANALYZER_VERSION,
+            'lex_errors': [list(d) for d in self.lex_errors],
+            'syntax_errors': [list(d) for d in self.syntax_errors],
+            'semantic_errors': list(self.semantic_errors) if self.semantic_errors is not None else None,
+            'symbol_table': self.symbol_table.to_dict() if self.symbol_table is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        symbol_table = data['symbol_table']
+        return cls([tuple(d) for d in data['lex_errors']],
+                   [tuple(d) for d in data['syntax_errors']],
+                   data['semantic_errors'],
+                   SymbolTable.from_dict(symbol_table) if symbol_table is not None else None)
+
+
+class AnalysisCache:
+    """
+    One JSON file per entry in directory. Writes go through a temporary file and os.replace,
+    so several processes (e.g. batch_runner workers) can share a directory safely.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None # Bytes on disk; computed on the first store, then tracked incrementally
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def _entries(self):
+        """(path, size, mtime) of every entry on disk."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError: # Evicted by another process meanwhile
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def load(self, key):
+        """Returns the CachedAnalysis stored under key, or None."""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if data.get('version') != ANALYZER_VERSION:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path) # Marks the entry as recently used
+        except OSError:
+            pass
+        self.hits += 1
+        return CachedAnalysis.from_dict(data)
+
+    def store(self, key, analysis):
+        os.makedirs(self.directory, exist_ok=True)
+        payload = json.dumps(analysis.to_dict(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._entry_path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += len(payload)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes. Returns how many were removed."""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._size = total
+        return removed
+
+    def invalidate(self, paths=None):
+        """
+        Drops the entries for the current contents of the given files, or every entry when
+        paths is None. Returns how many entries were removed.
+        """
+        if paths is None:
+            targets = [path for path, _, _ in self._entries()]
+        else:
+            targets = [self._entry_path(hash_file(path)) for path in paths]
+        removed = 0
+        for path in targets:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        self._size = None
+        return removed
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            'directory': self.directory,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'analyzer_version': ANALYZER_VERSION,
+        }
+
+
+def main(argv):
+    arg_parser = argparse.ArgumentParser(description="Inspect or invalidate the LittleDuck analysis cache.")
+    arg_parser.add_argument("--dir", default=DEFAULT_CACHE_DIR, help="Cache directory")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show the number and size of cached entries")
+    invalidate = commands.add_parser("invalidate", help="Drop cached entries")
+    invalidate.add_argument("files", nargs='*', help="Only drop the entries for these files (default: everything)")
+    args = arg_parser.parse_args(argv[1:])
+
+    cache = AnalysisCache(args.dir)
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"Cache directory: {stats['directory']}")
+        print(f"Analyzer version: {stats['analyzer_version']}")
+        print(f"Entries: {stats['entries']}")
+        print(f"Size: {stats['bytes'] / 1024:.1f} KiB of {stats['max_bytes'] / 1024:.0f} KiB")
+    else:
+        missing = [path for path in args.files if not os.path.isfile(path)]
+        if missing:
+            for path in missing:
+                print(f"Error: File '{path}' not found.")
+            return 1
+        removed = cache.invalidate(args.files or None)
+        print(f"Removed {removed} cache entr{'y' if removed == 1 else 'ies'}.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
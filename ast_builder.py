@@ -0,0 +1,248 @@
+# ast_builder.py
+import sys
+
+from antlr4.tree.Tree import TerminalNodeImpl
+from gen.LittleDuckLexer import LittleDuckLexer
+from gen.LittleDuckParser import LittleDuckParser
+from semantic_cube import Type, Operator
+from ast_nodes import (Program, Identifier, VarDecl, Param, Function, Assign, If, While, Call, Print,
+                       BinaryOp, UnaryOp, Paren, Var, IntLiteral, FloatLiteral, StringLiteral)
+
+_intern = sys.intern
+
+# Binary operators keyed by token type
+BINARY_OPERATORS = {
+    LittleDuckLexer.PLUS: Operator.PLUS,
+    LittleDuckLexer.MINUS: Operator.MINUS,
+    LittleDuckLexer.MULT: Operator.MULT,
+    LittleDuckLexer.DIV: Operator.DIV,
+    LittleDuckLexer.LESS: Operator.LESS,
+    LittleDuckLexer.GREATER: Operator.GREATER,
+    LittleDuckLexer.EQUAL: Operator.EQUAL,
+    LittleDuckLexer.NOT_EQUAL: Operator.NOT_EQUAL,
+}
+
+UNARY_OPERATORS = {
+    LittleDuckLexer.PLUS: Operator.UNARY_PLUS,
+    LittleDuckLexer.MINUS: Operator.UNARY_MINUS,
+}
+
+TYPES = {
+    LittleDuckLexer.INTTYPE: Type.INT,
+    LittleDuckLexer.FLTTYPE: Type.FLOAT,
+}
+
+
+class ASTBuilder:
+    """
+    Lowers a ProgramContext into the ast_nodes representation in one pass over the parse tree.
+    Only token fields are read; no subtree text is ever built. The parse tree must come from a
+    parse without syntax errors: error recovery can leave contexts with missing children.
+    """
+
+    def __init__(self):
+        self._statement_lowerers = {
+            LittleDuckParser.AssignmentContext: self.lower_assignment,
+            LittleDuckParser.ConditionContext: self.lower_condition,
+            LittleDuckParser.CycleContext: self.lower_cycle,
+            LittleDuckParser.F_callContext: self.lower_f_call,
+            LittleDuckParser.Print_stmtContext: self.lower_print,
+        }
+
+    def lower_program(self, ctx):
+        name_token = ctx.ID().getSymbol()
+        main_token = ctx.MAIN().getSymbol()
+        vars_ctx = ctx.vars_()
+        funcs_ctx = ctx.funcs()
+        body_ctx = ctx.body()
+        return Program(_intern(name_token.text),
+                       self.lower_vars(vars_ctx) if vars_ctx is not None else [],
+                       self.lower_funcs(funcs_ctx) if funcs_ctx is not None else [],
+                       self.lower_body(body_ctx),
+                       name_token.line, name_token.column,
+                       main_token.line, main_token.column,
+                       (main_token.start, body_ctx.stop.stop))
+
+    # --- Declarations ---
+
+    def lower_vars(self, ctx):
+        # VAR (ID (COMMA ID)* COLON type SEMI)+
+        decls = []
+        names = []
+        for child in ctx.children:
+            if isinstance(child, TerminalNodeImpl):
+                token = child.symbol
+                if token.type == LittleDuckLexer.ID:
+                    names.append(Identifier(_intern(token.text), token.line, token.column))
+            else: # TypeContext ends the item
+                decls.append(VarDecl(names, self.lower_type(child), names[0].line, names[0].column))
+                names = []
+        return decls
+
+    def lower_funcs(self, ctx):
+        # (VOID ID LPAREN param_list? RPAREN LBRACK vars? body RBRACK SEMI)+
+        functions = []
+        name_token = None
+        params = []
+        local_vars = []
+        for child in ctx.children:
+            if isinstance(child, TerminalNodeImpl):
+                token = child.symbol
+                if token.type == LittleDuckLexer.ID:
+                    name_token = token
+                elif token.type == LittleDuckLexer.VOID:
+                    start = token.start
+                elif token.type == LittleDuckLexer.SEMI:
+                    functions.append(Function(_intern(name_token.text), params, local_vars, body,
+                                              name_token.line, name_token.column, (start, token.stop)))
+                    params = []
+                    local_vars = []
+            elif isinstance(child, LittleDuckParser.Param_listContext):
+                params = self.lower_param_list(child)
+            elif isinstance(child, LittleDuckParser.VarsContext):
+                local_vars = self.lower_vars(child)
+            else: # BodyContext
+                body = self.lower_body(child)
+        return functions
+
+    def lower_param_list(self, ctx):
+        # (ID COLON type) (COMMA ID COLON type)*
+        params = []
+        for child in ctx.children:
+            if isinstance(child, TerminalNodeImpl):
+                if child.symbol.type == LittleDuckLexer.ID:
+                    name_token = child.symbol
+            else: # TypeContext
+                params.append(Param(_intern(name_token.text), self.lower_type(child),
+                                    name_token.line, name_token.column))
+        return params
+
+    def lower_type(self, ctx):
+        return TYPES[ctx.children[0].symbol.type]
+
+    # --- Statements ---
+
+    def lower_body(self, ctx):
+        # LBRACE statement* RBRACE; every StatementContext wraps exactly one statement
+        lowerers = self._statement_lowerers
+        statements = []
+        for child in ctx.children:
+            if isinstance(child, LittleDuckParser.StatementContext):
+                statement = child.children[0]
+                statements.append(lowerers[type(statement)](statement))
+        return statements
+
+    def lower_assignment(self, ctx):
+        # ID ASSIGN expression SEMI
+        token = ctx.children[0].symbol
+        return Assign(_intern(token.text), self.lower_expression(ctx.children[2]), token.line, token.column)
+
+    def lower_condition(self, ctx):
+        # IF LPAREN expression RPAREN body (ELSE body)? SEMI
+        children = ctx.children
+        token = children[0].symbol
+        else_body = self.lower_body(children[6]) if len(children) > 6 and children[5].symbol.type == LittleDuckLexer.ELSE else None
+        return If(self.lower_expression(children[2]), self.lower_body(children[4]), else_body,
+                  token.line, token.column)
+
+    def lower_cycle(self, ctx):
+        # WHILE LPAREN expression RPAREN DO body SEMI
+        children = ctx.children
+        token = children[0].symbol
+        return While(self.lower_expression(children[2]), self.lower_body(children[5]), token.line, token.column)
+
+    def lower_f_call(self, ctx):
+        # ID LPAREN expression_multiple? RPAREN SEMI
+        children = ctx.children
+        token = children[0].symbol
+        args = []
+        if isinstance(children[2], LittleDuckParser.Expression_multipleContext):
+            args = [self.lower_expression(child) for child in children[2].children
+                    if isinstance(child, LittleDuckParser.ExpressionContext)]
+        return Call(_intern(token.text), args, token.line, token.column)
+
+    def lower_print(self, ctx):
+        # PRINT LPAREN print_args RPAREN SEMI; print_args: (CTE_STR | expression) (COMMA ...)*
+        token = ctx.children[0].symbol
+        args = []
+        for child in ctx.children[2].children:
+            if isinstance(child, TerminalNodeImpl):
+                arg_token = child.symbol
+                if arg_token.type == LittleDuckLexer.CTE_STR:
+                    args.append(StringLiteral(arg_token.text[1:-1], arg_token.line, arg_token.column))
+            else:
+                args.append(self.lower_expression(child))
+        return Print(args, token.line, token.column)
+
+    # --- Expressions ---
+
+    def lower_expression(self, ctx):
+        # exp ((LESS | GREATER | EQUAL | NOT_EQUAL) exp)?
+        children = ctx.children
+        left = self.lower_exp(children[0])
+        if len(children) == 1:
+            return left
+        op_token = children[1].symbol
+        return BinaryOp(BINARY_OPERATORS[op_token.type], left, self.lower_exp(children[2]),
+                        op_token.line, op_token.column)
+
+    def lower_exp(self, ctx):
+        # term ((PLUS | MINUS) term)*, left associative
+        children = ctx.children
+        node = self.lower_term(children[0])
+        for i in range(1, len(children), 2):
+            op_token = children[i].symbol
+            node = BinaryOp(BINARY_OPERATORS[op_token.type], node, self.lower_term(children[i + 1]),
+                            op_token.line, op_token.column)
+        return node
+
+    def lower_term(self, ctx):
+        # factor ((MULT | DIV) factor)*, left associative
+        children = ctx.children
+        node = self.lower_factor(children[0])
+        for i in range(1, len(children), 2):
+            op_token = children[i].symbol
+            node = BinaryOp(BINARY_OPERATORS[op_token.type], node, self.lower_factor(children[i + 1]),
+                            op_token.line, op_token.column)
+        return node
+
+    def lower_factor(self, ctx):
+        # (PLUS | MINUS)? (LPAREN expression RPAREN | ID | CTE_INT | CTE_FLOAT)
+        children = ctx.children
+        first = children[0]
+        unary_token = None
+        if isinstance(first, TerminalNodeImpl) and first.symbol.type in UNARY_OPERATORS:
+            unary_token = first.symbol
+            first = children[1]
+
+        token = first.symbol # Every alternative starts with a token: '(', ID or a constant
+        token_type = token.type
+        if token_type == LittleDuckLexer.LPAREN:
+            operand = Paren(self.lower_expression(children[-2]), token.line, token.column)
+        elif token_type == LittleDuckLexer.ID:
+            operand = Var(_intern(token.text), token.line, token.column)
+        elif token_type == LittleDuckLexer.CTE_INT:
+            operand = IntLiteral(int(token.text), token.line, token.column)
+        else:
+            operand = FloatLiteral(float(token.text), token.line, token.column)
+
+        if unary_token is None:
+            return operand
+        return UnaryOp(UNARY_OPERATORS[unary_token.type], operand, unary_token.line, unary_token.column)
+
+
+def lower_program(ctx):
+    """Lowers a ProgramContext from an error-free parse into an ast_nodes.Program."""
+    return ASTBuilder().lower_program(ctx)
+
+
+if __name__ == '__main__':
+    from compilation import Compilation
+
+    input_file = sys.argv[1] if len(sys.argv) > 1 else 'example_program.ld'
+    program = Compilation(input_file).ast
+    print(f"Program {program.name}: {len(program.global_vars)} var declarations, {len(program.functions)} functions")
+    for function in program.functions:
+        print(function)
+    for statement in program.body:
+        print(statement)
@@ -0,0 +1,281 @@
+# ast_nodes.py
+"""
+Compact AST for LittleDuck programs, produced by ast_builder.lower_program from the ANTLR parse
+tree. Every node uses __slots__ and records the line and column of the token diagnostics should
+point at; identifier names are interned. Nodes follow the ANTLR visitor convention: accept(visitor)
+calls visitor.visit<NodeClass>(node).
+"""
+
+
+class Node:
+    __slots__ = ('line', 'column')
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields())
+        return f"{type(self).__name__}({fields})"
+
+    @classmethod
+    def _fields(cls):
+        names = []
+        for klass in reversed(cls.__mro__):
+            names.extend(klass.__dict__.get('__slots__', ()))
+        return names
+
+
+# --- Declarations ---
+
+class Program(Node):
+    """
+    line/column point at the program name; main_line/main_column at the 'main' keyword.
+    main_span is the (start, stop) character range of main, from 'main' to its closing brace.
+    """
+    __slots__ = ('name', 'global_vars', 'functions', 'body', 'main_line', 'main_column', 'main_span')
+
+    def __init__(self, name, global_vars, functions, body, line, column, main_line, main_column, main_span=None):
+        self.name = name
+        self.global_vars = global_vars # [VarDecl]
+        self.functions = functions     # [Function]
+        self.body = body               # [statement] of main
+        self.line = line
+        self.column = column
+        self.main_line = main_line
+        self.main_column = main_column
+        self.main_span = main_span
+
+    def accept(self, visitor):
+        return visitor.visitProgram(self)
+
+
+class Identifier(Node):
+    __slots__ = ('name',)
+
+    def __init__(self, name, line, column):
+        self.name = name
+        self.line = line
+        self.column = column
+
+
+class VarDecl(Node):
+    """One 'a, b, c : type;' item of a var block. Positioned at its first name."""
+    __slots__ = ('names', 'var_type')
+
+    def __init__(self, names, var_type, line, column):
+        self.names = names # [Identifier]
+        self.var_type = var_type
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitVarDecl(self)
+
+
+class Param(Node):
+    __slots__ = ('name', 'param_type')
+
+    def __init__(self, name, param_type, line, column):
+        self.name = name
+        self.param_type = param_type
+        self.line = line
+        self.column = column
+
+
+class Function(Node):
+    """Positioned at the function name. span is the (start, stop) character range from 'void' to the closing ';'."""
+    __slots__ = ('name', 'params', 'local_vars', 'body', 'span')
+
+    def __init__(self, name, params, local_vars, body, line, column, span=None):
+        self.name = name
+        self.params = params         # [Param]
+        self.local_vars = local_vars # [VarDecl]
+        self.body = body             # [statement]
+        self.line = line
+        self.column = column
+        self.span = span
+
+    def accept(self, visitor):
+        return visitor.visitFunction(self)
+
+
+# --- Statements ---
+
+class Assign(Node):
+    """Positioned at the assigned variable. slot is the variable's symbol_table slot, recorded by semantic analysis."""
+    __slots__ = ('name', 'expr', 'slot')
+
+    def __init__(self, name, expr, line, column, slot=None):
+        self.name = name
+        self.expr = expr
+        self.line = line
+        self.column = column
+        self.slot = slot
+
+    def accept(self, visitor):
+        return visitor.visitAssign(self)
+
+
+class If(Node):
+    __slots__ = ('condition', 'then_body', 'else_body')
+
+    def __init__(self, condition, then_body, else_body, line, column):
+        self.condition = condition
+        self.then_body = then_body # [statement]
+        self.else_body = else_body # [statement], or None without an else branch
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitIf(self)
+
+
+class While(Node):
+    __slots__ = ('condition', 'body')
+
+    def __init__(self, condition, body, line, column):
+        self.condition = condition
+        self.body = body # [statement]
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitWhile(self)
+
+
+class Call(Node):
+    """Positioned at the called function's name."""
+    __slots__ = ('name', 'args')
+
+    def __init__(self, name, args, line, column):
+        self.name = name
+        self.args = args # [expression]
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitCall(self)
+
+
+class Print(Node):
+    __slots__ = ('args',)
+
+    def __init__(self, args, line, column):
+        self.args = args # [expression or StringLiteral]
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitPrint(self)
+
+
+# --- Expressions ---
+
+class BinaryOp(Node):
+    """op is a semantic_cube.Operator; positioned at the operator token."""
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right, line, column):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitBinaryOp(self)
+
+
+class UnaryOp(Node):
+    """op is Operator.UNARY_PLUS or Operator.UNARY_MINUS; positioned at the operator token."""
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op, operand, line, column):
+        self.op = op
+        self.operand = operand
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitUnaryOp(self)
+
+
+class Paren(Node):
+    """A parenthesized expression, kept so diagnostics about it point at its '('."""
+    __slots__ = ('expr',)
+
+    def __init__(self, expr, line, column):
+        self.expr = expr
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitParen(self)
+
+
+class Var(Node):
+    """slot is the variable's symbol_table slot, recorded by semantic analysis."""
+    __slots__ = ('name', 'slot')
+
+    def __init__(self, name, line, column, slot=None):
+        self.name = name
+        self.line = line
+        self.column = column
+        self.slot = slot
+
+    def accept(self, visitor):
+        return visitor.visitVar(self)
+
+
+class IntLiteral(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value, line, column):
+        self.value = value
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitIntLiteral(self)
+
+
+class FloatLiteral(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value, line, column):
+        self.value = value
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitFloatLiteral(self)
+
+
+class BoolLiteral(Node):
+    """Never written in source: produced by ConstantFolder for comparisons between literals."""
+    __slots__ = ('value',)
+
+    def __init__(self, value, line, column):
+        self.value = value
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitBoolLiteral(self)
+
+
+class StringLiteral(Node):
+    """Only valid as a print argument. value excludes the quotes."""
+    __slots__ = ('value',)
+
+    def __init__(self, value, line, column):
+        self.value = value
+        self.line = line
+        self.column = column
+
+    def accept(self, visitor):
+        return visitor.visitStringLiteral(self)
+
+
+def expression_start(expr):
+    """(line, column) of the first token of an expression, where a parse-tree context would start."""
+    while isinstance(expr, BinaryOp):
+        expr = expr.left
+    return expr.line, expr.column
@@ -0,0 +1,444 @@
+# async_server.py
+"""
+LittleDuck Async Server
+-----------------------
+asyncio front-end that serves many analyze and execute requests at once. The event loop only
+reads requests, keeps track of them and writes responses; lexing, parsing, semantic analysis,
+code generation and execution run in a bounded pool of worker processes, forked with the
+parser's DFA cache already warm. A huge program occupies one worker while the others keep
+serving small requests: sources of --large-kb or more may hold every worker but one.
+
+Requests and responses are JSON-RPC 2.0, one JSON object per line, over stdin/stdout or a Unix
+socket, as in compile_server.py. Responses are written as each request finishes, so they can
+come out of order. At most --max-pending analyze and execute requests are in flight; beyond
+that the server stops reading, which pushes back on the client through the pipe or socket
+(a cancel sent on a blocked connection waits too; send it on another connection).
+
+Every job has a deadline (its "timeout" param in seconds, else --timeout) and can be cancelled
+with a cancel request. Either way the worker running it is killed and replaced, so a program
+that never ends cannot keep a worker busy.
+
+Methods:
+  analyze   {"text": str} or {"path": str}, optional "timeout"
+            -> {"diagnostics": [{"phase", "line", "column", "message"}], "phases": {phase: ms}}
+  execute   the same params plus optional "optimize": bool
+            -> {"diagnostics", "output", "error", "phases"}; the program only runs, and output
+            and error (a runtime error, or null) are only present, when there are no diagnostics
+  cancel    {"id": request id} -> true if that request was still running
+  stats     {} -> requests by outcome, workers, and count, p50, p95 and max ms of every phase
+  shutdown  {} -> null; running requests are cancelled and the server exits
+
+phases holds the milliseconds spent in each compilation phase, in 'run' (execution), in 'queue'
+(waiting for a free worker) and in 'total' (from the request being read to its response).
+
+Usage:
+  python async_server.py [--socket PATH] [--workers N] [--max-pending N] [--timeout S] [--large-kb KB]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import collections
+import io
+import json
+import multiprocessing
+import time
+
+from batch_runner import BatchCompiler
+from compilation import Compilation
+from compile_server import (CompileServer, RequestError, bind_request, compilation_diagnostics,
+                            error_response, INTERNAL_ERROR, INVALID_PARAMS, PARSE_ERROR)
+from virtual_machine import VirtualMachine, VMRuntimeError
+
+# Server-defined JSON-RPC error codes (the cancellation code is the one LSP uses)
+REQUEST_TIMEOUT = -32001
+REQUEST_CANCELLED = -32800
+
+DEFAULT_TIMEOUT = 30.0      # Seconds a job may take
+DEFAULT_MAX_PENDING = 64    # Analyze and execute requests in flight before reading stops
+DEFAULT_LARGE_KB = 64       # Sources from this size on may not take the last free worker
+LATENCY_SAMPLES = 1024      # Most recent latencies kept per phase for the percentiles
+MAX_LINE = 64 * 1024 * 1024 # Longest request line, i.e. roughly the largest source sent as text
+
+JOB_METHODS = frozenset(['analyze', 'execute'])
+
+# The BatchCompiler of a worker process, created by the server before forking so every worker
+# starts with it already warm
+_worker_compiler = None
+
+
+def _worker_main(connection):
+    global _worker_compiler
+    if _worker_compiler is None: # Started with spawn instead of fork
+        _worker_compiler = BatchCompiler()
+        _worker_compiler.warm_up()
+    while True:
+        job = connection.recv()
+        if job is None:
+            break
+        connection.send(_run_job(_worker_compiler, job))
+
+
+def _run_job(compiler, job):
+    compilation = Compilation(input_file=job['path'], source=job['text'], fast_lexer=True,
+                              parser=compiler.parser, semantic_cube=compiler.semantic_cube,
+                              parse_stats=compiler.parse_stats, optimize=job['optimize'])
+    compilation.analyze()
+    result = {'diagnostics': compilation_diagnostics(compilation)}
+    if job['method'] == 'execute' and not result['diagnostics']:
+        program = compilation.code
+        output = io.StringIO()
+        start = time.perf_counter()
+        try:
+            VirtualMachine(program, output=output).run()
+            result['error'] = None
+        except VMRuntimeError as e:
+            result['error'] = str(e)
+        compilation.timings['run'] = time.perf_counter() - start
+        result['output'] = output.getvalue()
+    result['phases'] = {phase: round(seconds * 1000, 3) for phase, seconds in compilation.timings.items() if seconds}
+    return result
+
+
+class PhaseMetrics:
+    """Latencies per phase in milliseconds: how many were recorded and the most recent samples."""
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.counts = collections.Counter()
+        self.samples = collections.defaultdict(lambda: collections.deque(maxlen=samples))
+
+    def record(self, phases):
+        for phase, ms in phases.items():
+            self.counts[phase] += 1
+            self.samples[phase].append(ms)
+
+    def summary(self):
+        summary = {}
+        for phase, samples in self.samples.items():
+            ordered = sorted(samples)
+            summary[phase] = {'count': self.counts[phase],
+                              'p50': ordered[len(ordered) // 2],
+                              'p95': ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                              'max': ordered[-1]}
+        return summary
+
+
+class Worker:
+    """One worker process and the pipe its jobs and results travel through."""
+
+    def __init__(self, context):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    async def run(self, job):
+        loop = asyncio.get_running_loop()
+        self.connection.send(job)
+        readable = loop.create_future()
+        fd = self.connection.fileno()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fd)
+        return self.connection.recv() # EOFError if the worker died
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def close(self):
+        self.connection.send(None)
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.connection.close()
+
+
+class WorkerPool:
+    """
+    A fixed number of worker processes shared by every request, handed out in request order.
+    A worker whose job is cancelled, times out or crashes is killed and replaced by a new one.
+    """
+
+    def __init__(self, size, context=None):
+        self.context = context if context is not None else multiprocessing.get_context()
+        self.size = size
+        self.idle = asyncio.Queue()
+        self.busy = set()
+        self.large = asyncio.Semaphore(max(1, size - 1))
+        self.restarts = 0
+        for _ in range(size):
+            self.idle.put_nowait(Worker(self.context))
+
+    async def run(self, job, large=False):
+        """The result of job; phases['queue'] is the time spent waiting for a worker."""
+        start = time.perf_counter()
+        if large:
+            async with self.large:
+                return await self._run(job, start)
+        return await self._run(job, start)
+
+    async def _run(self, job, start):
+        worker = await self.idle.get()
+        waited = time.perf_counter() - start
+        self.busy.add(worker)
+        try:
+            result = await worker.run(job)
+        except BaseException: # The worker may be in the middle of the job: replace it
+            self.busy.discard(worker)
+            worker.kill()
+            self.restarts += 1
+            self.idle.put_nowait(Worker(self.context))
+            raise
+        self.busy.discard(worker)
+        self.idle.put_nowait(worker)
+        result['phases']['queue'] = round(waited * 1000, 3)
+        return result
+
+    def close(self):
+        for worker in self.busy:
+            worker.kill()
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+
+class AsyncCompileServer:
+    """
+    Answers JSON-RPC requests concurrently: serve() reads the requests of one stream and runs
+    every analyze and execute request as its own task on the WorkerPool.
+    """
+
+    def __init__(self, workers=None, max_pending=DEFAULT_MAX_PENDING, timeout=DEFAULT_TIMEOUT,
+                 large_bytes=DEFAULT_LARGE_KB * 1024):
+        global _worker_compiler
+        self.workers = workers if workers is not None else max(2, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.large_bytes = large_bytes
+        self.pool = None
+        self.pending = None
+        self.stopping = None
+        self.running = set()  # Tasks of the analyze and execute requests in flight
+        self.by_id = {}       # request id -> its task, for cancel
+        self.metrics = PhaseMetrics()
+        self.outcomes = collections.Counter()
+        self.methods = {'analyze': self.analyze, 'execute': self.execute, 'cancel': self.cancel,
+                        'stats': self.stats, 'shutdown': self.shutdown}
+        if _worker_compiler is None:
+            _worker_compiler = BatchCompiler()
+            _worker_compiler.warm_up()
+
+    def start(self):
+        """Starts the workers; called from inside the event loop, before serving."""
+        self.pool = WorkerPool(self.workers)
+        self.pending = asyncio.Semaphore(self.max_pending)
+        self.stopping = asyncio.Event()
+
+    async def cancel_running(self):
+        tasks = list(self.running)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        for task in self.running:
+            task.cancel()
+        self.pool.close()
+
+    # --- Requests ---
+
+    async def serve(self, reader, respond):
+        """Answers the requests read from one stream, each response passed to respond as a line."""
+        tasks = set()
+        while not self.stopping.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                task = await self.dispatch(line, respond)
+                if task is not None:
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        if self.stopping.is_set():
+            await self.cancel_running()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def dispatch(self, line, respond):
+        """Answers one request line, returning the task answering it for analyze and execute."""
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            respond(json.dumps(error_response(None, PARSE_ERROR, f"Invalid JSON: {e}")))
+            return None
+        if not isinstance(message, dict) or message.get('method') not in JOB_METHODS:
+            await self.answer(message, respond)
+            return None
+
+        await self.pending.acquire() # Backpressure: stop reading while too many jobs are in flight
+        task = asyncio.create_task(self.answer(message, respond))
+        self.running.add(task)
+        request_id = message.get('id')
+        if request_id is not None:
+            self.by_id[request_id] = task
+        task.add_done_callback(lambda task: self._finished(task, message, respond))
+        return task
+
+    def _finished(self, task, message, respond):
+        self.pending.release()
+        self.running.discard(task)
+        request_id = message.get('id')
+        if self.by_id.get(request_id) is task:
+            del self.by_id[request_id]
+        if task.cancelled(): # Cancelled before it started, so handle() never answered it
+            self.outcomes['cancelled'] += 1
+            if 'id' in message:
+                respond(json.dumps(error_response(request_id, REQUEST_CANCELLED, "Request cancelled")))
+
+    async def answer(self, message, respond):
+        response = await self.handle(message)
+        if response is not None:
+            respond(json.dumps(response))
+
+    async def handle(self, message):
+        notification = isinstance(message, dict) and 'id' not in message
+        request_id = message.get('id') if isinstance(message, dict) else None
+        try:
+            method, bound = bind_request(message, self.methods)
+            result = await method(*bound.args, **bound.kwargs)
+        except RequestError as e:
+            response = error_response(request_id, e.code, str(e))
+        except asyncio.CancelledError:
+            self.outcomes['cancelled'] += 1
+            response = error_response(request_id, REQUEST_CANCELLED, "Request cancelled")
+        except Exception as e:
+            self.outcomes['failed'] += 1
+            response = error_response(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        else:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        return None if notification else response
+
+    # --- Methods ---
+
+    async def analyze(self, text=None, path=None, timeout=None):
+        return await self._job('analyze', text, path, timeout, optimize=False)
+
+    async def execute(self, text=None, path=None, optimize=False, timeout=None):
+        return await self._job('execute', text, path, timeout, optimize=bool(optimize))
+
+    async def _job(self, method, text, path, timeout, optimize):
+        start = time.perf_counter()
+        CompileServer._check_source(text, path)
+        timeout = self.timeout if timeout is None else timeout
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise RequestError(INVALID_PARAMS, "timeout must be a positive number of seconds")
+        size = len(text) if text is not None else os.path.getsize(path)
+        job = {'method': method, 'text': text, 'path': path, 'optimize': optimize}
+        try:
+            result = await asyncio.wait_for(self.pool.run(job, large=size >= self.large_bytes), timeout)
+        except asyncio.TimeoutError:
+            self.outcomes['timed out'] += 1
+            raise RequestError(REQUEST_TIMEOUT, f"Request timed out after {timeout} s") from None
+        except EOFError:
+            self.outcomes['failed'] += 1
+            raise RequestError(INTERNAL_ERROR, "The worker process exited during the request") from None
+        result['phases']['total'] = round((time.perf_counter() - start) * 1000, 3)
+        self.metrics.record(result['phases'])
+        self.outcomes['completed'] += 1
+        return result
+
+    async def cancel(self, id):
+        task = self.by_id.get(id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def stats(self):
+        return {'requests': dict(self.outcomes), 'in_flight': len(self.running), 'workers': self.pool.size,
+                'busy_workers': len(self.pool.busy), 'worker_restarts': self.pool.restarts,
+                'phases': self.metrics.summary()}
+
+    async def shutdown(self):
+        self.stopping.set()
+        return None
+
+
+# --- Transports ---
+
+async def serve_stdio(server):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=MAX_LINE)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    stdout = sys.stdout.buffer
+
+    def respond(line):
+        stdout.write(line.encode('utf-8') + b'\n')
+        stdout.flush()
+
+    await server.serve(reader, respond)
+
+
+async def serve_socket(server, path):
+    connections = {}  # writer -> task serving its connection
+
+    async def connection(reader, writer):
+        def respond(line):
+            if not writer.is_closing():
+                writer.write(line.encode('utf-8') + b'\n')
+        connections[writer] = asyncio.current_task()
+        try:
+            await server.serve(reader, respond)
+            if not writer.is_closing():
+                await writer.drain()
+        finally:
+            del connections[writer]
+            writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path) # A stale socket left by a server that did not exit cleanly
+    unix_server = await asyncio.start_unix_server(connection, path=path, limit=MAX_LINE)
+    try:
+        async with unix_server:
+            await server.stopping.wait()
+            await server.cancel_running() # Their clients get the cancellation before the connection closes
+            # Closing the other connections ends their reads, so their handlers return
+            tasks = list(connections.values())
+            for writer in list(connections):
+                writer.close()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        os.unlink(path)
+
+
+async def run_server(server, socket_path=None):
+    server.start()
+    try:
+        if socket_path is not None:
+            await serve_socket(server, socket_path)
+        else:
+            await serve_stdio(server)
+    finally:
+        server.close()
+
+
+def main(argv):
+    arg_parser = argparse.ArgumentParser(description="Concurrent LittleDuck analysis and execution server (JSON-RPC 2.0)")
+    arg_parser.add_argument("--socket", metavar="PATH", help="Listen on a Unix socket instead of stdin/stdout")
+    arg_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU, at least 2)")
+    arg_parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                            help="Analyze and execute requests in flight before the server stops reading")
+    arg_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Default seconds a request may take")
+    arg_parser.add_argument("--large-kb", type=float, default=DEFAULT_LARGE_KB,
+                            help="Sources of this size may not take the last free worker")
+    args = arg_parser.parse_args(argv[1:])
+
+    server = AsyncCompileServer(args.workers, args.max_pending, args.timeout, int(args.large_kb * 1024))
+    asyncio.run(run_server(server, args.socket))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
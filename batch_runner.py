@@ -0,0 +1,260 @@
+# batch_runner.py
+"""
+LittleDuck Batch Runner
+-----------------------
+Runs lexical, syntax and semantic analysis over many files in a single process. The lexer,
+parser and semantic cube are created once and reused, so every file after the first one runs
+with the ANTLR runtime already imported and the parser's ATN/DFA prediction cache warm.
+With --workers the files are spread over a process pool where each worker keeps its own warm
+compiler; results are merged back in input order.
+
+Usage:
+  python batch_runner.py <file|directory|glob> [...] [--ext .ld,.txt] [--errors] [--workers N]
+                         [--cache [DIR]] [--cache-size MB]
+
+Options:
+  --ext     : Comma-separated extensions to pick up when a directory is given (default: .ld,.txt)
+  --errors  : Prints every diagnostic after the summary table
+  --workers : Number of worker processes (default: 1, runs in-process; 0 uses every CPU)
+  --cache   : Reuse results of unchanged files from an on-disk cache (default DIR: .littleduck_cache)
+  --cache-size : Cache size cap in MB before least recently used entries are evicted (default: 64)
+"""
+import sys
+import os
+import argparse
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from gen.LittleDuckLexer import LittleDuckLexer
+from gen.LittleDuckParser import LittleDuckParser
+from semantic_cube import SemanticCube
+from two_stage_parser import ParseStats
+from compilation import Compilation
+from analysis_cache import AnalysisCache, DEFAULT_CACHE_DIR
+# Importing semantic_runner also switches stdout to UTF-8
+from semantic_runner import format_lex_error, format_syntax_error
+
+DEFAULT_EXTENSIONS = ('.ld', '.txt')
+
+# Small program touching every rule of the grammar, parsed once to warm the parser's DFA cache
+WARM_UP_PROGRAM = """program warmup;
+var a, b : int;
+    c : float;
+void f(x : int, y : float) [
+    var t : float;
+    {
+        t = x * y / (2 - -1.5);
+        print("t", t);
+    }
+];
+main {
+    a = 1;
+    b = a + 2;
+    c = 3.5;
+    if (a < b) { f(a, c); } else { print(b); };
+    while (a != 10) do { a = a + 1; };
+}
+end
+"""
+
+
+class FileResult:
+    # Slots keep the result compact when it is pickled back from a worker process
+    __slots__ = ('path', 'lex_errors', 'syntax_errors', 'semantic_errors', 'internal_error',
+                 'll_fallback', 'cached', 'lex_time', 'parse_time', 'semantic_time')
+
+    def __init__(self, path):
+        self.path = path
+        self.lex_errors = []
+        self.syntax_errors = []
+        self.semantic_errors = []
+        self.internal_error = None # Unexpected exception raised while analyzing the file
+        self.ll_fallback = False # The SLL parse bailed out and the file was re-parsed with full LL
+        self.cached = False # Results came from the analysis cache; no ANTLR stage ran
+        self.lex_time = 0.0
+        self.parse_time = 0.0
+        self.semantic_time = 0.0
+
+    @property
+    def total_time(self):
+        return self.lex_time + self.parse_time + self.semantic_time
+
+    @property
+    def error_count(self):
+        return len(self.lex_errors) + len(self.syntax_errors) + len(self.semantic_errors) + (1 if self.internal_error else 0)
+
+    @property
+    def ok(self):
+        return self.error_count == 0
+
+
+class BatchCompiler:
+    """
+    Reuses one lexer, one parser and one semantic cube for every file it compiles.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.semantic_cube = SemanticCube()
+        self.parse_stats = ParseStats()
+        self.lexer = LittleDuckLexer(None)
+        self.parser = LittleDuckParser(None)
+
+    def warm_up(self):
+        """Parses and analyzes WARM_UP_PROGRAM so the first real file finds the DFA cache populated."""
+        warm_up = Compilation(source=WARM_UP_PROGRAM, lexer=self.lexer, parser=self.parser,
+                              semantic_cube=self.semantic_cube, parse_stats=self.parse_stats)
+        self._analyze(warm_up, FileResult("<warm-up>"))
+
+    def compile_file(self, path):
+        result = FileResult(path)
+        try:
+            self._compile(path, result)
+        except Exception as e:
+            result.internal_error = f"{type(e).__name__}: {e}"
+        return result
+
+    def _compile(self, path, result):
+        # The shared lexer and parser are reset by the compilation; the DFA cache stays warm
+        compilation = Compilation(input_file=path, lexer=self.lexer, parser=self.parser,
+                                  semantic_cube=self.semantic_cube, parse_stats=self.parse_stats,
+                                  cache=self.cache)
+        self._analyze(compilation, result)
+
+    def _analyze(self, compilation, result):
+        # Same policy as semantic_runner: semantic analysis only runs on syntactically valid input
+        compilation.analyze()
+        result.cached = compilation.cache_hit
+        result.ll_fallback = not compilation.cache_hit and self.parse_stats.last_used_fallback
+        result.lex_errors = [format_lex_error(d) for d in compilation.lex_errors]
+        result.syntax_errors = [format_syntax_error(d) for d in compilation.syntax_errors]
+        if not compilation.has_syntax_errors:
+            result.semantic_errors = list(compilation.semantic_errors)
+
+        result.lex_time = compilation.timings['lex']
+        result.parse_time = compilation.timings['parse'] + compilation.timings['lower'] # Includes building the AST
+        result.semantic_time = compilation.timings['semantic']
+
+
+# Compiler owned by each worker process of compile_parallel
+_worker_compiler = None
+
+
+def _init_worker(cache_dir=None, cache_bytes=None):
+    global _worker_compiler
+    cache = AnalysisCache(cache_dir, cache_bytes) if cache_dir is not None else None
+    _worker_compiler = BatchCompiler(cache)
+    _worker_compiler.warm_up()
+
+
+def _compile_in_worker(path):
+    return _worker_compiler.compile_file(path)
+
+
+def compile_serial(files, cache=None):
+    compiler = BatchCompiler(cache)
+    return [compiler.compile_file(path) for path in files]
+
+
+def compile_parallel(files, workers, cache=None):
+    """
+    Compiles files on a pool of worker processes. Results come back in the order of files,
+    regardless of which worker finished first.
+    """
+    # Several files per task amortize the inter-process round trip on large corpora
+    chunksize = max(1, len(files) // (workers * 8))
+    # Each worker opens its own handle on the shared cache directory
+    initargs = (cache.directory, cache.max_bytes) if cache is not None else ()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+        return list(executor.map(_compile_in_worker, files, chunksize=chunksize))
+
+
+def collect_files(inputs, extensions=DEFAULT_EXTENSIONS):
+    """
+    Expands files, directories (searched recursively for the given extensions) and glob
+    patterns into a sorted list of unique file paths.
+    """
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                files.extend(os.path.join(root, name) for name in names if name.endswith(tuple(extensions)))
+        elif glob.has_magic(item):
+            files.extend(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+        elif os.path.isfile(item):
+            files.append(item)
+        else:
+            print(f"Warning: '{item}' not found, skipping.")
+    return sorted(set(files))
+
+
+def print_report(results, wall_time, show_errors=False):
+    name_width = max([len(r.path) for r in results] + [4])
+    print(f"{'FILE':<{name_width}} {'LEX':>5} {'SYN':>5} {'SEM':>5} {'LEX ms':>9} {'PARSE ms':>9} {'SEM ms':>9}  STATUS")
+    print("-" * (name_width + 58))
+    for r in results:
+        status = "OK" if r.ok else ("INTERNAL ERROR" if r.internal_error else "FAILED")
+        print(f"{r.path:<{name_width}} {len(r.lex_errors):>5} {len(r.syntax_errors):>5} {len(r.semantic_errors):>5} "
+              f"{r.lex_time * 1000:>9.2f} {r.parse_time * 1000:>9.2f} {r.semantic_time * 1000:>9.2f}  {status}")
+
+    failed = [r for r in results if not r.ok]
+    print("\n--- Summary ---")
+    print(f"Files analyzed: {len(results)}")
+    print(f"Successful: {len(results) - len(failed)}")
+    print(f"Failed: {len(failed)}")
+    print(f"Lexical errors: {sum(len(r.lex_errors) for r in results)}")
+    print(f"Syntax errors: {sum(len(r.syntax_errors) for r in results)}")
+    print(f"Semantic errors: {sum(len(r.semantic_errors) for r in results)}")
+    print(f"LL fallbacks: {sum(1 for r in results if r.ll_fallback)}")
+    print(f"Cache hits: {sum(1 for r in results if r.cached)}")
+    print(f"Wall time: {wall_time:.3f} s")
+    if wall_time > 0:
+        print(f"Throughput: {len(results) / wall_time:.1f} files/s")
+
+    if show_errors and failed:
+        print("\n--- Diagnostics ---")
+        for r in failed:
+            print(f"{r.path}:")
+            for err in r.lex_errors + r.syntax_errors + r.semantic_errors:
+                print(f"  {err}")
+            if r.internal_error:
+                print(f"  Internal error: {r.internal_error}")
+
+
+def main(argv):
+    arg_parser = argparse.ArgumentParser(description="Analyze many LittleDuck files in one process.")
+    arg_parser.add_argument("inputs", nargs='+', help="Files, directories or glob patterns")
+    arg_parser.add_argument("--ext", default=",".join(DEFAULT_EXTENSIONS),
+                            help="Comma-separated extensions to pick up from directories")
+    arg_parser.add_argument("--errors", action="store_true", help="Print every diagnostic after the summary")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="Worker processes (1 runs in-process, 0 uses every CPU)")
+    arg_parser.add_argument("--cache", nargs='?', const=DEFAULT_CACHE_DIR, metavar="DIR",
+                            help="Reuse results of unchanged files from this cache directory")
+    arg_parser.add_argument("--cache-size", type=float, default=64, metavar="MB",
+                            help="Cache size cap before least recently used entries are evicted")
+    args = arg_parser.parse_args(argv[1:])
+
+    extensions = tuple(e.strip() for e in args.ext.split(',') if e.strip())
+    files = collect_files(args.inputs, extensions)
+    if not files:
+        print("No input files found.")
+        return 1
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    cache = AnalysisCache(args.cache, int(args.cache_size * 1024 * 1024)) if args.cache else None
+    start = time.perf_counter()
+    if workers == 1:
+        results = compile_serial(files, cache)
+    else:
+        results = compile_parallel(files, workers, cache)
+    wall_time = time.perf_counter() - start
+
+    print(f"Workers: {workers}\n")
+    print_report(results, wall_time, show_errors=args.errors)
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
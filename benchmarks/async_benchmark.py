@@ -0,0 +1,125 @@
+# async_benchmark.py
+"""
+Benchmark del servidor concurrente (async_server.py). Mide la latencia de peticiones 'analyze'
+pequeñas con el servidor libre y mientras un programa muy grande se analiza al mismo tiempo, y
+la compara con un servidor secuencial (compile_server.py), donde una petición que llega durante
+el análisis grande tiene que esperarlo. También ejecuta un programa que nunca termina con un
+límite de tiempo, para comprobar que se corta, que su trabajador se reemplaza y que el servidor
+sigue respondiendo, y muestra las métricas por fase que acumula el servidor.
+
+Uso:
+  python benchmarks/async_benchmark.py [--large-funcs 2000] [--requests 30] [--workers 2]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from async_server import AsyncCompileServer
+from compile_server import CompileServer
+from program_generator import generate_program
+
+ENDLESS_PROGRAM = "program p; var i: int; main { i = 0; while (i < 1) do { i = i * 1; }; } end"
+
+
+def request(method, **params):
+    return {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def row(name, latencies):
+    print(f"{name:<58} {percentile(latencies, 0.5) * 1000:>9.1f} {percentile(latencies, 0.95) * 1000:>9.1f} "
+          f"{max(latencies) * 1000:>9.1f}")
+
+
+async def small_requests(server, source, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await server.handle(request('analyze', text=source))
+        latencies.append(time.perf_counter() - start)
+        assert 'result' in response, response
+    return latencies
+
+
+async def run(args, small, large):
+    server = AsyncCompileServer(workers=args.workers)
+    server.start()
+    try:
+        await small_requests(server, small, 3) # Primeras peticiones de cada trabajador
+        idle = await small_requests(server, small, args.requests)
+
+        start = time.perf_counter()
+        big = asyncio.create_task(server.handle(request('analyze', text=large, timeout=600)))
+        await asyncio.sleep(0.05) # El programa grande ya ocupa un trabajador
+        busy = await small_requests(server, small, args.requests)
+        overlapped = not big.done()
+        await big
+        large_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = await server.handle(request('execute', text=ENDLESS_PROGRAM, timeout=args.timeout))
+        cut = time.perf_counter() - start
+        after = await small_requests(server, small, 1)
+        stats = await server.stats()
+    finally:
+        server.close()
+    return idle, busy, overlapped, large_time, response, cut, after[0], stats
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del servidor concurrente")
+    arg_parser.add_argument("--large-funcs", type=int, default=2000, help="Funciones del programa grande")
+    arg_parser.add_argument("--small-funcs", type=int, default=5, help="Funciones de cada programa pequeño")
+    arg_parser.add_argument("--requests", type=int, default=30, help="Peticiones pequeñas por escenario")
+    arg_parser.add_argument("--workers", type=int, default=2, help="Procesos trabajadores")
+    arg_parser.add_argument("--timeout", type=float, default=0.5, help="Límite del programa que no termina (s)")
+    args = arg_parser.parse_args()
+
+    small = generate_program(args.small_funcs, 8)
+    large = generate_program(args.large_funcs, 8)
+    print(f"Programa pequeño: {len(small) / 1024:.1f} KB; grande: {len(large) / 1024:.0f} KB; "
+          f"trabajadores: {args.workers}\n")
+
+    idle, busy, overlapped, large_time, response, cut, after, stats = asyncio.run(run(args, small, large))
+
+    # Servidor secuencial: una petición que llega durante el análisis grande espera a que termine
+    sequential = CompileServer()
+    sequential.warm_up()
+    start = time.perf_counter()
+    sequential.analyze(text=large)
+    sequential_large = time.perf_counter() - start
+    start = time.perf_counter()
+    sequential.analyze(text=small)
+    sequential_small = time.perf_counter() - start
+
+    print(f"{'PETICIONES PEQUEÑAS':<58} {'p50 (ms)':>9} {'p95 (ms)':>9} {'máx (ms)':>9}")
+    print("-" * 88)
+    row("async_server, servidor libre", idle)
+    row(f"async_server, con {args.large_funcs} funciones analizándose", busy)
+    print(f"{'compile_server, llegando a mitad / al inicio del grande':<58} "
+          f"{(sequential_large / 2 + sequential_small) * 1000:>9.1f} {'':>9} "
+          f"{(sequential_large + sequential_small) * 1000:>9.1f}")
+    print(f"\nPrograma grande: {large_time:.2f} s con async_server, {sequential_large:.2f} s secuencial; "
+          f"{'las peticiones pequeñas terminaron antes que él' if overlapped else '¡terminó antes que las pequeñas!'}")
+
+    print(f"\nPrograma que no termina con límite de {args.timeout} s: "
+          f"{response['error']['message'] if 'error' in response else '¡terminó!'} "
+          f"(respuesta a los {cut:.2f} s); trabajadores reiniciados: {stats['worker_restarts']}; "
+          f"siguiente petición: {after * 1000:.1f} ms")
+
+    print(f"\n{'FASE':<10} {'PETICIONES':>10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'máx (ms)':>10}")
+    for phase, summary in stats['phases'].items():
+        print(f"{phase:<10} {summary['count']:>10} {summary['p50']:>10.3f} {summary['p95']:>10.3f} {summary['max']:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
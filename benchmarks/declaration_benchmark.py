@@ -0,0 +1,90 @@
+# declaration_benchmark.py
+"""
+Benchmark del procesamiento de declaraciones (vars, funcs y param_list) con programas de
+10k a 100k variables declaradas. Mide la conversión al AST y el análisis semántico, las fases
+que recorren las declaraciones, y reporta el tiempo por declaración: si el procesamiento es
+lineal, el costo por variable se mantiene constante al crecer el programa.
+
+Cada programa incluye declaraciones repetidas, así que también verifica que la tabla de
+símbolos y el número de errores sean los esperados.
+
+Uso:
+  python benchmarks/declaration_benchmark.py [--sizes 10000 25000 50000 100000] [--per-line N]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compilation import Compilation
+
+
+def generate_declarations(num_vars, per_line=50):
+    """
+    Programa con num_vars variables: la mitad globales, un cuarto como parámetros de una sola
+    función y un cuarto como variables locales de esa función. Cada línea de var repite una
+    variable global ya declarada, lo que produce un error por línea.
+    """
+    num_globals = num_vars // 2
+    num_params = num_vars // 4
+    num_locals = num_vars - num_globals - num_params
+
+    lines = ["program decls;", "var"]
+    duplicates = 0
+    for start in range(0, num_globals, per_line):
+        names = [f"g{i}" for i in range(start, min(start + per_line, num_globals))]
+        if start > 0:
+            names.append("g0")
+            duplicates += 1
+        lines.append(f"    {', '.join(names)} : {'int' if start % 2 == 0 else 'float'};")
+
+    params = ", ".join(f"p{i} : {'int' if i % 2 == 0 else 'float'}" for i in range(num_params))
+    lines.append(f"void big({params}) [")
+    lines.append("    var")
+    for start in range(0, num_locals, per_line):
+        names = [f"l{i}" for i in range(start, min(start + per_line, num_locals))]
+        lines.append(f"        {', '.join(names)} : float;")
+    lines.append("    { l0 = p0 + p1; }")
+    lines.append("];")
+    lines.append("main { g0 = 1; }")
+    lines.append("end")
+    return "\n".join(lines) + "\n", num_globals, num_params, num_locals, duplicates
+
+
+def run(num_vars, per_line):
+    source, num_globals, num_params, num_locals, duplicates = generate_declarations(num_vars, per_line)
+    compilation = Compilation(source=source, fast_lexer=True)
+    compilation.analyze()
+    if compilation.has_syntax_errors:
+        print(f"ERROR: el programa generado con {num_vars} variables tiene errores sintácticos.")
+        sys.exit(1)
+
+    table = compilation.symbol_table
+    big = table.get_function('big')
+    if (len(table.global_vars) != num_globals or big.param_count != num_params
+            or big.local_var_count != num_locals or len(compilation.semantic_errors) != duplicates):
+        print(f"ERROR: tabla de símbolos o errores inesperados con {num_vars} variables.")
+        sys.exit(1)
+    return compilation.timings
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del análisis de declaraciones")
+    arg_parser.add_argument("--sizes", type=int, nargs='+', default=[10000, 25000, 50000, 100000],
+                            help="Número de variables declaradas por programa")
+    arg_parser.add_argument("--per-line", type=int, default=50, help="Variables por línea de var")
+    args = arg_parser.parse_args()
+
+    print(f"{'VARIABLES':>10} {'PARSE (s)':>10} {'AST (s)':>10} {'SEM (s)':>10} {'µs/VAR (AST+SEM)':>18}")
+    print("-" * 62)
+    for num_vars in args.sizes:
+        timings = run(num_vars, args.per_line)
+        declaration_time = timings['lower'] + timings['semantic']
+        print(f"{num_vars:>10} {timings['parse']:>10.3f} {timings['lower']:>10.3f} {timings['semantic']:>10.3f} "
+              f"{declaration_time / num_vars * 1e6:>18.2f}")
+
+
+if __name__ == '__main__':
+    main()
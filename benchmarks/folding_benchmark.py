@@ -0,0 +1,79 @@
+# folding_benchmark.py
+"""
+Benchmark del plegado de constantes (constant_folder.py) sobre un kernel numérico lleno de
+subexpresiones constantes e identidades (x * 1, x + 0, -(-x)). Compila el mismo programa con y
+sin plegado y reporta los cuádruplos generados, los ejecutados y el tiempo de la máquina
+virtual; también verifica que ambas versiones impriman lo mismo.
+
+Uso:
+  python benchmarks/folding_benchmark.py [--iterations 200000] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compilation import Compilation
+from virtual_machine import VirtualMachine
+
+KERNEL = """program kernel;
+var i, n, acc : int;
+    x, scale : float;
+main {
+    i = 0;
+    n = %d;
+    acc = 0;
+    x = 0.0;
+    scale = 2.0 * 3.5 / 7;
+    while (i < n * 1 + 0) do {
+        acc = acc + (i * (4 * 256 - 1024 + 1) + 0) - (60 * 60 - 3600);
+        x = x * 1 + -(-scale) * (1.0 / 4 + 0.75) - (10 / 4 - 2.5);
+        i = i + 2 * 3 - 5;
+    };
+    print("acc:", acc, "x:", x, 24 * 60 * 60, 1 < 2);
+}
+end
+"""
+
+
+def run(source, fold, repeat):
+    program = Compilation(source=source, fold=fold).code
+    counter = VirtualMachine(program, output=io.StringIO())
+    counter.run(count_instructions=True)
+    best = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        vm = VirtualMachine(program, output=output)
+        start = time.perf_counter()
+        vm.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(program.quads), counter.instructions_executed, best, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del plegado de constantes")
+    arg_parser.add_argument("--iterations", type=int, default=200_000, help="Iteraciones del kernel")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se reporta el mejor tiempo)")
+    args = arg_parser.parse_args()
+
+    source = KERNEL % args.iterations
+    results = {fold: run(source, fold, args.repeat) for fold in (False, True)}
+
+    print(f"Iteraciones: {args.iterations}\n")
+    print(f"{'PLEGADO':<10} {'GENERADOS':>10} {'EJECUTADOS':>12} {'TIEMPO (s)':>11}")
+    print("-" * 46)
+    for fold, (generated, executed, elapsed, _) in results.items():
+        print(f"{'sí' if fold else 'no':<10} {generated:>10} {executed:>12} {elapsed:>11.3f}")
+
+    plain, folded = results[False], results[True]
+    print(f"\nCuádruplos ejecutados: {folded[1] / plain[1]:.2f}x, tiempo: {plain[2] / folded[2]:.2f}x más rápido")
+    print(f"Salida idéntica: {'sí' if plain[3] == folded[3] else 'NO'} ({folded[3].strip()})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# frame_benchmark.py
+"""
+Benchmark de la reutilización de temporales (temp_allocator.py). Genera una función con un
+cuerpo largo de expresiones, la llama muchas veces y compara el tamaño de su registro de
+activación y el tiempo de la máquina virtual con y sin compartir casillas entre temporales
+cuyos rangos de vida no se traslapan.
+
+Uso:
+  python benchmarks/frame_benchmark.py [--statements 200] [--calls 5000] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compilation import Compilation
+from virtual_machine import VirtualMachine
+
+
+def generate_program(statements, calls):
+    """Función 'kernel' con statements asignaciones de expresiones de 12 operaciones cada una."""
+    lines = ["program frames;", "var i, total : int;", "    acc : float;",
+             "void kernel(a : int, b : float) [", "    var x, y : int;", "        z : float;", "    {"]
+    for s in range(statements):
+        if s % 2 == 0:
+            lines.append(f"        x = (a + {s}) * (a - 1) + (y * 3 - {s % 7}) * (y + 2) - (a * a + y) * 2 + y;")
+        else:
+            lines.append(f"        z = (b * {s % 5}.5 + x) / (a + 1) - (b * 0.5 + b) * (x - y) + (b - a) / 2;")
+        if s % 10 == 9:
+            lines.append("        y = y + 1;")
+    lines += ["        total = total + x;", "        acc = acc + z;", "    }", "];",
+              "main {", "    i = 0;", f"    while (i < {calls}) do {{", "        kernel(i, 1.5);",
+              "        i = i + 1;", "    };", "    print(\"total:\", total, \"acc:\", acc);", "}", "end"]
+    return "\n".join(lines) + "\n"
+
+
+def run(source, reuse_temps, repeat):
+    compilation = Compilation(source=source, reuse_temps=reuse_temps)
+    program = compilation.code
+    kernel = program.functions[0]
+    best = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        vm = VirtualMachine(program, output=output)
+        start = time.perf_counter()
+        vm.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(kernel.variables) + kernel.temp_var_count, best, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark de la reutilización de temporales")
+    arg_parser.add_argument("--statements", type=int, default=200, help="Asignaciones en la función")
+    arg_parser.add_argument("--calls", type=int, default=5_000, help="Llamadas a la función")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se reporta el mejor tiempo)")
+    args = arg_parser.parse_args()
+
+    source = generate_program(args.statements, args.calls)
+    print(f"Asignaciones: {args.statements}, llamadas: {args.calls}\n")
+    print(f"{'REUTILIZAR':<11} {'CASILLAS':>9} {'TIEMPO (s)':>11}")
+    print("-" * 33)
+    results = {}
+    for reuse in (False, True):
+        slots, elapsed, output = results[reuse] = run(source, reuse, args.repeat)
+        print(f"{'sí' if reuse else 'no':<11} {slots:>9} {elapsed:>11.3f}")
+    plain, reused = results[False], results[True]
+    print(f"\nRegistro de activación: {plain[0]} -> {reused[0]} casillas, tiempo: {plain[1] / reused[1]:.2f}x")
+    print(f"Salida idéntica: {'sí' if plain[2] == reused[2] else 'NO'} ({reused[2].strip()})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# incremental_benchmark.py
+"""
+Benchmark del análisis semántico incremental (incremental_analysis.py). Para programas generados
+de distintos tamaños analiza el programa una vez con un FunctionCache, edita el cuerpo de una
+sola función y vuelve a analizar, y compara el tiempo de ese reanálisis con el de un análisis
+semántico completo del programa editado. También verifica que ambos den los mismos errores y la
+misma tabla de símbolos.
+
+Uso:
+  python benchmarks/incremental_benchmark.py [--sizes 100 400 1600] [--statements 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compilation import Compilation
+from incremental_analysis import FunctionCache
+from semantic_analyzer import SemanticAnalyzer
+from symbol_table import SymbolTable
+from program_generator import generate_program
+
+
+def edit_one_function(source, index):
+    """Cambia una constante en el cuerpo de func<index>."""
+    start = source.index(f"void func{index}(")
+    position = source.index("tmp = a * b + 0", start) + len("tmp = a * b + ")
+    return source[:position] + "7" + source[position + 1:]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del análisis semántico incremental")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[100, 400, 1600], help="Funciones por programa")
+    arg_parser.add_argument("--statements", type=int, default=8, help="Sentencias por función")
+    args = arg_parser.parse_args()
+
+    print(f"{'FUNCIONES':>9} {'COMPLETO (ms)':>14} {'INCREMENTAL (ms)':>17} {'ACELERACIÓN':>12} "
+          f"{'REANALIZADAS':>13}  RESULTADO")
+    print("-" * 85)
+    for size in args.sizes:
+        source = generate_program(size, args.statements)
+        cache = FunctionCache()
+        Compilation(source=source, fast_lexer=True, incremental=cache).analyze()
+
+        edited = Compilation(source=edit_one_function(source, size // 2), fast_lexer=True, incremental=cache)
+        edited.ast
+        errors = edited.semantic_errors
+        incremental_time = edited.timings['semantic']
+
+        # Análisis completo del mismo AST editado, sin caché
+        start = time.perf_counter()
+        table = SymbolTable()
+        full_errors = SemanticAnalyzer(table, edited.semantic_cube).visit(edited.ast)
+        full_time = time.perf_counter() - start
+
+        same = full_errors == errors and str(table) == str(edited.symbol_table)
+        print(f"{size:>9} {full_time * 1000:>14.2f} {incremental_time * 1000:>17.2f} "
+              f"{full_time / incremental_time:>11.1f}x {cache.analyzed:>13}  {'idéntico' if same else '¡DISTINTO!'}")
+
+
+if __name__ == '__main__':
+    main()
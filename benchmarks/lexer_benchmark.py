@@ -0,0 +1,64 @@
+# lexer_benchmark.py
+"""
+Benchmark del lexer generado por ANTLR (LittleDuckLexer) contra fast_lexer.FastLexer.
+
+Uso:
+  python benchmarks/lexer_benchmark.py [--size-kb N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from antlr4 import InputStream
+from gen.LittleDuckLexer import LittleDuckLexer
+from fast_lexer import FastLexer
+from program_generator import generate_program_of_size
+
+
+def lex_all(lexer_class, source):
+    lexer = lexer_class(InputStream(source))
+    lexer.removeErrorListeners()
+    return lexer.getAllTokens()
+
+
+def time_lexer(lexer_class, source, repeat):
+    best = None
+    tokens = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = lex_all(lexer_class, source)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, [(t.type, t.text, t.line, t.column, t.start, t.stop) for t in tokens]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark ANTLR lexer vs FastLexer")
+    arg_parser.add_argument("--size-kb", type=int, default=1024, help="Tamaño aproximado del programa generado")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por lexer (se reporta el mejor tiempo)")
+    args = arg_parser.parse_args()
+
+    source = generate_program_of_size(args.size_kb * 1024)
+    size_kb = len(source.encode('utf-8')) / 1024
+    print(f"Programa generado: {size_kb:.0f} KB, {source.count(chr(10))} líneas\n")
+
+    antlr_time, antlr_tokens = time_lexer(LittleDuckLexer, source, args.repeat)
+    fast_time, fast_tokens = time_lexer(FastLexer, source, args.repeat)
+
+    if antlr_tokens != fast_tokens:
+        print("ERROR: los lexers produjeron secuencias de tokens distintas.")
+        sys.exit(1)
+
+    print(f"{'LEXER':<16} {'TOKENS':>10} {'TIEMPO (s)':>12} {'KB/s':>12}")
+    print("-" * 54)
+    print(f"{'LittleDuckLexer':<16} {len(antlr_tokens):>10} {antlr_time:>12.3f} {size_kb / antlr_time:>12.0f}")
+    print(f"{'FastLexer':<16} {len(fast_tokens):>10} {fast_time:>12.3f} {size_kb / fast_time:>12.0f}")
+    print(f"\nAceleración: {antlr_time / fast_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
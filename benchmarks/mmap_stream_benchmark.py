@@ -0,0 +1,79 @@
+# mmap_stream_benchmark.py
+"""
+Mide la memoria pico al tokenizar archivos grandes leyendo con FileStream (todo el archivo en
+memoria) y con mmap_stream.MmapCharStream (decodificación incremental). Los tokens se consumen
+a medida que se producen, como en lexer_runner.py. Los tiempos incluyen la sobrecarga de
+tracemalloc y solo sirven para comparar ambos streams entre sí.
+
+Uso:
+  python benchmarks/mmap_stream_benchmark.py [--sizes-mb 1 4 16] [--antlr]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from antlr4 import FileStream, Token
+from gen.LittleDuckLexer import LittleDuckLexer
+from fast_lexer import FastLexer
+from mmap_stream import MmapCharStream, COPY_TEXT_FACTORY
+from program_generator import generate_program_of_size
+
+
+def stream_tokens(input_stream, lexer_class):
+    lexer = lexer_class(input_stream)
+    lexer.removeErrorListeners()
+    if isinstance(input_stream, MmapCharStream):
+        lexer._factory = COPY_TEXT_FACTORY
+    count = 0
+    token = lexer.nextToken()
+    while token.type != Token.EOF:
+        count += 1
+        token = lexer.nextToken()
+    return count
+
+
+def measure(path, use_mmap, lexer_class):
+    tracemalloc.start()
+    start = time.perf_counter()
+    if use_mmap:
+        with MmapCharStream(path, encoding='utf-8') as input_stream:
+            count = stream_tokens(input_stream, lexer_class)
+    else:
+        count = stream_tokens(FileStream(path, encoding='utf-8'), lexer_class)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Memoria pico de FileStream vs MmapCharStream")
+    arg_parser.add_argument("--sizes-mb", type=int, nargs='+', default=[1, 4], help="Tamaños de archivo a generar")
+    arg_parser.add_argument("--antlr", action="store_true", help="Usa LittleDuckLexer en lugar de FastLexer (lento)")
+    args = arg_parser.parse_args()
+
+    lexer_class = LittleDuckLexer if args.antlr else FastLexer
+    print(f"Lexer: {lexer_class.__name__}\n")
+    print(f"{'TAMAÑO':>8} {'STREAM':<16} {'TOKENS':>10} {'TIEMPO (s)':>12} {'PICO (MB)':>10}")
+    print("-" * 60)
+
+    for size_mb in args.sizes_mb:
+        with tempfile.NamedTemporaryFile('w', suffix='.ld', encoding='utf-8', delete=False) as f:
+            f.write(generate_program_of_size(size_mb * 1024 * 1024))
+            path = f.name
+        try:
+            for use_mmap, label in ((False, "FileStream"), (True, "MmapCharStream")):
+                count, elapsed, peak = measure(path, use_mmap, lexer_class)
+                print(f"{size_mb:>6}MB {label:<16} {count:>10} {elapsed:>12.2f} {peak / 2**20:>10.1f}")
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
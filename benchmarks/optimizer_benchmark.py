@@ -0,0 +1,121 @@
+# optimizer_benchmark.py
+"""
+Benchmark del optimizador de bloques básicos (optimizer.py, opción -O de run.py). Compila
+programas con subexpresiones repetidas, copias y cálculos cuyo resultado nadie usa, con y sin
+optimizar, y reporta los cuádruplos generados, los ejecutados y el tiempo de la máquina
+virtual. También verifica que ambas versiones impriman lo mismo.
+
+Uso:
+  python benchmarks/optimizer_benchmark.py [--iterations 200000] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compilation import Compilation
+from virtual_machine import VirtualMachine
+
+# La misma subexpresión en varias sentencias de un bloque y una variable copiada
+REPEATED = """program repeated;
+var i, a, b, c, d, copy : int;
+main {
+    i = 0;
+    a = 3;
+    b = 4;
+    while (i < %d) do {
+        copy = i;
+        c = (copy + a) * (copy + a) - (a * b);
+        d = (copy + a) * b + (a * b);
+        i = copy + 1;
+    };
+    print("c:", c, "d:", d);
+}
+end
+"""
+
+# Cálculos que se sobrescriben antes de leerse y temporales de condiciones repetidas
+DEAD = """program dead;
+var i, n, x, y : int;
+    f : float;
+main {
+    i = 0;
+    n = %d;
+    while (i < n) do {
+        x = i * 7;
+        f = i / 3;
+        x = i + 1;
+        y = x - 1;
+        if (i > y) { print("nunca"); };
+        i = x;
+    };
+    print("x:", x, "y:", y);
+}
+end
+"""
+
+# Argumentos repetidos al llamar una función que usa una global
+CALLS = """program calls;
+var i, total : int;
+void add(p : int, q : int) [
+    {
+        total = total + p * q + p * q;
+    }
+];
+main {
+    i = 0;
+    total = 0;
+    while (i < %d) do {
+        add(i * 2 + 1, i * 2 + 1);
+        i = i + 1;
+    };
+    print("total:", total);
+}
+end
+"""
+
+PROGRAMS = [("repeated", REPEATED), ("dead", DEAD), ("calls", CALLS)]
+
+
+def run(source, optimize, repeat):
+    program = Compilation(source=source, optimize=optimize).code
+    counter = VirtualMachine(program, output=io.StringIO())
+    counter.run(count_instructions=True)
+    best = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        vm = VirtualMachine(program, output=output)
+        start = time.perf_counter()
+        vm.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(program.quads), counter.instructions_executed, best, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del optimizador de cuádruplos")
+    arg_parser.add_argument("--iterations", type=int, default=200_000, help="Iteraciones de cada ciclo")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se reporta el mejor tiempo)")
+    args = arg_parser.parse_args()
+
+    print(f"Iteraciones: {args.iterations}\n")
+    print(f"{'PROGRAMA':<10} {'-O':<3} {'GENERADOS':>10} {'EJECUTADOS':>12} {'TIEMPO (s)':>11} {'ACELERACIÓN':>12}  SALIDA")
+    print("-" * 86)
+    for name, template in PROGRAMS:
+        source = template % args.iterations
+        plain = run(source, False, args.repeat)
+        optimized = run(source, True, args.repeat)
+        for optimize, (generated, executed, elapsed, output) in ((False, plain), (True, optimized)):
+            speedup = f"{plain[2] / elapsed:.2f}x" if optimize else ""
+            print(f"{name:<10} {'sí' if optimize else 'no':<3} {generated:>10} {executed:>12} "
+                  f"{elapsed:>11.3f} {speedup:>12}  {output.strip()}")
+        if plain[3] != optimized[3]:
+            print(f"{name}: ¡la salida optimizada es distinta!")
+
+
+if __name__ == '__main__':
+    main()
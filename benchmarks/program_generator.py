@@ -0,0 +1,79 @@
+# program_generator.py
+"""
+Generadores de programas LittleDuck sintéticos para los benchmarks.
+"""
+
+
+def generate_program(num_funcs, statements_per_func=20):
+    """
+    Genera un programa LittleDuck válido con num_funcs funciones, cada una con
+    statements_per_func sentencias (asignaciones, condiciones, ciclos y prints).
+    """
+    lines = ["program benchmark;", "var x, y, z : int;", "    ratio : float;", ""]
+    for f in range(num_funcs):
+        lines.append(f"void func{f}(a : int, b : float) [")
+        lines.append("    var tmp, acc : float;")
+        lines.append("        cnt : int;")
+        lines.append("    {")
+        for s in range(statements_per_func):
+            kind = s % 4
+            if kind == 0:
+                lines.append(f"        tmp = a * b + {s} - (x / 2.5);")
+            elif kind == 1:
+                lines.append(f"        if (tmp > {s}.75) {{ acc = acc + tmp; }} else {{ acc = acc - 1; }};")
+            elif kind == 2:
+                lines.append(f"        cnt = {s}; while (cnt > 0) do {{ cnt = cnt - 1; }};")
+            else:
+                lines.append(f"        print(\"valor {f}_{s}:\", acc, cnt * {s});")
+        lines.append("    }")
+        lines.append("];")
+        lines.append("")
+    lines.append("main {")
+    lines.append("    x = 10;")
+    lines.append("    y = 5;")
+    for f in range(num_funcs):
+        lines.append(f"    func{f}(x + y, ratio * 2.0);")
+    lines.append("}")
+    lines.append("end")
+    return "\n".join(lines) + "\n"
+
+
+def generate_program_of_size(target_bytes, statements_per_func=20):
+    """
+    Genera un programa válido de aproximadamente target_bytes bytes.
+    """
+    sample = generate_program(1, statements_per_func)
+    num_funcs = max(1, target_bytes // len(sample))
+    return generate_program(num_funcs, statements_per_func)
+
+
+def generate_identifier_program(num_funcs, statements_per_func=20, refs_per_statement=12,
+                                num_locals=8, num_globals=8):
+    """
+    Genera un programa LittleDuck válido dominado por referencias a variables: cada sentencia
+    asigna a una variable una suma de refs_per_statement referencias a locales, parámetros y
+    globales, todas int.
+    """
+    global_names = [f"g{i}" for i in range(num_globals)]
+    local_names = [f"v{i}" for i in range(num_locals)]
+    names = local_names + ["p0", "p1"] + global_names
+    lines = ["program identificadores;", f"var {', '.join(global_names)} : int;", ""]
+    for f in range(num_funcs):
+        lines.append(f"void func{f}(p0 : int, p1 : int) [")
+        lines.append(f"    var {', '.join(local_names)} : int;")
+        lines.append("    {")
+        for s in range(statements_per_func):
+            refs = [names[(f + s * 7 + r * 3) % len(names)] for r in range(refs_per_statement)]
+            operators = [" + " if r % 3 else " - " for r in range(1, refs_per_statement)]
+            expression = refs[0] + "".join(op + ref for op, ref in zip(operators, refs[1:]))
+            target = (local_names + global_names)[(f + s) % (num_locals + num_globals)]
+            lines.append(f"        {target} = {expression};")
+        lines.append("    }")
+        lines.append("];")
+        lines.append("")
+    lines.append("main {")
+    for f in range(num_funcs):
+        lines.append(f"    func{f}({global_names[f % num_globals]}, {f});")
+    lines.append("}")
+    lines.append("end")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,128 @@
+# python_backend_benchmark.py
+"""
+Benchmark del backend de Python (python_backend.py, opción --python de run.py) contra la máquina
+virtual de cuádruplos. Ejecuta ciclos aritméticos, llamadas y prints con ambos backends, reporta
+el tiempo de cada uno y verifica que impriman lo mismo.
+
+Uso:
+  python benchmarks/python_backend_benchmark.py [--iterations 1000000] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compilation import Compilation
+from virtual_machine import VirtualMachine
+
+# Acumulación con aritmética mixta int/float en el cuerpo del ciclo
+ARITHMETIC = """program arithmetic;
+var i, acc : int;
+    x, avg : float;
+main {
+    i = 0;
+    acc = 0;
+    x = 0.0;
+    while (i < %d) do {
+        acc = acc + i * 2 - 1;
+        x = x + i / 4 - 0.5 * x;
+        i = i + 1;
+    };
+    avg = acc / i;
+    print("acc:", acc, "x:", x, "avg:", avg);
+}
+end
+"""
+
+# Ciclos anidados con una condición en el cuerpo
+NESTED = """program nested;
+var i, j, n, hits : int;
+main {
+    n = %d;
+    i = 0;
+    hits = 0;
+    while (i * i < n) do {
+        j = 0;
+        while (j * j < n) do {
+            if ((i + j) * 3 > i * j) { hits = hits + 1; } else { hits = hits - 1; };
+            j = j + 1;
+        };
+        i = i + 1;
+    };
+    print("hits:", hits);
+}
+end
+"""
+
+# Una función void llamada en cada iteración, con una int pasada a un parámetro float
+CALLS = """program calls;
+var i, total : int;
+    scaled : float;
+void add(k : int, s : float) [
+    {
+        total = total + k;
+        scaled = scaled + s / 2;
+    }
+];
+main {
+    i = 0;
+    while (i < %d) do {
+        add(i, i);
+        i = i + 1;
+    };
+    print("total:", total, "scaled:", scaled);
+}
+end
+"""
+
+# Un print por iteración, escrito con el buffer del backend
+PRINTS = """program prints;
+var i : int;
+main {
+    i = 0;
+    while (i < %d) do {
+        print("i:", i, i / 2, i > 5);
+        i = i + 1;
+    };
+}
+end
+"""
+
+PROGRAMS = [("aritmética", ARITHMETIC, 1), ("anidados", NESTED, 1), ("llamadas", CALLS, 10), ("prints", PRINTS, 10)]
+
+
+def best_of(repeat, run):
+    best = output = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        start = time.perf_counter()
+        run(output)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del backend de Python contra la máquina virtual")
+    arg_parser.add_argument("--iterations", type=int, default=1_000_000, help="Iteraciones de cada ciclo")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se reporta el mejor tiempo)")
+    args = arg_parser.parse_args()
+
+    print(f"Iteraciones: {args.iterations} (llamadas y prints: una décima parte)\n")
+    print(f"{'PROGRAMA':<12} {'VM (s)':>9} {'PYTHON (s)':>11} {'ACELERACIÓN':>12}  SALIDA")
+    print("-" * 60)
+    for name, template, divisor in PROGRAMS:
+        compilation = Compilation(source=template % (args.iterations // divisor))
+        program, python_program = compilation.code, compilation.python
+        vm_time, vm_output = best_of(args.repeat, lambda output: VirtualMachine(program, output=output).run())
+        python_time, python_output = best_of(args.repeat, python_program.run)
+        same = "idéntica" if vm_output == python_output else "¡DISTINTA!"
+        print(f"{name:<12} {vm_time:>9.3f} {python_time:>11.3f} {vm_time / python_time:>11.1f}x  {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# resolution_benchmark.py
+"""
+Benchmark de la resolución de identificadores por slots. Genera programas dominados por
+referencias a variables (locales, parámetros y globales) y mide el análisis semántico y la
+generación de cuádruplos de dos formas: con la resolución actual, que busca cada identificador
+una sola vez en la FunctionEntry del ámbito y guarda su slot (nivel, índice) en el nodo, y con la
+resolución anterior por nombres, que en cada referencia busca la función por su nombre y después
+la variable en los diccionarios de locales y globales, tanto en el análisis como en la
+generación. Verifica que ambas den los mismos errores y los mismos cuádruplos.
+
+Uso:
+  python benchmarks/resolution_benchmark.py [--sizes 50 200 800] [--refs 12] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from code_generator import CodeGenerator
+from compilation import Compilation
+from semantic_analyzer import SemanticAnalyzer
+from symbol_table import SymbolTable
+from program_generator import generate_identifier_program
+
+
+class NameLookupTable(SymbolTable):
+    """
+    SymbolTable con la resolución anterior: en cada referencia busca la función del ámbito actual
+    por su nombre y después la variable en sus diccionarios y en los de las globales.
+    """
+
+    def resolve(self, var_name, scope):
+        return self.lookup_by_name(var_name, self.current_scope_name)
+
+    def lookup_by_name(self, var_name, scope_name):
+        if scope_name != 'global':
+            func_entry = self.get_function(scope_name)
+            if func_entry:
+                var = func_entry.get_variable(var_name)
+                if var:
+                    return var
+        return self.get_global_variable(var_name)
+
+
+class NameLookupGenerator(CodeGenerator):
+    """CodeGenerator que resuelve cada referencia por nombres en lugar de por slots."""
+
+    def variable(self, node):
+        return self.symbol_table.lookup_by_name(node.name, self.current_function.name)
+
+
+def measure(ast, cube, table_class, generator_class, repeat):
+    """Mejores tiempos de análisis y de generación en repeat repeticiones, con sus resultados."""
+    best_analysis = best_generation = float('inf')
+    for _ in range(repeat):
+        table = table_class()
+        start = time.perf_counter()
+        errors = SemanticAnalyzer(table, cube).visit(ast)
+        best_analysis = min(best_analysis, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        program = generator_class(table, cube).generate(ast)
+        best_generation = min(best_generation, time.perf_counter() - start)
+    return best_analysis, best_generation, errors, str(program)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark de la resolución de identificadores por slots")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 800], help="Funciones por programa")
+    arg_parser.add_argument("--statements", type=int, default=20, help="Sentencias por función")
+    arg_parser.add_argument("--refs", type=int, default=12, help="Referencias a variables por sentencia")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición (se toma la mejor)")
+    args = arg_parser.parse_args()
+
+    print(f"{'FUNCIONES':>9} {'REFERENCIAS':>12} {'FASE':<10} {'NOMBRES (ms)':>13} {'SLOTS (ms)':>11} "
+          f"{'ACELERACIÓN':>12}  RESULTADO")
+    print("-" * 90)
+    for size in args.sizes:
+        source = generate_identifier_program(size, args.statements, args.refs)
+        compilation = Compilation(source=source, fast_lexer=True)
+        ast, cube = compilation.ast, compilation.semantic_cube
+        references = size * args.statements * (args.refs + 1)
+
+        by_name = measure(ast, cube, NameLookupTable, NameLookupGenerator, args.repeat)
+        by_slot = measure(ast, cube, SymbolTable, CodeGenerator, args.repeat)
+        same = by_name[2:] == by_slot[2:]
+        for phase, index in (("análisis", 0), ("generación", 1)):
+            print(f"{size:>9} {references:>12} {phase:<10} {by_name[index] * 1000:>13.2f} "
+                  f"{by_slot[index] * 1000:>11.2f} {by_name[index] / by_slot[index]:>11.2f}x  "
+                  f"{'idéntico' if same else '¡DISTINTO!'}")
+
+
+if __name__ == '__main__':
+    main()
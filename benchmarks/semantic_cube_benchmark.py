@@ -0,0 +1,59 @@
+# semantic_cube_benchmark.py
+"""
+Benchmark del cubo semántico denso (semantic_cube.py). Mide búsquedas repetidas sobre todas las
+combinaciones de tipos y operadores: la búsqueda anterior en el diccionario con una tupla de tres
+Enum como llave, get_type sobre la tabla, e indexar la tabla directamente como lo hacen el
+analizador y los generadores. La equivalencia con las reglas del diccionario se prueba en
+tests/test_semantic_cube.py.
+
+Uso:
+  python benchmarks/semantic_cube_benchmark.py [--lookups 1000000] [--repeat 5]
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from semantic_cube import SemanticCube, Type, Operator
+
+
+class DictSemanticCube(SemanticCube):
+    """SemanticCube con la búsqueda anterior: una tupla (type1, type2, operator) en el diccionario."""
+
+    def get_type(self, type1, type2, operator):
+        return self.cube.get((type1, type2, operator), Type.ERROR)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del cubo semántico denso")
+    arg_parser.add_argument("--lookups", type=int, default=1000000, help="Búsquedas por medición")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medición (se toma la mejor)")
+    args = arg_parser.parse_args()
+
+    cube = SemanticCube()
+    # Las búsquedas recorren todas las combinaciones, con y sin regla
+    triples = list(itertools.product(Type, Type, Operator))
+    triples = (triples * (args.lookups // len(triples) + 1))[:args.lookups]
+    dict_cube = DictSemanticCube()
+    table = cube.table
+    variants = [
+        ("diccionario (get_type anterior)", lambda: [dict_cube.get_type(a, b, op) for a, b, op in triples]),
+        ("tabla con get_type", lambda: [cube.get_type(a, b, op) for a, b, op in triples]),
+        ("tabla indexada directamente", lambda: [table[op.code][a.code][b.code] for a, b, op in triples]),
+    ]
+
+    print(f"{'BÚSQUEDA':<34} {'TIEMPO (ms)':>12} {'ns/BÚSQUEDA':>12} {'ACELERACIÓN':>12}")
+    print("-" * 73)
+    baseline = None
+    for name, lookup in variants:
+        elapsed = min(timeit.repeat(lookup, number=1, repeat=args.repeat))
+        baseline = baseline or elapsed
+        print(f"{name:<34} {elapsed * 1000:>12.1f} {elapsed / args.lookups * 1e9:>12.1f} {baseline / elapsed:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# server_benchmark.py
+"""
+Benchmark del servidor de análisis (compile_server.py). Arranca el servidor con stdin/stdout
+como tuberías y, para programas generados de distintos tamaños, mide la latencia de ida y vuelta
+de peticiones 'analyze' con el servidor caliente: cada petición cambia una constante en el cuerpo
+de una función distinta, como lo haría un editor. La compara con lanzar un proceso de semantic_runner.py por
+revisión, y verifica que ambos reporten el mismo número de errores.
+
+Uso:
+  python benchmarks/server_benchmark.py [--sizes 10 100 400] [--requests 50] [--processes 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from program_generator import generate_program
+
+
+def edit_function(source, index, value):
+    """Cambia por value la primera constante de una cifra del cuerpo de func<index>."""
+    start = source.index(f"void func{index}(")
+    position = source.index("tmp = a * b + ", start) + len("tmp = a * b + ")
+    return source[:position] + str(value) + source[position + 1:]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ServerProcess:
+    def __init__(self):
+        self.process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'compile_server.py')],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+                                        encoding='utf-8')
+        self.next_id = 0
+
+    def call(self, method, **params):
+        self.next_id += 1
+        request = {'jsonrpc': '2.0', 'id': self.next_id, 'method': method, 'params': params}
+        self.process.stdin.write(json.dumps(request) + '\n')
+        self.process.stdin.flush()
+        response = json.loads(self.process.stdout.readline())
+        if 'error' in response:
+            raise RuntimeError(response['error']['message'])
+        return response['result']
+
+    def close(self):
+        self.call('shutdown')
+        self.process.wait()
+
+
+def run_process(path):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.join(ROOT, 'semantic_runner.py'), path],
+                            capture_output=True, text=True, encoding='utf-8')
+    return time.perf_counter() - start, result.stdout.count("Error at Line")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del servidor de análisis")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 400], help="Funciones por programa")
+    arg_parser.add_argument("--statements", type=int, default=8, help="Sentencias por función")
+    arg_parser.add_argument("--requests", type=int, default=50, help="Peticiones calientes por tamaño")
+    arg_parser.add_argument("--processes", type=int, default=3, help="Procesos de semantic_runner.py por tamaño")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    server = ServerProcess()
+    server.call('stats')
+    print(f"Arranque del servidor: {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    print(f"{'FUNCIONES':>9} {'FRÍA (ms)':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'EN SERVIDOR':>12} "
+          f"{'PROCESO (ms)':>13} {'ACELERACIÓN':>12}  RESULTADO")
+    print("-" * 95)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            source = generate_program(size, args.statements)
+            uri = f"mem://program{size}.ld"
+
+            start = time.perf_counter()
+            server.call('analyze', text=source, uri=uri)
+            cold = time.perf_counter() - start
+
+            latencies, inside = [], []
+            for request in range(args.requests):
+                source = edit_function(source, request % size, 1 + request % 9)
+                start = time.perf_counter()
+                result = server.call('analyze', text=source, uri=uri)
+                latencies.append(time.perf_counter() - start)
+                inside.append(result['ms'])
+
+            path = os.path.join(tmp, f"program{size}.ld")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            runs = [run_process(path) for _ in range(args.processes)]
+            process_time = min(elapsed for elapsed, _ in runs)
+            same = runs[0][1] == len(result['diagnostics'])
+
+            p50 = percentile(latencies, 0.5)
+            print(f"{size:>9} {cold * 1000:>10.2f} {p50 * 1000:>9.2f} {percentile(latencies, 0.95) * 1000:>9.2f} "
+                  f"{percentile(inside, 0.5):>12.2f} {process_time * 1000:>13.1f} {process_time / p50:>11.1f}x  "
+                  f"{'mismos errores' if same else '¡DISTINTO!'}")
+
+    server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# startup_benchmark.py
+"""
+Benchmark del arranque desde objetos compilados (object_file.py). Genera un programa con muchas
+funciones, lo compila a un objeto .ldo y compara el tiempo de obtener un programa listo para la
+máquina virtual compilando el fuente contra cargando el objeto con mmap, dentro del proceso y
+como proceso completo de run.py. También verifica que ambos impriman lo mismo y que cargar el
+objeto no importe ANTLR.
+
+Uso:
+  python benchmarks/startup_benchmark.py [--funcs 200] [--repeat 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from compilation import Compilation
+from object_file import load_object, write_object
+from program_generator import generate_program
+
+
+def best_of(repeat, function):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_process(path):
+    result = subprocess.run([sys.executable, os.path.join(ROOT, 'run.py'), path],
+                            capture_output=True, text=True, encoding='utf-8')
+    return result.stdout
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark del arranque desde objetos .ldo")
+    arg_parser.add_argument("--funcs", type=int, default=200, help="Funciones del programa generado")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Repeticiones (se reporta el mejor tiempo)")
+    args = arg_parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    source_path = os.path.join(directory, 'startup.ld')
+    object_path = os.path.join(directory, 'startup.ldo')
+    with open(source_path, 'w', encoding='utf-8') as f:
+        f.write(generate_program(args.funcs))
+
+    # Corre en un proceso aparte para ver solo los módulos que importa la carga
+    checker = ("import sys; sys.path.insert(0, sys.argv[1]); from object_file import load_object; "
+               "load_object(sys.argv[2]); print('antlr4' in sys.modules)")
+
+    def compile_source():
+        return Compilation(source_path).code
+
+    write_object(compile_source(), object_path)
+    compile_time = best_of(args.repeat, compile_source)
+    load_time = best_of(args.repeat, lambda: load_object(object_path))
+    program = load_object(object_path)
+
+    print(f"Funciones: {args.funcs}, cuádruplos: {len(program.quads)}")
+    print(f"Fuente: {os.path.getsize(source_path)} bytes, objeto: {os.path.getsize(object_path)} bytes\n")
+    print(f"{'ARRANQUE':<22} {'FUENTE (s)':>11} {'OBJETO (s)':>11} {'ACELERACIÓN':>12}")
+    print("-" * 59)
+    print(f"{'en proceso':<22} {compile_time:>11.4f} {load_time:>11.4f} {compile_time / load_time:>11.1f}x")
+
+    outputs = {}
+    process_times = {}
+    for path in (source_path, object_path):
+        process_times[path] = best_of(args.repeat, lambda: outputs.__setitem__(path, run_process(path)))
+    source_process, object_process = process_times[source_path], process_times[object_path]
+    print(f"{'run.py completo':<22} {source_process:>11.4f} {object_process:>11.4f} "
+          f"{source_process / object_process:>11.1f}x")
+
+    imports_antlr = subprocess.run([sys.executable, '-c', checker, ROOT, object_path],
+                                   capture_output=True, text=True).stdout.strip()
+    print(f"\nSalida idéntica: {'sí' if outputs[source_path] == outputs[object_path] else 'NO'}")
+    print(f"Cargar el objeto importa ANTLR: {'sí' if imports_antlr == 'True' else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
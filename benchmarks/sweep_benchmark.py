@@ -0,0 +1,104 @@
+# sweep_benchmark.py
+"""
+Benchmark de los barridos de parámetros vectorizados (vector_machine.py, opción --batch de
+run.py). Ejecuta un programa modelo sobre N combinaciones de valores iniciales de sus globales
+con una sola corrida vectorizada en NumPy, y lo compara con N corridas separadas en la máquina
+virtual y en el backend de Python (medidas sobre una muestra y extrapoladas a N). También
+verifica que cada carril imprima lo mismo que su corrida separada.
+
+Uso:
+  python benchmarks/sweep_benchmark.py [--lanes 1000] [--steps 200] [--sample 20]
+
+Requiere NumPy (pip install numpy).
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compilation import Compilation
+from virtual_machine import VirtualMachine
+import vector_machine
+from vector_machine import VectorMachine
+
+# Modelo con las globales de example_program.ld: x e y son los parámetros del barrido
+MODEL = """program sweep;
+var x, y, i : int;
+    resultado, tasa : float;
+void paso(k : int) [
+    {
+        resultado = resultado * tasa + k / (y + 1);
+    }
+];
+main {
+    tasa = 1.0 + x / 1000;
+    i = 0;
+    while (i < %d) do {
+        paso(i);
+        if (resultado > 1000.0) { resultado = resultado / 2; } else { resultado = resultado + y; };
+        i = i + 1;
+    };
+    print("x:", x, "y:", y, "resultado:", resultado);
+}
+end
+"""
+
+
+def initial_globals(lanes):
+    return [{'x': lane % 100, 'y': lane // 100} for lane in range(lanes)]
+
+
+def vm_lane(source, values):
+    """Una corrida separada en la máquina virtual: las globales iniciales se asignan al inicio de main."""
+    assignments = " ".join(f"{name} = {value};" for name, value in values.items())
+    program = Compilation(source=source.replace("main {", "main { " + assignments, 1)).code
+    output = io.StringIO()
+    start = time.perf_counter()
+    VirtualMachine(program, output=output).run()
+    return time.perf_counter() - start, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark de barridos vectorizados")
+    arg_parser.add_argument("--lanes", type=int, default=1000, help="Combinaciones de valores iniciales")
+    arg_parser.add_argument("--steps", type=int, default=200, help="Iteraciones del ciclo del modelo")
+    arg_parser.add_argument("--sample", type=int, default=20, help="Corridas separadas medidas para extrapolar")
+    args = arg_parser.parse_args()
+    if vector_machine.np is None:
+        print("Este benchmark requiere NumPy: pip install numpy")
+        return 1
+
+    source = MODEL % args.steps
+    inits = initial_globals(args.lanes)
+    machine = VectorMachine(Compilation(source=source))
+
+    start = time.perf_counter()
+    results = machine.run(inits)
+    vector_time = time.perf_counter() - start
+
+    sample = inits[:args.sample]
+    start = time.perf_counter()
+    python_outputs = [machine.run_lane(machine.initial_values([values])[0]).output for values in sample]
+    python_time = (time.perf_counter() - start) * args.lanes / len(sample)
+    vm_runs = [vm_lane(source, values) for values in sample]
+    vm_time = sum(elapsed for elapsed, _ in vm_runs) * args.lanes / len(sample)
+
+    same = all(result.output == python == vm_output for result, python, (_, vm_output)
+               in zip(results, python_outputs, vm_runs))
+    print(f"Carriles: {args.lanes}, iteraciones por carril: {args.steps} ({machine.stats()})\n")
+    print(f"{'EJECUCIÓN':<28} {'TIEMPO (s)':>11} {'CARRILES/s':>11} {'ACELERACIÓN':>12}")
+    print("-" * 65)
+    for name, elapsed in ((f"{args.lanes} corridas en la VM", vm_time),
+                          (f"{args.lanes} corridas en Python", python_time),
+                          ("una corrida vectorizada", vector_time)):
+        print(f"{name:<28} {elapsed:>11.3f} {args.lanes / elapsed:>11.0f} {vm_time / elapsed:>11.1f}x")
+    print(f"\nSalida por carril idéntica (muestra de {len(sample)}): {'sí' if same else 'NO'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# vm_benchmark.py
+"""
+Benchmark de la máquina virtual con programas dominados por ciclos while, escalados hasta
+10^7 iteraciones. Reporta cuádruplos ejecutados por segundo.
+
+El número de cuádruplos ejecutados se obtiene sin contar en la corrida medida: cada programa
+ejecuta a*n + b cuádruplos para n iteraciones, así que a y b se calculan con dos corridas
+pequeñas con conteo y se extrapolan a n.
+
+Uso:
+  python benchmarks/vm_benchmark.py [--iterations 10000000] [--repeat 1] [--compact]
+
+Con --compact la memoria de la máquina usa arreglos tipados (array('q'), array('d'), array('b'))
+en lugar de listas.
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compilation import Compilation
+from virtual_machine import VirtualMachine
+
+# Contador descendente de example_program.ld, sin el print dentro del ciclo
+COUNTDOWN = """program countdown;
+var y : int;
+main {
+    y = %d;
+    while (y > 0) do {
+        y = y - 1;
+    };
+    print("y:", y);
+}
+end
+"""
+
+# Acumulación con aritmética mixta int/float en el cuerpo del ciclo
+ACCUMULATE = """program accumulate;
+var i, acc : int;
+    avg : float;
+main {
+    i = 0;
+    acc = 0;
+    while (i < %d) do {
+        acc = acc + i * 2 - 1;
+        i = i + 1;
+    };
+    avg = acc / i;
+    print("acc:", acc, "avg:", avg);
+}
+end
+"""
+
+# Ciclo que llama a una función void en cada iteración
+CALLS = """program calls;
+var i, total : int;
+void step(k : int) [
+    {
+        total = total + k;
+    }
+];
+main {
+    i = 0;
+    total = 0;
+    while (i < %d) do {
+        step(i);
+        i = i + 1;
+    };
+    print("total:", total);
+}
+end
+"""
+
+PROGRAMS = [("countdown", COUNTDOWN), ("accumulate", ACCUMULATE), ("calls", CALLS)]
+
+
+def compile_program(template, iterations):
+    return Compilation(source=template % iterations).code
+
+
+def count_instructions(template, iterations):
+    vm = VirtualMachine(compile_program(template, iterations), output=io.StringIO())
+    vm.run(count_instructions=True)
+    return vm.instructions_executed
+
+
+def executed_quads(template, iterations):
+    small, large = 1000, 2000
+    at_small = count_instructions(template, small)
+    per_iteration = (count_instructions(template, large) - at_small) // (large - small)
+    return per_iteration, at_small + per_iteration * (iterations - small)
+
+
+def time_run(program, repeat, compact=False):
+    best = None
+    output = None
+    for _ in range(repeat):
+        output = io.StringIO()
+        vm = VirtualMachine(program, output=output, compact=compact)
+        start = time.perf_counter()
+        vm.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue().strip()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark de la máquina virtual")
+    arg_parser.add_argument("--iterations", type=int, default=10_000_000, help="Iteraciones de cada ciclo")
+    arg_parser.add_argument("--repeat", type=int, default=1, help="Repeticiones (se reporta el mejor tiempo)")
+    arg_parser.add_argument("--compact", action="store_true", help="Memoria en arreglos tipados")
+    args = arg_parser.parse_args()
+
+    print(f"Iteraciones: {args.iterations}, memoria: {'arreglos tipados' if args.compact else 'listas'}\n")
+    print(f"{'PROGRAMA':<12} {'CUÁDS/IT':>9} {'CUÁDRUPLOS':>14} {'TIEMPO (s)':>11} {'CUÁDS/s':>12}  SALIDA")
+    print("-" * 80)
+    for name, template in PROGRAMS:
+        per_iteration, total = executed_quads(template, args.iterations)
+        elapsed, output = time_run(compile_program(template, args.iterations), args.repeat, args.compact)
+        print(f"{name:<12} {per_iteration:>9} {total:>14} {elapsed:>11.2f} {total / elapsed:>12,.0f}  {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+# code_generator.py
+from semantic_cube import Type, Operator
+from quadruples import OpCode, QuadrupleStore, BINARY_OPCODES, NO_OPERAND
+from ast_nodes import StringLiteral
+from constant_table import ConstantTable
+from virtual_memory import (AddressAllocator, TYPE_INDEX, TYPE_RANGE,
+                            GLOBAL_SEGMENT, LOCAL_SEGMENT, TEMP_SEGMENT, CONST_SEGMENT)
+
+
+class CompiledProgram:
+    """Everything the virtual machine needs to run a program."""
+
+    def __init__(self, name, quads, constants, functions, main_index, global_type_counts,
+                 constant_references=None):
+        self.name = name
+        self.quads = quads             # QuadrupleStore
+        self.constants = constants     # Constant pool: Type -> values of that type's const addresses, in address order
+        self.functions = functions     # Function directory: [FunctionEntry], indexed by ERA/GOSUB
+        self.main_index = main_index   # Index of the implicit 'main' entry, whose frame holds main's temps
+        self.global_type_counts = global_type_counts  # Type -> number of global addresses
+        self.constant_references = constant_references  # Literal occurrences the pool was interned from
+
+    @property
+    def global_count(self):
+        return sum(self.global_type_counts.values())
+
+    def __str__(self):
+        constant_count = sum(len(values) for values in self.constants.values())
+        header = f"Program {self.name}: {len(self.quads)} quads, {self.global_count} globals, {constant_count} constants"
+        if self.constant_references is not None:
+            header += f" (from {self.constant_references} literals)"
+        lines = [header]
+        for index, func in enumerate(self.functions):
+            lines.append(f"  [{index}] {func.name}: start {func.start_quad}, params {func.param_count}, "
+                         f"locals {func.param_count + func.local_var_count}, temps {func.temp_var_count} ({_type_counts(func.temp_type_counts)})")
+        lines.append("Constant pool:")
+        for type, values in self.constants.items():
+            base = CONST_SEGMENT + TYPE_INDEX[type] * TYPE_RANGE
+            lines.extend(f"  {base + offset}: {type.value} {value!r}" for offset, value in enumerate(values))
+        lines.append(str(self.quads))
+        return "\n".join(lines)
+
+
+def _type_counts(counts):
+    return ", ".join(f"{type.value} {count}" for type, count in counts.items() if count) or "none"
+
+
+class CodeGenerator:
+    """
+    Translates a semantically valid AST into quadruples. Runs after SemanticAnalyzer and reuses its
+    symbol table: variables get their virtual address, and every FunctionEntry its start_quad,
+    temp_var_count and per-type frame sizes. Addresses come from one AddressAllocator per
+    segment, so every address also encodes the type stored there (see virtual_memory). Expression
+    visitors return (address, Type) of the value they computed.
+    """
+
+    def __init__(self, symbol_table, semantic_cube):
+        self.symbol_table = symbol_table
+        self.semantic_cube = semantic_cube
+        self.quads = QuadrupleStore()
+        self.constants = ConstantTable()
+        self.function_index = {}
+        self.current_function = None
+        self.scopes = None # symbol_table.scopes(current_function), indexed by variable slots
+        self.globals = AddressAllocator(GLOBAL_SEGMENT)
+        self.locals = AddressAllocator(LOCAL_SEGMENT)
+        self.temps = AddressAllocator(TEMP_SEGMENT)
+
+    def generate(self, program):
+        functions = list(self.symbol_table.functions.values())
+        self.function_index = {func.name: index for index, func in enumerate(functions)}
+
+        for var in self.symbol_table.global_slots:
+            var.address = self.globals.allocate(var.type)
+
+        goto_main = self.quads.emit(OpCode.GOTO, line=program.main_line)
+        for function in program.functions:
+            self.generate_function(self.symbol_table.get_function(function.name), function.body)
+            self.quads.emit(OpCode.ENDFUNC, line=function.line)
+
+        self.quads.backpatch(goto_main, len(self.quads))
+        main_entry = self.symbol_table.get_function('main')
+        self.generate_function(main_entry, program.body)
+        self.quads.emit(OpCode.END, line=program.main_line)
+
+        return CompiledProgram(program.name, self.quads, self.constants.values, functions,
+                               self.function_index['main'], dict(self.globals.counts),
+                               self.constants.references)
+
+    def generate_function(self, func_entry, body):
+        self.locals.reset()
+        for var in func_entry.slots:
+            var.address = self.locals.allocate(var.type)
+        func_entry.local_type_counts = dict(self.locals.counts)
+        func_entry.start_quad = len(self.quads)
+        self.current_function = func_entry
+        self.scopes = self.symbol_table.scopes(func_entry)
+        self.temps.reset()
+        self.generate_body(body)
+        func_entry.temp_type_counts = dict(self.temps.counts)
+        func_entry.temp_var_count = self.temps.total
+
+    def generate_body(self, statements):
+        """Generates each statement, recording its line on the quads it emits."""
+        for statement in statements:
+            self.quads.line = statement.line
+            statement.accept(self)
+
+    # --- Operands ---
+
+    def new_temp(self, type):
+        return self.temps.allocate(type)
+
+    def constant(self, value, type):
+        return self.constants.address(value, type)
+
+    def variable(self, node):
+        """The VariableEntry of a Var or Assign node, by its slot."""
+        level, index = node.slot or self.symbol_table.slot_of(node, self.current_function)
+        return self.scopes[level][index]
+
+    def widen(self, address, value_type, target_type):
+        """Address holding the value converted to target_type (int values passed where a float is expected)."""
+        if value_type == Type.INT and target_type == Type.FLOAT:
+            temp = self.new_temp(Type.FLOAT)
+            self.quads.emit(OpCode.ITOF, address, NO_OPERAND, temp)
+            return temp
+        return address
+
+    # --- Statements ---
+
+    def visitAssign(self, node):
+        var = self.variable(node)
+        address, value_type = node.expr.accept(self)
+        if value_type == Type.INT and var.type == Type.FLOAT:
+            self.quads.emit(OpCode.ITOF, address, NO_OPERAND, var.address)
+        else:
+            self.quads.emit(OpCode.ASSIGN, address, NO_OPERAND, var.address)
+
+    def visitPrint(self, node):
+        last = len(node.args) - 1
+        for i, arg in enumerate(node.args):
+            if isinstance(arg, StringLiteral):
+                address = self.constant(arg.value, Type.STRING)
+            else:
+                address, _ = arg.accept(self)
+            self.quads.emit(OpCode.PRINT, address, NO_OPERAND, 1 if i == last else 0)
+
+    def visitIf(self, node):
+        condition, _ = node.condition.accept(self)
+        goto_false = self.quads.emit(OpCode.GOTOF, condition)
+        self.generate_body(node.then_body)
+        if node.else_body is not None:
+            goto_end = self.quads.emit(OpCode.GOTO, line=node.line)
+            self.quads.backpatch(goto_false, len(self.quads))
+            self.generate_body(node.else_body)
+            self.quads.backpatch(goto_end, len(self.quads))
+        else:
+            self.quads.backpatch(goto_false, len(self.quads))
+
+    def visitWhile(self, node):
+        loop_start = len(self.quads)
+        condition, _ = node.condition.accept(self)
+        goto_false = self.quads.emit(OpCode.GOTOF, condition)
+        self.generate_body(node.body)
+        self.quads.emit(OpCode.GOTO, NO_OPERAND, NO_OPERAND, loop_start, line=node.line)
+        self.quads.backpatch(goto_false, len(self.quads))
+
+    def visitCall(self, node):
+        func_entry = self.symbol_table.get_function(node.name)
+        index = self.function_index[node.name]
+        self.quads.emit(OpCode.ERA, NO_OPERAND, NO_OPERAND, index)
+        params = func_entry.slots
+        for k, arg in enumerate(node.args):
+            address, value_type = arg.accept(self)
+            address = self.widen(address, value_type, func_entry.param_types[k])
+            self.quads.emit(OpCode.PARAM, address, NO_OPERAND, params[k].address)
+        self.quads.emit(OpCode.GOSUB, NO_OPERAND, NO_OPERAND, index)
+
+    # --- Expressions ---
+
+    def visitBinaryOp(self, node):
+        left, left_type = node.left.accept(self)
+        right, right_type = node.right.accept(self)
+        result_type = self.semantic_cube.table[node.op.code][left_type.code][right_type.code]
+        temp = self.new_temp(result_type)
+        self.quads.emit(BINARY_OPCODES[node.op], left, right, temp)
+        return temp, result_type
+
+    def visitUnaryOp(self, node):
+        operand, operand_type = node.operand.accept(self)
+        if node.op == Operator.UNARY_PLUS:
+            return operand, operand_type
+        temp = self.new_temp(operand_type)
+        self.quads.emit(OpCode.NEG, operand, NO_OPERAND, temp)
+        return temp, operand_type
+
+    def visitParen(self, node):
+        return node.expr.accept(self)
+
+    def visitVar(self, node):
+        var = self.variable(node)
+        return var.address, var.type
+
+    def visitIntLiteral(self, node):
+        return self.constant(node.value, Type.INT), Type.INT
+
+    def visitFloatLiteral(self, node):
+        return self.constant(node.value, Type.FLOAT), Type.FLOAT
+
+    def visitBoolLiteral(self, node):
+        return self.constant(node.value, Type.BOOL), Type.BOOL
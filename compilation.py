@@ -0,0 +1,360 @@
+# compilation.py
+import time
+
+from antlr4 import CommonTokenStream, FileStream, InputStream, Token
+from antlr4.error.ErrorListener import ErrorListener
+from gen.LittleDuckLexer import LittleDuckLexer
+from gen.LittleDuckParser import LittleDuckParser
+from fast_lexer import FastLexer
+from mmap_stream import MmapCharStream, COPY_TEXT_FACTORY
+from two_stage_parser import parse_program
+from ast_builder import lower_program
+from semantic_analyzer import SemanticAnalyzer
+from constant_folder import ConstantFolder
+from code_generator import CodeGenerator
+from python_backend import PythonGenerator
+from optimizer import Optimizer
+from temp_allocator import TempAllocator
+from symbol_table import SymbolTable
+from semantic_cube import SemanticCube
+from analysis_cache import CachedAnalysis, hash_file, hash_source
+
+
+class Diagnostic:
+    """A lexical or syntax error reported by ANTLR. Each runner formats it in its own style."""
+    __slots__ = ('line', 'column', 'message')
+
+    def __init__(self, line, column, message):
+        self.line = line
+        self.column = column
+        self.message = message
+
+    def __repr__(self):
+        return f"Diagnostic({self.line}, {self.column}, {self.message!r})"
+
+
+class DiagnosticCollector(ErrorListener):
+    def __init__(self):
+        super().__init__()
+        self.diagnostics = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.diagnostics.append(Diagnostic(line, column, msg))
+
+
+class Compilation:
+    """
+    One source file travelling through the lexer, parser and SemanticAnalyzer.
+
+    Every phase runs lazily and at most once, and later phases reuse what earlier ones
+    produced: asking for tokens never runs the parser, the parser consumes the same token
+    buffer, and the parse tree is lowered once into the compact AST semantic analysis runs on.
+    Lowering releases the parse tree and token buffer. A lexer and parser can be passed
+    in to be reused across compilations (their DFA caches stay warm); they are reset and their
+    error listeners replaced.
+
+    With an AnalysisCache, analyze() first looks the source contents up in the cache; on a hit
+    the diagnostics and symbol table are restored from disk and no ANTLR stage runs. With a
+    FunctionCache (incremental=...) shared by successive compilations of an edited program,
+    semantic analysis only checks the functions whose text or dependencies changed.
+    """
+
+    def __init__(self, input_file=None, source=None, fast_lexer=False, use_mmap=False,
+                 lexer=None, parser=None, semantic_cube=None, parse_stats=None,
+                 lexer_listeners=(), parser_listeners=(), cache=None, fold=True,
+                 optimize=False, reuse_temps=True, incremental=None):
+        if (input_file is None) == (source is None):
+            raise ValueError("Compilation needs exactly one of input_file or source")
+        self.input_file = input_file
+        self.source = source
+        self.fast_lexer = fast_lexer
+        self.use_mmap = use_mmap
+        self.semantic_cube = semantic_cube if semantic_cube is not None else SemanticCube()
+        self.parse_stats = parse_stats
+        # Extra listeners notified next to the collectors, e.g. for verbose output
+        self.lexer_listeners = list(lexer_listeners)
+        self.parser_listeners = list(parser_listeners)
+        self.cache = cache
+        self.cache_hit = False
+        self.incremental = incremental
+        self.fold = fold
+        self.optimize = optimize
+        self.reuse_temps = reuse_temps
+        self.constant_table = None  # The ConstantTable the code was generated with, for its statistics
+        self.optimizer = None  # The Optimizer that ran, for its statistics
+        self.temp_allocator = None  # The TempAllocator that shrank the frames, for its report
+
+        self.timings = {'lex': 0.0, 'parse': 0.0, 'lower': 0.0, 'semantic': 0.0, 'codegen': 0.0}
+        self._lexer_errors = DiagnosticCollector()
+        self._parser_errors = DiagnosticCollector()
+
+        self._lexer = lexer
+        self._parser = parser
+        self._lexer_ready = False
+        self._token_stream = None
+        self._tokens_streamed = False
+        self._tree = None
+        self._ast = None
+        self._released = False # The parse tree and tokens were dropped once the AST was built
+        self._symbol_table = None
+        self._semantic_errors = None
+        self._code = None
+        self._folded = False
+        self._python = None
+
+    @property
+    def name(self):
+        return self.input_file if self.input_file is not None else "<string>"
+
+    # --- Lexing ---
+
+    def _open_char_stream(self):
+        if self.source is not None:
+            return InputStream(self.source)
+        if self.use_mmap:
+            return MmapCharStream(self.input_file, encoding='utf-8')
+        return FileStream(self.input_file, encoding='utf-8')
+
+    @property
+    def lexer(self):
+        if not self._lexer_ready:
+            input_stream = self._open_char_stream()
+            if self.fast_lexer:
+                self._lexer = FastLexer(input_stream)
+            elif self._lexer is None:
+                self._lexer = LittleDuckLexer(input_stream)
+            else:
+                self._lexer.inputStream = input_stream # Resets the reused lexer
+            if self.use_mmap and self.source is None:
+                # The stream drops consumed text, so every token must keep its own copy
+                self._lexer._factory = COPY_TEXT_FACTORY
+            self._lexer.removeErrorListeners()
+            self._lexer.addErrorListener(self._lexer_errors)
+            for listener in self.lexer_listeners:
+                self._lexer.addErrorListener(listener)
+            self._lexer_ready = True
+        return self._lexer
+
+    @property
+    def token_stream(self):
+        if self._released:
+            raise RuntimeError("The token buffer was released after lowering to the AST")
+        if self._tokens_streamed:
+            raise RuntimeError("Tokens were already consumed by stream_tokens(); create a new Compilation")
+        if self._token_stream is None:
+            self._token_stream = CommonTokenStream(self.lexer)
+        return self._token_stream
+
+    @property
+    def tokens(self):
+        """All tokens including EOF, lexed once into the buffer the parser will consume."""
+        stream = self.token_stream
+        if not stream.fetchedEOF:
+            start = time.perf_counter()
+            stream.fill()
+            self.timings['lex'] += time.perf_counter() - start
+        return stream.tokens
+
+    def stream_tokens(self):
+        """
+        Yields tokens (without EOF) as the lexer produces them, without buffering them. Meant
+        for token-only consumers of very large files: the compilation cannot be parsed afterwards.
+        """
+        if self._token_stream is not None:
+            yield from (t for t in self.tokens if t.type != Token.EOF)
+            return
+        lexer = self.lexer
+        self._tokens_streamed = True
+        token = lexer.nextToken()
+        while token.type != Token.EOF:
+            yield token
+            token = lexer.nextToken()
+
+    @property
+    def lex_errors(self):
+        return self._lexer_errors.diagnostics
+
+    # --- Parsing ---
+
+    @property
+    def parser(self):
+        if self._parser is None:
+            self._parser = LittleDuckParser(self.token_stream)
+        elif self._parser.getTokenStream() is not self.token_stream:
+            self._parser.setTokenStream(self.token_stream) # Resets the reused parser
+        return self._parser
+
+    @property
+    def tree(self):
+        if self._released:
+            raise RuntimeError("The parse tree was released after lowering to the AST")
+        if self._tree is None:
+            self.tokens # Lex first so the parse timing excludes lexing
+            parser = self.parser
+            parser.removeErrorListeners()
+            parser.addErrorListener(self._parser_errors)
+            for listener in self.parser_listeners:
+                parser.addErrorListener(listener)
+            start = time.perf_counter()
+            self._tree = parse_program(parser, self.parse_stats)
+            self.timings['parse'] = time.perf_counter() - start
+        return self._tree
+
+    @property
+    def syntax_errors(self):
+        if not self.cache_hit and not self._released:
+            self.tree
+        return self._parser_errors.diagnostics
+
+    @property
+    def has_syntax_errors(self):
+        """True if lexing or parsing reported errors; semantic analysis would be unreliable."""
+        return bool(self.syntax_errors or self.lex_errors)
+
+    # --- AST ---
+
+    @property
+    def ast(self):
+        """
+        The program lowered to ast_nodes. Only available for sources without lexical or syntax
+        errors. The parse tree and token buffer are released afterwards, so tree and tokens
+        can no longer be used.
+        """
+        if self._ast is None:
+            if self.has_syntax_errors:
+                raise RuntimeError(f"'{self.name}' has lexical or syntax errors and cannot be lowered to an AST")
+            tree = self.tree
+            start = time.perf_counter()
+            self._ast = lower_program(tree)
+            self.timings['lower'] = time.perf_counter() - start
+            self._release_parse_tree()
+        return self._ast
+
+    def _release_parse_tree(self):
+        self._tree = None
+        self._token_stream = None
+        if self._parser is not None:
+            self._parser.setTokenStream(None) # A reused parser would otherwise keep the tokens alive
+        self._released = True
+
+    # --- Semantic analysis ---
+
+    def _analyze(self):
+        program = self.ast
+        start = time.perf_counter()
+        self._symbol_table = SymbolTable()
+        if self.incremental is not None:
+            analyzer = self.incremental.analyzer(self._symbol_table, self.semantic_cube, self._source_text())
+        else:
+            analyzer = SemanticAnalyzer(self._symbol_table, self.semantic_cube)
+        self._semantic_errors = list(analyzer.visit(program))
+        self.timings['semantic'] = time.perf_counter() - start
+
+    def _source_text(self):
+        """The whole source as the lexer saw it, which the AST's character spans index into."""
+        if self.source is not None:
+            return self.source
+        # Like FileStream: decoded without newline translation
+        with open(self.input_file, encoding='utf-8', newline='') as f:
+            return f.read()
+
+    @property
+    def symbol_table(self):
+        if self._symbol_table is None:
+            self._analyze()
+        return self._symbol_table
+
+    @property
+    def semantic_errors(self):
+        if self._semantic_errors is None:
+            self._analyze()
+        return self._semantic_errors
+
+    # --- Code generation ---
+
+    @property
+    def code(self):
+        """
+        The program compiled to quadruples (a CompiledProgram). Requires an error-free analysis.
+        Unless the Compilation was created with fold=False, ConstantFolder first rewrites the AST;
+        with optimize=True the generated quadruples then go through the basic-block Optimizer.
+        Finally, unless reuse_temps=False, TempAllocator lets temps whose live ranges do not
+        overlap share frame slots.
+        """
+        if self._code is None:
+            if self.has_syntax_errors or self.semantic_errors:
+                raise RuntimeError(f"'{self.name}' has errors and cannot be compiled")
+            start = time.perf_counter()
+            program = self._folded_ast()
+            generator = CodeGenerator(self.symbol_table, self.semantic_cube)
+            self._code = generator.generate(program)
+            self.constant_table = generator.constants
+            self.timings['codegen'] = time.perf_counter() - start
+            if self.optimize:
+                start = time.perf_counter()
+                self.optimizer = Optimizer(self._code)
+                self.optimizer.optimize()
+                self.timings['optimize'] = time.perf_counter() - start
+            if self.reuse_temps:
+                start = time.perf_counter()
+                self.temp_allocator = TempAllocator(self._code)
+                self.temp_allocator.allocate()
+                self.timings['allocate'] = time.perf_counter() - start
+        return self._code
+
+    @property
+    def python(self):
+        """
+        The program translated by the Python backend (a python_backend.PythonProgram), from the
+        same folded AST the quadruples are generated from. Requires an error-free analysis.
+        """
+        if self._python is None:
+            if self.has_syntax_errors or self.semantic_errors:
+                raise RuntimeError(f"'{self.name}' has errors and cannot be compiled")
+            start = time.perf_counter()
+            program = self._folded_ast()
+            self._python = PythonGenerator(self.symbol_table, self.semantic_cube).generate(program)
+            self.timings['python'] = time.perf_counter() - start
+        return self._python
+
+    def _folded_ast(self):
+        """The AST, rewritten by ConstantFolder the first time unless fold=False."""
+        program = self.ast
+        if self.fold and not self._folded:
+            ConstantFolder(self.symbol_table, self.semantic_cube).fold(program)
+            self._folded = True
+        return program
+
+    # --- Whole pipeline ---
+
+    def analyze(self):
+        """
+        Runs every phase the way semantic_runner does: semantic analysis only runs when lexing
+        and parsing reported no errors. Returns self.
+        """
+        key = None
+        if self.cache is not None:
+            if self.source is not None:
+                key = hash_source(self.source.encode('utf-8'))
+            else:
+                key = hash_file(self.input_file)
+            cached = self.cache.load(key)
+            if cached is not None:
+                self._restore(cached)
+                return self
+
+        if not self.has_syntax_errors:
+            self.semantic_errors
+        if key is not None:
+            self.cache.store(key, CachedAnalysis(
+                [(d.line, d.column, d.message) for d in self.lex_errors],
+                [(d.line, d.column, d.message) for d in self.syntax_errors],
+                self._semantic_errors, self._symbol_table))
+        return self
+
+    def _restore(self, cached):
+        self.cache_hit = True
+        self._lexer_errors.diagnostics = [Diagnostic(*d) for d in cached.lex_errors]
+        self._parser_errors.diagnostics = [Diagnostic(*d) for d in cached.syntax_errors]
+        self._semantic_errors = cached.semantic_errors
+        self._symbol_table = cached.symbol_table
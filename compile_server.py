@@ -0,0 +1,416 @@
+# compile_server.py
+"""
+LittleDuck Compile Server
+-------------------------
+Long-lived analysis server for editors and build systems. One process keeps the ANTLR runtime
+imported, the parser with a warm DFA cache, the semantic cube and, per document, the AST and
+FunctionCache of its last analysis. When an edit stays inside one function, only that function
+is lexed, parsed and checked again; other requests cost one full analysis without the startup.
+
+Requests are JSON-RPC 2.0, one JSON object per line, over stdin/stdout or a Unix socket (any
+number of connections, sharing the warm state; requests are served one at a time). Responses
+go out one per line in the order requests arrive; notifications (requests without an id) get
+none.
+
+Methods:
+  analyze   {"text": str, "uri": str} or {"path": str}
+            -> {"diagnostics": [{"phase", "line", "column", "message"}], "parsed", "cached",
+                "reanalyzed", "ms"}
+            Lexical, syntax and semantic diagnostics, semantic only for syntactically valid input.
+            uri (or path) names the document whose previous analysis is reused incrementally;
+            parsed is "document", "function" (one edited function) or "none" (same text).
+  tokenize  {"text": str} or {"path": str}
+            -> {"tokens": [{"type", "line", "column", "text"}], "diagnostics": [...]}
+  stats     {} -> requests served, documents held, parse statistics, uptime
+  shutdown  {} -> null, then the server exits
+
+Usage:
+  python compile_server.py [--socket PATH] [--cache [DIR]] [--cache-size MB]
+
+Example:
+  echo '{"jsonrpc": "2.0", "id": 1, "method": "analyze", "params": {"path": "example_program.ld"}}' | python compile_server.py
+"""
+import sys
+import os
+import io
+import argparse
+import inspect
+import json
+import re
+import socketserver
+import threading
+import time
+
+from antlr4 import CommonTokenStream, Token
+from ast_builder import ASTBuilder
+from ast_nodes import Node
+from batch_runner import BatchCompiler
+from compilation import Compilation, DiagnosticCollector
+from fast_lexer import FastLexer
+from incremental_analysis import FunctionCache
+from symbol_table import SymbolTable
+from two_stage_parser import parse_sll
+from analysis_cache import AnalysisCache, DEFAULT_CACHE_DIR
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# Documents whose incremental analysis is kept; the least recently analyzed is dropped first
+MAX_DOCUMENTS = 64
+
+# SemanticAnalyzer.add_error formats every semantic diagnostic this way
+SEMANTIC_ERROR = re.compile(r"Error at Line (\d+):(\d+) - (.*)", re.S)
+
+
+class RequestError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def _diagnostic(phase, line, column, message):
+    return {'phase': phase, 'line': line, 'column': column, 'message': message}
+
+
+def _semantic_diagnostic(error):
+    match = SEMANTIC_ERROR.fullmatch(error)
+    if match is None:
+        return _diagnostic('semantic', 0, 0, error)
+    return _diagnostic('semantic', int(match.group(1)), int(match.group(2)), match.group(3))
+
+
+def compilation_diagnostics(compilation):
+    """Diagnostics of an analyzed Compilation, semantic ones only for syntactically valid input."""
+    diagnostics = ([_diagnostic('lexical', d.line, d.column, d.message) for d in compilation.lex_errors]
+                   + [_diagnostic('syntax', d.line, d.column, d.message) for d in compilation.syntax_errors])
+    if not compilation.has_syntax_errors:
+        diagnostics += [_semantic_diagnostic(error) for error in compilation.semantic_errors]
+    return diagnostics
+
+
+def bind_request(message, methods):
+    """The method a decoded JSON-RPC request names and its bound arguments; RequestError if invalid."""
+    if not isinstance(message, dict) or message.get('jsonrpc') != '2.0' or not isinstance(message.get('method'), str):
+        raise RequestError(INVALID_REQUEST, "Not a JSON-RPC 2.0 request")
+    method = methods.get(message['method'])
+    if method is None:
+        raise RequestError(METHOD_NOT_FOUND, f"Unknown method '{message['method']}'")
+    params = message.get('params', {})
+    if not isinstance(params, dict):
+        raise RequestError(INVALID_PARAMS, "params must be an object")
+    try:
+        return method, inspect.signature(method).bind(**params)
+    except TypeError as e: # Missing or unexpected parameters
+        raise RequestError(INVALID_PARAMS, str(e)) from None
+
+
+def error_response(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+def _common_prefix(a, b):
+    """Length of the longest common prefix of two strings, compared by slices."""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a, b, limit):
+    """Length of the longest common suffix of two strings, at most limit."""
+    low, high = 0, min(len(a), len(b), limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:len(a) - low] == b[len(b) - middle:len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _shift_lines(node, delta):
+    node.line += delta
+    for name in type(node).__slots__:
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            _shift_lines(value, delta)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, Node):
+                    _shift_lines(item, delta)
+
+
+class Document:
+    """
+    What the server keeps of one document between requests: the text of its last analysis, its
+    AST if that text had no lexical or syntax errors, and its FunctionCache.
+    """
+    __slots__ = ('text', 'program', 'functions')
+
+    def __init__(self):
+        self.text = None
+        self.program = None
+        self.functions = FunctionCache()
+
+
+class CompileServer(BatchCompiler):
+    """
+    Answers JSON-RPC requests with the reused lexer, parser and semantic cube of BatchCompiler.
+    handle() takes one decoded message and returns the response dict, or None for notifications.
+    """
+
+    def __init__(self, cache=None):
+        super().__init__(cache)
+        self.documents = {}  # uri -> Document, in least recently used order
+        self.requests = 0
+        self.started = time.time()
+        self.running = True
+        self.methods = {'analyze': self.analyze, 'tokenize': self.tokenize,
+                        'stats': self.stats, 'shutdown': self.shutdown}
+
+    def handle(self, message):
+        notification = isinstance(message, dict) and 'id' not in message
+        request_id = message.get('id') if isinstance(message, dict) else None
+        try:
+            method, bound = bind_request(message, self.methods)
+            self.requests += 1
+            result = method(*bound.args, **bound.kwargs)
+        except RequestError as e:
+            response = error_response(request_id, e.code, str(e))
+        except Exception as e:
+            response = error_response(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+        else:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        return None if notification else response
+
+    def handle_line(self, line):
+        """The response line (without newline) for one request line, or None."""
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            return json.dumps(error_response(None, PARSE_ERROR, f"Invalid JSON: {e}"))
+        response = self.handle(message)
+        return json.dumps(response) if response is not None else None
+
+    # --- Methods ---
+
+    @staticmethod
+    def _check_source(text, path):
+        if (text is None) == (path is None):
+            raise RequestError(INVALID_PARAMS, "Pass exactly one of text or path")
+        if path is not None and not os.path.isfile(path):
+            raise RequestError(INVALID_PARAMS, f"File '{path}' not found")
+
+    def _compilation(self, text, path, **options):
+        # FastLexer reports the same tokens and errors as the generated lexer, several times faster
+        return Compilation(input_file=path, source=text, fast_lexer=True, parser=self.parser,
+                           semantic_cube=self.semantic_cube, parse_stats=self.parse_stats, **options)
+
+    def document(self, uri):
+        document = self.documents.pop(uri, None) or Document()
+        self.documents[uri] = document
+        if len(self.documents) > MAX_DOCUMENTS:
+            del self.documents[next(iter(self.documents))]
+        return document
+
+    def analyze(self, text=None, path=None, uri=None):
+        start = time.perf_counter()
+        self._check_source(text, path)
+        uri = uri if uri is not None else path
+        document = self.document(uri) if uri is not None else None
+        source = text
+        if document is not None:
+            if source is None:
+                with open(path, encoding='utf-8', newline='') as f: # As the lexer would read it
+                    source = f.read()
+            program, parsed = self.reparse(document, source)
+            if program is not None:
+                symbol_table = SymbolTable()
+                analyzer = document.functions.analyzer(symbol_table, self.semantic_cube, source)
+                diagnostics = [_semantic_diagnostic(error) for error in analyzer.visit(program)]
+                return {'diagnostics': diagnostics, 'parsed': parsed, 'cached': False,
+                        'reanalyzed': document.functions.analyzed,
+                        'ms': round((time.perf_counter() - start) * 1000, 3)}
+
+        compilation = self._compilation(text, path, cache=self.cache,
+                                        incremental=document.functions if document is not None else None)
+        compilation.analyze()
+        diagnostics = compilation_diagnostics(compilation)
+        reanalyzed = None
+        if document is not None:
+            document.text = source
+            document.program = None
+            if not compilation.cache_hit and not compilation.has_syntax_errors:
+                document.program = compilation.ast
+                reanalyzed = document.functions.analyzed
+        return {'diagnostics': diagnostics, 'parsed': 'none' if compilation.cache_hit else 'document',
+                'cached': compilation.cache_hit, 'reanalyzed': reanalyzed,
+                'ms': round((time.perf_counter() - start) * 1000, 3)}
+
+    def reparse(self, document, text):
+        """
+        The AST of text built from the document's previous AST, and "none" or "function" for
+        what had to be parsed; (None, None) when the whole text must be parsed. Succeeds when
+        the text is unchanged, or when the edit lies inside one function, that function still
+        parses alone as a single error-free function, and nothing follows it on its last line.
+        """
+        old, program = document.text, document.program
+        if program is None:
+            return None, None
+        if text == old:
+            return program, 'none'
+
+        prefix = _common_prefix(old, text)
+        suffix = _common_suffix(old, text, min(len(old), len(text)) - prefix)
+        for index, function in enumerate(program.functions):
+            start, stop = function.span
+            if start <= prefix and len(old) - suffix <= stop + 1:
+                break
+        else:
+            return None, None
+        delta = len(text) - len(old)
+        new_stop = stop + delta
+        end_of_line = text.find('\n', new_stop + 1)
+        if text[new_stop + 1:end_of_line if end_of_line >= 0 else len(text)].strip():
+            return None, None
+
+        function = self._parse_function(text, start, new_stop)
+        if function is None:
+            return None, None
+        document.text = text
+        line_delta = text.count('\n', start, new_stop + 1) - old.count('\n', start, stop + 1)
+        program.functions[index] = function
+        for following in program.functions[index + 1:]:
+            following.span = (following.span[0] + delta, following.span[1] + delta)
+            if line_delta:
+                _shift_lines(following, line_delta)
+        program.main_span = (program.main_span[0] + delta, program.main_span[1] + delta)
+        if line_delta:
+            program.main_line += line_delta
+            for statement in program.body:
+                _shift_lines(statement, line_delta)
+        return program, 'function'
+
+    def _parse_function(self, text, start, stop):
+        """Lexes and parses text[start:stop + 1] as one function, or None if it is not exactly one valid function."""
+        lexer = FastLexer(text[start:stop + 1])
+        lexer_errors = DiagnosticCollector()
+        lexer.removeErrorListeners()
+        lexer.addErrorListener(lexer_errors)
+        stream = CommonTokenStream(lexer)
+        stream.fill()
+        if lexer_errors.diagnostics:
+            return None
+        # Positions as in the whole text: only the first line starts at a column other than 0
+        line = text.count('\n', 0, start)
+        column = start - (text.rfind('\n', 0, start) + 1)
+        for token in stream.tokens:
+            if token.line == 1:
+                token.column += column
+            token.line += line
+            token.start += start
+            token.stop += start
+
+        parser = self.parser
+        parser.setTokenStream(stream)
+        try:
+            tree = parse_sll(parser, parser.funcs)
+            if tree is None or parser.getCurrentToken().type != Token.EOF:
+                return None
+        finally:
+            parser.setTokenStream(None)
+        functions = ASTBuilder().lower_funcs(tree)
+        return functions[0] if len(functions) == 1 else None
+
+    def tokenize(self, text=None, path=None):
+        self._check_source(text, path)
+        compilation = self._compilation(text, path)
+        symbolic_names = compilation.lexer.symbolicNames
+        tokens = [{'type': symbolic_names[t.type], 'line': t.line, 'column': t.column, 'text': t.text}
+                  for t in compilation.tokens if t.type > 0]
+        return {'tokens': tokens,
+                'diagnostics': [_diagnostic('lexical', d.line, d.column, d.message) for d in compilation.lex_errors]}
+
+    def stats(self):
+        return {'requests': self.requests, 'documents': len(self.documents), 'parses': str(self.parse_stats),
+                'uptime': round(time.time() - self.started, 3)}
+
+    def shutdown(self):
+        self.running = False
+        return None
+
+
+# --- Transports ---
+
+def serve_stdio(server, stdin, stdout):
+    for line in iter(stdin.readline, ''):
+        if not line.strip():
+            continue
+        response = server.handle_line(line)
+        if response is not None:
+            stdout.write(response + '\n')
+            stdout.flush()
+        if not server.running:
+            break
+
+
+class _SocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server.compile_server
+        for raw in self.rfile:
+            if not raw.strip():
+                continue
+            with self.server.lock: # One shared lexer and parser: requests run one at a time
+                response = server.handle_line(raw.decode('utf-8'))
+            if response is not None:
+                self.wfile.write(response.encode('utf-8') + b'\n')
+            if not server.running:
+                threading.Thread(target=self.server.shutdown).start()
+                break
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve_socket(server, path):
+    if os.path.exists(path):
+        os.unlink(path) # A stale socket left by a server that did not exit cleanly
+    with _UnixServer(path, _SocketHandler) as socket_server:
+        socket_server.compile_server = server
+        socket_server.lock = threading.Lock()
+        try:
+            socket_server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+def main(argv):
+    arg_parser = argparse.ArgumentParser(description="LittleDuck analysis server (JSON-RPC 2.0, one message per line)")
+    arg_parser.add_argument("--socket", metavar="PATH", help="Listen on a Unix socket instead of stdin/stdout")
+    arg_parser.add_argument("--cache", nargs='?', const=DEFAULT_CACHE_DIR, metavar="DIR",
+                            help="Reuse results of unchanged sources from this cache directory")
+    arg_parser.add_argument("--cache-size", type=float, default=64, metavar="MB",
+                            help="Cache size cap before least recently used entries are evicted")
+    args = arg_parser.parse_args(argv[1:])
+
+    cache = AnalysisCache(args.cache, int(args.cache_size * 1024 * 1024)) if args.cache else None
+    server = CompileServer(cache)
+    server.warm_up()
+    if args.socket is not None:
+        serve_socket(server, args.socket)
+    else:
+        serve_stdio(server, io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8'), sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,167 @@
+# constant_folder.py
+import operator
+
+from semantic_cube import Type, Operator
+from ast_nodes import UnaryOp, IntLiteral, FloatLiteral, BoolLiteral, StringLiteral
+
+# Python operator computing each binary semantic_cube.Operator exactly as the virtual machine does
+EVALUATORS = {
+    Operator.PLUS: operator.add, Operator.MINUS: operator.sub,
+    Operator.MULT: operator.mul, Operator.DIV: operator.truediv,
+    Operator.LESS: operator.lt, Operator.GREATER: operator.gt,
+    Operator.EQUAL: operator.eq, Operator.NOT_EQUAL: operator.ne,
+}
+
+LITERAL_NODES = {Type.INT: IntLiteral, Type.FLOAT: FloatLiteral, Type.BOOL: BoolLiteral}
+
+
+def is_literal(node, value=None):
+    if not isinstance(node, (IntLiteral, FloatLiteral, BoolLiteral)):
+        return False
+    return value is None or (node.value == value and type(node.value) is not bool)
+
+
+class ConstantFolder:
+    """
+    Rewrites the expressions of a semantically valid AST in place before code generation.
+    Operations whose operands are all literals are evaluated at compile time, typed by
+    SemanticCube (int / int folds to a float), and parentheses and identities are dropped:
+
+        x * 1, 1 * x, x / 1.0  ->  x       x + 0, 0 + x, x - 0  ->  x
+        x * 0, 0 * x (int)     ->  0       -(-x), +x            ->  x
+
+    An identity only applies when the kept operand already has the result type (x * 1.0 with an
+    int x stays a multiplication), and float additions of 0 are kept because -0.0 + 0 is 0.0.
+    Divisions by a literal zero and operations whose ints overflow a float are left for the
+    virtual machine to report. Expression visitors return (node, Type) of the rewritten
+    expression.
+    """
+
+    def __init__(self, symbol_table, semantic_cube):
+        self.symbol_table = symbol_table
+        self.semantic_cube = semantic_cube
+        self.scope = None  # FunctionEntry whose body is being folded
+        self.scopes = None # symbol_table.scopes(scope), indexed by variable slots
+        self.folded = 0      # Operations evaluated at compile time
+        self.simplified = 0  # Operations removed by an identity
+
+    def fold(self, program):
+        for function in program.functions:
+            self.enter(self.symbol_table.get_function(function.name))
+            self.fold_body(function.body)
+        self.enter(self.symbol_table.get_function('main'))
+        self.fold_body(program.body)
+        self.scope = self.scopes = None
+        return program
+
+    def enter(self, func_entry):
+        self.scope = func_entry
+        self.scopes = self.symbol_table.scopes(func_entry)
+
+    def fold_body(self, statements):
+        for statement in statements:
+            statement.accept(self)
+
+    def fold_expression(self, expr):
+        node, _ = expr.accept(self)
+        return node
+
+    # --- Statements ---
+
+    def visitAssign(self, node):
+        node.expr = self.fold_expression(node.expr)
+
+    def visitIf(self, node):
+        node.condition = self.fold_expression(node.condition)
+        self.fold_body(node.then_body)
+        if node.else_body is not None:
+            self.fold_body(node.else_body)
+
+    def visitWhile(self, node):
+        node.condition = self.fold_expression(node.condition)
+        self.fold_body(node.body)
+
+    def visitCall(self, node):
+        node.args = [self.fold_expression(arg) for arg in node.args]
+
+    def visitPrint(self, node):
+        node.args = [arg if isinstance(arg, StringLiteral) else self.fold_expression(arg)
+                     for arg in node.args]
+
+    # --- Expressions ---
+
+    def visitBinaryOp(self, node):
+        left, left_type = node.left.accept(self)
+        right, right_type = node.right.accept(self)
+        op = node.op
+        result_type = self.semantic_cube.table[op.code][left_type.code][right_type.code]
+
+        if is_literal(left) and is_literal(right) and not (op == Operator.DIV and right.value == 0):
+            try:
+                folded = LITERAL_NODES[result_type](EVALUATORS[op](left.value, right.value), node.line, node.column)
+            except OverflowError: # An int too large for a float: left for the virtual machine to report
+                pass
+            else:
+                self.folded += 1
+                return folded, result_type
+
+        simplified = self.simplify(op, left, left_type, right, right_type, result_type)
+        if simplified is not None:
+            self.simplified += 1
+            return simplified, result_type
+
+        node.left = left
+        node.right = right
+        return node, result_type
+
+    def simplify(self, op, left, left_type, right, right_type, result_type):
+        """The node the operation reduces to by an identity, or None."""
+        if op == Operator.MULT:
+            if is_literal(right, 1) and left_type == result_type:
+                return left
+            if is_literal(left, 1) and right_type == result_type:
+                return right
+            if result_type == Type.INT and (is_literal(right, 0) or is_literal(left, 0)):
+                return IntLiteral(0, left.line, left.column)
+        elif op == Operator.PLUS and result_type == Type.INT:
+            if is_literal(right, 0):
+                return left
+            if is_literal(left, 0):
+                return right
+        elif op == Operator.MINUS:
+            if is_literal(right, 0) and left_type == result_type:
+                return left
+        elif op == Operator.DIV:
+            if is_literal(right, 1) and left_type == result_type:
+                return left
+        return None
+
+    def visitUnaryOp(self, node):
+        operand, operand_type = node.operand.accept(self)
+        if node.op == Operator.UNARY_PLUS:
+            self.simplified += 1
+            return operand, operand_type
+        if is_literal(operand):
+            self.folded += 1
+            return LITERAL_NODES[operand_type](-operand.value, node.line, node.column), operand_type
+        if isinstance(operand, UnaryOp) and operand.op == Operator.UNARY_MINUS:
+            self.simplified += 1
+            return operand.operand, operand_type
+        node.operand = operand
+        return node, operand_type
+
+    def visitParen(self, node):
+        return node.expr.accept(self)
+
+    def visitVar(self, node):
+        level, index = node.slot or self.symbol_table.slot_of(node, self.scope)
+        return node, self.scopes[level][index].type
+
+    def visitIntLiteral(self, node):
+        return node, Type.INT
+
+    def visitFloatLiteral(self, node):
+        return node, Type.FLOAT
+
+    def visitBoolLiteral(self, node):
+        return node, Type.BOOL
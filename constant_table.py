@@ -0,0 +1,52 @@
+# constant_table.py
+from semantic_cube import Type
+from virtual_memory import MEMORY_TYPES, AddressAllocator, CONST_SEGMENT
+
+
+class ConstantTable:
+    """
+    Interned constant pool: every distinct (type, value) gets exactly one address in the const
+    segment, however many times the literal appears. values holds, per type, the pool in address
+    order, which is what the virtual machine loads at startup.
+    """
+
+    def __init__(self):
+        self.allocator = AddressAllocator(CONST_SEGMENT)
+        self.values = {type: [] for type in MEMORY_TYPES}
+        self.addresses = {}
+        self.references = 0
+
+    @staticmethod
+    def _key(value, type):
+        # Floats are keyed by their exact bits, so 0.0 and -0.0 stay distinct
+        if type == Type.FLOAT:
+            return type, float(value).hex()
+        return type, value
+
+    def address(self, value, type):
+        """Const address holding value, allocated the first time the pair is seen."""
+        self.references += 1
+        key = self._key(value, type)
+        address = self.addresses.get(key)
+        if address is None:
+            address = self.allocator.allocate(type)
+            self.values[type].append(value)
+            self.addresses[key] = address
+        return address
+
+    def __len__(self):
+        return len(self.addresses)
+
+    def stats(self):
+        distinct = len(self.addresses)
+        saved = self.references - distinct
+        percent = 100.0 * saved / self.references if self.references else 0.0
+        return f"{distinct} constants for {self.references} literals ({saved} deduplicated, {percent:.1f}%)"
+
+
+# Example usage:
+if __name__ == '__main__':
+    table = ConstantTable()
+    for value, type in [(10, Type.INT), (10, Type.INT), (10.0, Type.FLOAT), ("x:", Type.STRING), (10, Type.INT)]:
+        print(f"{type.value} {value!r} -> {table.address(value, type)}")
+    print(table.stats())
@@ -0,0 +1,169 @@
+# fast_lexer.py
+import io
+import re
+
+from antlr4.Token import Token, CommonToken
+from antlr4.CommonTokenFactory import CommonTokenFactory
+from antlr4.error.ErrorListener import ConsoleErrorListener, ProxyErrorListener
+from gen.LittleDuckLexer import LittleDuckLexer
+
+# Every fixed token of the grammar (keywords, delimiters and operators) keyed by its text.
+# Derived from the generated lexer so token types can never drift from LittleDuck.g4.
+LITERAL_TYPES = {
+    literal[1:-1]: token_type
+    for token_type, literal in enumerate(LittleDuckLexer.literalNames)
+    if literal.startswith("'")
+}
+
+# One alternative per lexer rule family, each preceded by the WS rule so skipped whitespace
+# never costs a separate match. The last alternative reproduces what the ANTLR lexer consumes
+# before reporting a token recognition error: everything up to and including the first
+# character that cannot extend a token (an unterminated string stops at the end of the line,
+# a lone '!' takes the character after it).
+_WORD, _FLOAT, _INT, _STR, _PUNCT, _ERROR = range(1, 7)
+_TOKEN_RE = re.compile(r"""
+    [ \t\r\n]*
+    (?:
+         ([a-zA-Z][a-zA-Z0-9_]*)            # ID or keyword
+        |([0-9]+\.[0-9]+)                   # CTE_FLOAT
+        |([0-9]+)                           # CTE_INT
+        |("[^"\n\r]*")                      # CTE_STR
+        |(==|!=|[;,:{}()\[\]=<>+\-*/])      # delimiters and operators
+        |("[^"\n\r]*[\n\r]?|![\s\S]?|[^ \t\r\n])  # token recognition error
+    )
+""", re.VERBOSE)
+
+_GROUP_TYPES = {
+    _FLOAT: LittleDuckLexer.CTE_FLOAT,
+    _INT: LittleDuckLexer.CTE_INT,
+    _STR: LittleDuckLexer.CTE_STR,
+}
+
+
+class FastToken(CommonToken):
+    """CommonToken with a single-step constructor; the lexer already knows every field."""
+    __slots__ = ()
+
+    def __init__(self, source, type, start, stop, line, column, text):
+        self.source = source
+        self.type = type
+        self.channel = Token.DEFAULT_CHANNEL
+        self.start = start
+        self.stop = stop
+        self.tokenIndex = -1
+        self.line = line
+        self.column = column
+        self._text = text
+
+
+class FastLexer:
+    """
+    Drop-in replacement for the generated LittleDuckLexer backed by a single compiled regex.
+    Produces the same token types, line/column positions and lexical error messages, so it can
+    feed a CommonTokenStream and LittleDuckParser unchanged.
+    """
+
+    symbolicNames = LittleDuckLexer.symbolicNames
+    literalNames = LittleDuckLexer.literalNames
+    ruleNames = LittleDuckLexer.ruleNames
+
+    def __init__(self, input, source_name=None):
+        # Accepts plain source text, an MmapCharStream (read line by line as it is decoded)
+        # or any other ANTLR InputStream (FileStream, InputStream).
+        if isinstance(input, str):
+            self._source = input
+            self.sourceName = source_name or "<string>"
+        else:
+            self._source = input if hasattr(input, 'lines') else str(input)
+            self.sourceName = source_name or getattr(input, 'fileName', None) or "<unknown>"
+        self._factory = CommonTokenFactory.DEFAULT
+        self._tokenFactorySourcePair = (self, None)
+        self._listeners = [ConsoleErrorListener.INSTANCE]
+        self.reset()
+
+    def reset(self):
+        self.line = 1
+        self.column = 0
+        self._tokens = self._scan()
+
+    # --- Error listener API (mirrors antlr4.Recognizer) ---
+
+    def addErrorListener(self, listener):
+        self._listeners.append(listener)
+
+    def removeErrorListener(self, listener):
+        self._listeners.remove(listener)
+
+    def removeErrorListeners(self):
+        self._listeners = []
+
+    def getErrorListenerDispatch(self):
+        return ProxyErrorListener(self._listeners)
+
+    def getSourceName(self):
+        return self.sourceName
+
+    # --- Token source API ---
+
+    def nextToken(self):
+        return next(self._tokens)
+
+    def getAllTokens(self):
+        tokens = []
+        t = self.nextToken()
+        while t.type != Token.EOF:
+            tokens.append(t)
+            t = self.nextToken()
+        return tokens
+
+    def _lines(self):
+        if not isinstance(self._source, str):
+            return self._source.lines()
+        # '\n' is the only line terminator ANTLR counts, so lines are split on it alone.
+        return io.StringIO(self._source, newline='\n')
+
+    def _scan(self):
+        pair = self._tokenFactorySourcePair
+        finditer = _TOKEN_RE.finditer
+        literal_types = LITERAL_TYPES
+        group_types = _GROUP_TYPES
+        id_type = LittleDuckLexer.ID
+
+        line_no = 1
+        offset = 0
+        column = 0
+        for line in self._lines():
+            for m in finditer(line):
+                kind = m.lastindex
+                start = m.start(kind)
+                text = m.group(kind)
+                if kind == _WORD:
+                    token_type = literal_types.get(text, id_type)
+                elif kind == _PUNCT:
+                    token_type = literal_types[text]
+                elif kind == _ERROR:
+                    self._report_error(line_no, start, text)
+                    continue
+                else:
+                    token_type = group_types[kind]
+                yield FastToken(pair, token_type, offset + start, offset + m.end() - 1, line_no, start, text)
+
+            offset += len(line)
+            if line.endswith('\n'):
+                line_no += 1
+                column = 0
+            else:
+                column = len(line)
+
+        self.line = line_no
+        self.column = column
+        while True:
+            yield FastToken(pair, Token.EOF, offset, offset - 1, line_no, column, "<EOF>")
+
+    def _report_error(self, line, column, text):
+        msg = "token recognition error at: '" + self.getErrorDisplay(text) + "'"
+        for listener in self._listeners:
+            listener.syntaxError(self, None, line, column, msg, None)
+
+    def getErrorDisplay(self, s):
+        return s.replace('\n', '\\n').replace('\t', '\\t').replace('\r', '\\r')
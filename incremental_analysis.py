@@ -0,0 +1,164 @@
+# incremental_analysis.py
+from semantic_analyzer import SemanticAnalyzer
+
+
+def signature_of(func_entry):
+    """What a call can observe of a function: its parameter names and types, or None if it is not declared."""
+    if func_entry is None:
+        return None
+    return tuple(func_entry.param_names), tuple(func_entry.param_types)
+
+
+class _CachedBody:
+    """
+    The analysis of one function (or of main): its FunctionEntry, its diagnostics with lines
+    relative to the definition, and what it read from outside its own text, i.e. the type of
+    every global it names (None if undeclared) and the signature of every function it calls.
+    """
+    __slots__ = ('entry', 'errors', 'globals', 'callees')
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.errors = []   # [(line offset, column, message)]
+        self.globals = {}  # name -> Type or None
+        self.callees = {}  # name -> signature_of(...)
+
+
+class FunctionCache:
+    """
+    Analysis results of the functions of one program being edited, kept across compilations
+    (pass the same FunctionCache as Compilation(incremental=...)). Each function is keyed by its
+    exact source text, from 'void' to the closing ';', and the column it starts at, so moving
+    a function to other lines keeps its entry; main is keyed the same way. Entries not used by
+    the latest analysis are dropped.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.reused = 0    # Bodies taken from the cache by the latest analysis
+        self.analyzed = 0  # Bodies checked again by the latest analysis
+
+    def analyzer(self, symbol_table, semantic_cube, source_text):
+        """A SemanticAnalyzer for one compilation of the program whose text is source_text."""
+        return IncrementalAnalyzer(self, symbol_table, semantic_cube, source_text)
+
+    def stats(self):
+        return f"{self.reused} bodies reused, {self.analyzed} analyzed"
+
+
+class IncrementalAnalyzer(SemanticAnalyzer):
+    """
+    SemanticAnalyzer that reuses a FunctionCache. A function is analyzed again only when its
+    text changed, or when a global it names or the signature of a function it calls (as seen
+    at its position in the program) is no longer what it was; otherwise a copy of its cached
+    FunctionEntry goes into the symbol table and its diagnostics are reported at the current
+    lines. Global declarations and the program-level checks always run, and their cost does
+    not depend on the size of the functions.
+    """
+
+    def __init__(self, cache, symbol_table, semantic_cube, source_text):
+        super().__init__(symbol_table, semantic_cube)
+        self.cache = cache
+        self.source_text = source_text
+        self.used = {}
+        self.recording = None  # _CachedBody being filled by the body under analysis
+
+    def visitProgram(self, node):
+        self.cache.reused = self.cache.analyzed = 0
+        errors = super().visitProgram(node)
+        self.cache.entries = self.used
+        return errors
+
+    def visitFunction(self, node):
+        key = self.key_of(node.span, node.column)
+        if key is None or self.symbol_table.get_function(node.name):
+            return super().visitFunction(node) # Redeclarations report their error and stop there
+        cached = self.cache.entries.get(key)
+        if cached is not None:
+            # Entered first, so recursive calls see the function's own signature
+            self.symbol_table.functions[node.name] = cached.entry.copy()
+            if self.still_valid(cached):
+                self.reuse(key, cached, node.line)
+                return None
+            del self.symbol_table.functions[node.name]
+
+        self.recording = _CachedBody(None)
+        super().visitFunction(node)
+        self.recording.entry = self.symbol_table.get_function(node.name).copy()
+        self.store(key, node.line)
+        return None
+
+    def visit_main(self, node):
+        key = self.key_of(node.main_span, node.main_column)
+        if key is None:
+            return super().visit_main(node)
+        # A user-defined 'main' function gives main's body its variables
+        scope = self.symbol_table.get_function('main')
+        key += (scope.param_count,) + tuple((name, var.type) for name, var in scope.variables.items())
+        cached = self.cache.entries.get(key)
+        if cached is not None and self.still_valid(cached):
+            self.reuse(key, cached, node.main_line)
+            return None
+
+        self.recording = _CachedBody(None)
+        super().visit_main(node)
+        self.store(key, node.main_line)
+        return None
+
+    def key_of(self, span, column):
+        if span is None or self.source_text is None:
+            return None
+        start, stop = span
+        return column, self.source_text[start:stop + 1]
+
+    def still_valid(self, cached):
+        global_vars = self.symbol_table.global_vars
+        for name, type in cached.globals.items():
+            var = global_vars.get(name)
+            if (var.type if var is not None else None) != type:
+                return False
+        get_function = self.symbol_table.get_function
+        for name, signature in cached.callees.items():
+            if signature_of(get_function(name)) != signature:
+                return False
+        return True
+
+    def reuse(self, key, cached, line):
+        for offset, column, message in cached.errors:
+            self.add_error(message, line + offset, column)
+        self.used[key] = cached
+        self.cache.reused += 1
+
+    def store(self, key, line):
+        recording, self.recording = self.recording, None
+        recording.errors = [(error_line - line, column, message) for error_line, column, message in recording.errors]
+        self.used[key] = recording
+        self.cache.analyzed += 1
+
+    # --- Recording what a body reads from outside its text ---
+
+    def add_error(self, message, line, column):
+        super().add_error(message, line, column)
+        if self.recording is not None:
+            self.recording.errors.append((line, column, message))
+
+    def note_name(self, name):
+        if self.recording is None:
+            return
+        scope = self.current_scope
+        if scope is None or name not in scope.variables:
+            var = self.symbol_table.get_global_variable(name)
+            self.recording.globals[name] = var.type if var is not None else None
+
+    def visitAssign(self, node):
+        self.note_name(node.name)
+        return super().visitAssign(node)
+
+    def visitVar(self, node):
+        self.note_name(node.name)
+        return super().visitVar(node)
+
+    def visitCall(self, node):
+        if self.recording is not None:
+            self.recording.callees[node.name] = signature_of(self.symbol_table.get_function(node.name))
+        return super().visitCall(node)
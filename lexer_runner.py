@@ -5,7 +5,11 @@ Este script ejecuta el analizador léxico generado por ANTLR para tokenizar arch
 fuente escritos en el lenguaje LittleDuck.
 
 Uso:
-  python lexer_runner.py <archivo_entrada>
+  python lexer_runner.py <archivo_entrada> [--fast-lexer] [--mmap]
+
+Opciones:
+  --fast-lexer : Usa el lexer nativo basado en expresiones regulares (fast_lexer.FastLexer)
+  --mmap       : Lee el archivo con mmap y lo decodifica por bloques (memoria constante)
 """
 
 import sys
@@ -14,50 +18,27 @@ import io
 
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-from antlr4 import *
-from gen.LittleDuckLexer import LittleDuckLexer
-from antlr4.error.ErrorListener import ErrorListener
-
-
-# Listener personalizado para errores léxicos
-class LexicalErrorListener(ErrorListener):
-    def __init__(self):
-        super().__init__()
-        self.errors = []
+from compilation import Compilation
 
-    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-        self.errors.append(f"Línea {line}:{column} - {msg}")
 
-    def getErrorCount(self):
-        return len(self.errors)
+def format_lex_error(diagnostic):
+    return f"Línea {diagnostic.line}:{diagnostic.column} - {diagnostic.message}"
 
-    def getErrors(self):
-        return self.errors
 
-
-def tokenize_file(input_file):
+def tokenize_file(input_file, fast_lexer=False, use_mmap=False):
     """
     Analiza un archivo de entrada y muestra todos los tokens identificados.
 
     Args:
         input_file (str): Ruta al archivo que se va a analizar
+        fast_lexer (bool): Si es True, usa FastLexer en lugar del lexer generado por ANTLR
+        use_mmap (bool): Si es True, lee el archivo con MmapCharStream en lugar de FileStream
     """
     print(f"Analizando archivo: {input_file}\n")
 
-    # Crear un stream de caracteres a partir del archivo
-    input_stream = FileStream(input_file, encoding='utf-8')
-
-    # Crear el lexer
-    lexer = LittleDuckLexer(input_stream)
-
-    # Agregar listener personalizado para capturar errores léxicos
-    error_listener = LexicalErrorListener()
-    lexer.removeErrorListeners()  # Quitar los listeners por defecto
-    lexer.addErrorListener(error_listener)
-
-    # Obtener todos los tokens
-    token_stream = CommonTokenStream(lexer)
-    token_stream.fill()
+    # Solo se ejecuta la fase léxica; el parser nunca se construye
+    compilation = Compilation(input_file, fast_lexer=fast_lexer, use_mmap=use_mmap)
+    symbolic_names = compilation.lexer.symbolicNames
 
     # Imprimir información de tokens
     print("TOKENS ENCONTRADOS:")
@@ -69,13 +50,10 @@ def tokenize_file(input_file):
     token_count = 0
     token_types = {}
 
-    for token in token_stream.tokens:
-        # Ignorar el token EOF
-        if token.type == Token.EOF:
-            continue
-
+    # Procesar los tokens a medida que el lexer los produce, sin guardarlos en memoria
+    for token in compilation.stream_tokens():
         # Obtener el nombre del tipo de token
-        token_type_name = lexer.symbolicNames[token.type]
+        token_type_name = symbolic_names[token.type]
 
         # Actualizar estadísticas
         token_count += 1
@@ -92,10 +70,10 @@ def tokenize_file(input_file):
         print(f"  {token_type}: {count}")
 
     # Verificar si hubo errores léxicos
-    if error_listener.getErrorCount() > 0:
+    if compilation.lex_errors:
         print("\nERRORES LÉXICOS DETECTADOS:")
-        for err in error_listener.getErrors():
-            print(" -", err)
+        for err in compilation.lex_errors:
+            print(" -", format_lex_error(err))
     else:
         print("\nAnálisis léxico completado exitosamente. No se encontraron errores.")
 
@@ -104,8 +82,8 @@ def main():
     """
     Función principal que procesa argumentos de línea de comandos
     """
-    if len(sys.argv) != 2:
-        print("Uso: python lexer_runner.py <archivo_entrada>")
+    if len(sys.argv) < 2:
+        print("Uso: python lexer_runner.py <archivo_entrada> [--fast-lexer] [--mmap]")
         sys.exit(1)
 
     input_file = sys.argv[1]
@@ -114,7 +92,10 @@ def main():
         print(f"Error: El archivo '{input_file}' no existe.")
         sys.exit(1)
 
-    tokenize_file(input_file)
+    fast_lexer = "--fast-lexer" in sys.argv
+    use_mmap = "--mmap" in sys.argv
+
+    tokenize_file(input_file, fast_lexer, use_mmap)
 
 
 if __name__ == '__main__':
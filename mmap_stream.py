@@ -0,0 +1,193 @@
+# mmap_stream.py
+import codecs
+import mmap
+import os
+
+from antlr4.Token import Token
+from antlr4.CommonTokenFactory import CommonTokenFactory
+
+
+class CopyTextTokenFactory(CommonTokenFactory):
+    """
+    Token factory that copies each token's text when the token is created. Tokens lexed from an
+    MmapCharStream need it because the window that backs getText() is discarded as the lexer
+    advances. EOF keeps the '<EOF>' text CommonToken would otherwise compute lazily.
+    """
+
+    def __init__(self):
+        super().__init__(copyText=True)
+
+    def create(self, source, type, text, channel, start, stop, line, column):
+        if text is None and type == Token.EOF:
+            text = "<EOF>"
+        return super().create(source, type, text, channel, start, stop, line, column)
+
+
+# Install as the lexer's token factory (lexer._factory) when it reads from an MmapCharStream.
+COPY_TEXT_FACTORY = CopyTextTokenFactory()
+
+
+class MmapCharStream:
+    """
+    ANTLR character stream over a memory-mapped source file.
+
+    Bytes are decoded incrementally in chunks of chunk_size and only a sliding window of
+    decoded text is kept in memory: everything before the current position (or the oldest
+    outstanding mark, which the lexer holds for the token being matched) is dropped once a
+    new chunk is needed. Peak memory therefore depends on the chunk size and the longest
+    token, not on the file size. The total size in chars is known once the end of the file has
+    been decoded; asked for earlier, it is counted in a separate decoding pass.
+    """
+
+    def __init__(self, file_name, encoding='utf-8', chunk_size=64 * 1024):
+        self.name = file_name
+        self.fileName = file_name
+        self._chunk_size = chunk_size
+        self._file = open(file_name, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap refuses zero-length files; an empty source simply has no chunks.
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._byte_size = size
+        self._encoding = encoding
+        self._size = None  # Chars in the file, once known
+        self.reset()
+
+    def reset(self):
+        self._decoder = codecs.getincrementaldecoder(self._encoding)()
+        self._byte_pos = 0
+        self._window = ''
+        self._window_start = 0  # Absolute char index of self._window[0]
+        self._index = 0
+        self._marks = 0
+        self._mark_index = 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # --- Incremental decoding ---
+
+    def _next_chunk(self):
+        """Decodes and returns the next chunk of text, or None once the file is exhausted."""
+        if self._byte_pos >= self._byte_size:
+            return None
+        end = min(self._byte_pos + self._chunk_size, self._byte_size)
+        data = self._map[self._byte_pos:end]
+        self._byte_pos = end
+        return self._decoder.decode(data, final=end == self._byte_size)
+
+    def _count_chars(self):
+        """Chars in the whole file, decoded chunk by chunk without touching the window."""
+        decoder = codecs.getincrementaldecoder(self._encoding)()
+        count = 0
+        for start in range(0, self._byte_size, self._chunk_size):
+            end = min(start + self._chunk_size, self._byte_size)
+            count += len(decoder.decode(self._map[start:end], final=end == self._byte_size))
+        return count
+
+    def _fill(self, pos):
+        """
+        Extends the window until absolute char index pos is available. Returns False if the
+        file ends first.
+        """
+        while pos >= self._window_start + len(self._window):
+            chunk = self._next_chunk()
+            if chunk is None:
+                return False
+            # Keep one char behind the current position so LA(-1) stays valid.
+            keep_from = min(self._index, self._mark_index) if self._marks else self._index
+            keep_from = max(keep_from - 1, self._window_start)
+            self._window = self._window[keep_from - self._window_start:] + chunk
+            self._window_start = keep_from
+        return True
+
+    def lines(self):
+        """
+        Yields the source one line at a time ('\\n' included) as it is decoded, for consumers
+        that do not need random access (FastLexer).
+        """
+        pending = ''
+        chunk = self._next_chunk()
+        while chunk is not None:
+            parts = (pending + chunk).split('\n')
+            pending = parts.pop()
+            for line in parts:
+                yield line + '\n'
+            chunk = self._next_chunk()
+        if pending:
+            yield pending
+
+    # --- antlr4 CharStream API ---
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def size(self):
+        if self._size is None:
+            if self._byte_pos >= self._byte_size:
+                self._size = self._window_start + len(self._window)
+            else:
+                self._size = self._count_chars()
+        return self._size
+
+    def consume(self):
+        if self.LA(1) == Token.EOF:
+            raise Exception("cannot consume EOF")
+        self._index += 1
+
+    def LA(self, offset):
+        if offset == 0:
+            return 0  # undefined
+        if offset < 0:
+            offset += 1  # e.g., translate LA(-1) to use offset=0
+        pos = self._index + offset - 1
+        rel = pos - self._window_start
+        if rel < 0:
+            raise IndexError(f"Char index {pos} is no longer buffered")
+        if rel >= len(self._window):
+            if not self._fill(pos):
+                return Token.EOF
+            rel = pos - self._window_start
+        return ord(self._window[rel])
+
+    def LT(self, offset):
+        return self.LA(offset)
+
+    def mark(self):
+        if self._marks == 0:
+            self._mark_index = self._index
+        self._marks += 1
+        return -self._marks
+
+    def release(self, marker):
+        self._marks -= 1
+
+    def seek(self, index):
+        if index < self._window_start:
+            raise IndexError(f"Cannot seek to char index {index}; it is no longer buffered")
+        if index > self._index:
+            # Seeking forward never goes past the end of the file.
+            self._fill(index - 1)
+            index = min(index, self._window_start + len(self._window))
+        self._index = index
+
+    def getText(self, start, stop):
+        if start < self._window_start:
+            raise IndexError(f"Text starting at char index {start} is no longer buffered")
+        self._fill(stop)
+        return self._window[start - self._window_start:stop - self._window_start + 1]
+
+    def __str__(self):
+        # Materialises the whole file; only for consumers that cannot stream.
+        with open(self.fileName, 'r', encoding=self._encoding, newline='') as f:
+            return f.read()
@@ -0,0 +1,210 @@
+# object_file.py
+import mmap
+import struct
+import sys
+from array import array
+
+from code_generator import CompiledProgram
+from quadruples import QuadrupleStore
+from semantic_cube import Type
+from symbol_table import FunctionEntry
+from virtual_memory import MEMORY_TYPES
+
+MAGIC = b'LDOB'
+FORMAT_VERSION = 1
+
+# Types are stored as their index in Type
+TYPES = tuple(Type)
+TYPE_CODE = {type: code for code, type in enumerate(TYPES)}
+
+# magic, version, flags, main_index, constant_references (-1 when unknown), name length,
+# function count, quad count, global count per memory type, constant count per memory type
+_HEADER = struct.Struct('<4sHHiiIII4I4I')
+# name offset, name length, return type, param types offset, param_count, local_var_count,
+# temp_var_count, start_quad, local slots per memory type, temp slots per memory type
+_FUNCTION = struct.Struct('<IIB3xIIIIi4I4I')
+_ALIGNMENT = 8
+
+# Array typecode of the int, float and bool constant sections; strings are length-prefixed UTF-8
+_CONSTANT_FORMATS = {Type.INT: 'q', Type.FLOAT: 'd', Type.BOOL: 'b'}
+
+
+def _padding(size):
+    return b'\0' * (-size % _ALIGNMENT)
+
+
+def _le(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+
+def object_bytes(program):
+    """
+    Serializes a CompiledProgram. Every section starts 8-byte aligned, in this order:
+
+        header             _HEADER
+        program name       UTF-8
+        function directory one _FUNCTION record per function
+        function names     UTF-8, referenced by offset and length
+        param types        one byte (type code) per parameter
+        constants          int64 ints, doubles, one byte per bool, string lengths (uint32),
+                           then the strings' UTF-8 bytes
+        quads              QuadrupleStore.to_records(): four int32 per quad
+    """
+    name = program.name.encode('utf-8')
+    names = bytearray()
+    param_types = bytearray()
+    directory = []
+    for func in program.functions:
+        encoded = func.name.encode('utf-8')
+        directory.append(_FUNCTION.pack(
+            len(names), len(encoded), TYPE_CODE[func.return_type], len(param_types), func.param_count,
+            func.local_var_count, func.temp_var_count, func.start_quad,
+            *(func.local_type_counts.get(type, 0) for type in MEMORY_TYPES),
+            *(func.temp_type_counts.get(type, 0) for type in MEMORY_TYPES)))
+        names += encoded
+        param_types += bytes(TYPE_CODE[type] for type in func.param_types)
+
+    constants = {type: program.constants.get(type, ()) for type in MEMORY_TYPES}
+    references = program.constant_references
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, program.main_index,
+                          -1 if references is None else references, len(name),
+                          len(program.functions), len(program.quads),
+                          *(program.global_type_counts.get(type, 0) for type in MEMORY_TYPES),
+                          *(len(constants[type]) for type in MEMORY_TYPES))
+
+    sections = [header, name, b''.join(directory), bytes(names), bytes(param_types)]
+    for type, typecode in _CONSTANT_FORMATS.items():
+        try:
+            sections.append(_le(typecode, constants[type]))
+        except OverflowError:
+            raise ValueError(f"{type.value} constant does not fit in 64 bits") from None
+    strings = [value.encode('utf-8') for value in constants[Type.STRING]]
+    sections.append(_le('I', [len(value) for value in strings]))
+    sections.append(b''.join(strings))
+    sections.append(program.quads.to_records())
+    return b''.join(section + _padding(len(section)) for section in sections)
+
+
+def write_object(program, path):
+    with open(path, 'wb') as f:
+        f.write(object_bytes(program))
+
+
+class _Reader:
+    """Cursor over the sections of an object, handing out memoryview slices of it."""
+
+    def __init__(self, view):
+        self.view = view
+        self.offset = 0
+
+    def take(self, size):
+        if self.offset + size > len(self.view):
+            raise ValueError("Truncated LittleDuck object")
+        section = self.view[self.offset:self.offset + size]
+        self.offset += size + (-size % _ALIGNMENT)
+        return section
+
+    def take_array(self, typecode, count):
+        section = self.take(count * struct.calcsize(typecode))
+        if sys.byteorder == 'big':
+            column = array(typecode, bytes(section))
+            column.byteswap()
+            return column
+        return section.cast(typecode)
+
+
+def program_from_buffer(buffer):
+    """
+    CompiledProgram decoded from object_bytes() output without copying it: numeric constants
+    and quads are memoryviews into buffer, which the program keeps alive. Only names and
+    strings are decoded into Python objects.
+    """
+    view = memoryview(buffer)
+    if len(view) < _HEADER.size:
+        raise ValueError("Not a LittleDuck object")
+    (magic, version, _, main_index, references, name_length, function_count,
+     quad_count, *counts) = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a LittleDuck object")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported LittleDuck object version {version} (expected {FORMAT_VERSION})")
+    global_counts, constant_counts = counts[:4], dict(zip(MEMORY_TYPES, counts[4:]))
+
+    reader = _Reader(view)
+    reader.take(_HEADER.size)
+    name = str(reader.take(name_length), 'utf-8')
+    directory = reader.take(_FUNCTION.size * function_count)
+    records = [_FUNCTION.unpack_from(directory, index * _FUNCTION.size) for index in range(function_count)]
+    names = reader.take(sum(record[1] for record in records))
+    param_types = reader.take(sum(record[4] for record in records))
+
+    functions = []
+    for (name_offset, name_size, return_type, params_offset, param_count, local_var_count,
+         temp_var_count, start_quad, *slots) in records:
+        func = FunctionEntry(str(names[name_offset:name_offset + name_size], 'utf-8'),
+                             TYPES[return_type], start_quad)
+        func.param_types = [TYPES[code] for code in param_types[params_offset:params_offset + param_count]]
+        func.param_count = param_count
+        func.local_var_count = local_var_count
+        func.temp_var_count = temp_var_count
+        func.local_type_counts = dict(zip(MEMORY_TYPES, slots[:4]))
+        func.temp_type_counts = dict(zip(MEMORY_TYPES, slots[4:]))
+        functions.append(func)
+
+    constants = {type: reader.take_array(typecode, constant_counts[type])
+                 for type, typecode in _CONSTANT_FORMATS.items()}
+    # Bools are single bytes, so they read as bools in place whatever the byte order
+    constants[Type.BOOL] = memoryview(constants[Type.BOOL]).cast('?')
+    lengths = reader.take_array('I', constant_counts[Type.STRING])
+    blob = reader.take(sum(lengths))
+    strings, offset = [], 0
+    for length in lengths:
+        strings.append(str(blob[offset:offset + length], 'utf-8'))
+        offset += length
+    constants[Type.STRING] = strings
+    constants = {type: constants[type] for type in MEMORY_TYPES}
+
+    quads = QuadrupleStore.from_records(reader.take(quad_count * QuadrupleStore.RECORD.size))
+    return CompiledProgram(name, quads, constants, functions, main_index,
+                           dict(zip(MEMORY_TYPES, global_counts)),
+                           None if references < 0 else references)
+
+
+def load_object(path):
+    """
+    Maps a .ldo file read-only and decodes it with program_from_buffer. The mapping stays
+    open for as long as the program references it; the file itself is closed right away.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # mmap refuses empty files
+            raise ValueError("Not a LittleDuck object") from None
+    return program_from_buffer(mapped)
+
+
+# Example usage:
+if __name__ == '__main__':
+    import os
+    import tempfile
+    from compilation import Compilation
+
+    source = """program demo;
+var i : int;
+    x : float;
+main {
+    i = 0;
+    while (i < 3) do { x = i / 2; print("x:", x, i > 1); i = i + 1; };
+}
+end
+"""
+    program = Compilation(source=source).code
+    path = os.path.join(tempfile.mkdtemp(), 'demo.ldo')
+    write_object(program, path)
+    print(f"{path}: {os.path.getsize(path)} bytes")
+    loaded = load_object(path)
+    assert str(loaded) == str(program)
+    print(loaded)
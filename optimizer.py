@@ -0,0 +1,355 @@
+# optimizer.py
+from quadruples import OpCode, QuadrupleStore, NO_OPERAND
+from virtual_memory import TYPE_INDEX, TYPE_RANGE, GLOBAL_SEGMENT, CONST_SEGMENT, segment_of, type_of
+from semantic_cube import Type
+
+# Quads that compute a value into their result address
+DEFINES = frozenset({OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV, OpCode.LT, OpCode.GT, OpCode.EQ,
+                     OpCode.NE, OpCode.NEG, OpCode.ITOF, OpCode.ASSIGN})
+# Defining quads whose value depends only on their operands, and can be reused while those are unchanged
+EXPRESSIONS = DEFINES - {OpCode.ASSIGN}
+COMMUTATIVE = frozenset({OpCode.ADD, OpCode.MUL, OpCode.EQ, OpCode.NE})
+# Quads that convert an int operand to a float when the other operand is a float (or always, DIV)
+ARITHMETIC = frozenset({OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV})
+READS_ARG1 = DEFINES | {OpCode.PRINT, OpCode.GOTOF, OpCode.PARAM}
+READS_ARG2 = frozenset({OpCode.ADD, OpCode.SUB, OpCode.MUL, OpCode.DIV, OpCode.LT, OpCode.GT, OpCode.EQ,
+                        OpCode.NE})
+# Quads after which a new basic block starts
+ENDS_BLOCK = frozenset({OpCode.GOTO, OpCode.GOTOF, OpCode.GOSUB, OpCode.ENDFUNC, OpCode.END})
+
+MAX_ROUNDS = 10
+
+
+class BasicBlock:
+    """Quads start..end-1 of the program, with the indices of the blocks control can flow to."""
+    __slots__ = ('start', 'end', 'successors')
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.successors = []
+
+    def __repr__(self):
+        return f"BasicBlock({self.start}, {self.end}, successors={self.successors})"
+
+
+def build_blocks(code, entries):
+    """
+    Splits code (a list of [op, arg1, arg2, result, ...]) into basic blocks and links them into a
+    control-flow graph. Leaders are the entries (quad 0 and every function's start_quad), the
+    targets of GOTO and GOTOF, and every quad following a jump, a call or the end of a function.
+    GOSUB falls through to the quad after it: the graph of a function never leaves it.
+    """
+    leaders = set(entries)
+    for index, (op, _, _, result, *_) in enumerate(code):
+        if op in ENDS_BLOCK:
+            leaders.add(index + 1)
+        if op == OpCode.GOTO or op == OpCode.GOTOF:
+            leaders.add(result)
+    starts = sorted(leader for leader in leaders if leader < len(code))
+
+    blocks = [BasicBlock(start, end) for start, end in zip(starts, starts[1:] + [len(code)])]
+    block_at = {block.start: index for index, block in enumerate(blocks)}
+    for index, block in enumerate(blocks):
+        op, _, _, target, *_ = code[block.end - 1]
+        if op == OpCode.GOTO:
+            block.successors.append(block_at[target])
+        elif op == OpCode.GOTOF:
+            block.successors.append(block_at[target])
+            if block.end < len(code):
+                block.successors.append(index + 1)
+        elif op != OpCode.ENDFUNC and op != OpCode.END and block.end < len(code):
+            block.successors.append(index + 1)
+    return blocks
+
+
+class Optimizer:
+    """
+    Optimizes the quadruples of a CompiledProgram in place. Every round rebuilds the basic blocks
+    and runs, until nothing changes:
+
+      - branch folding: a GOTOF on a constant becomes a GOTO or disappears, and a GOTO to the
+        next quad is dropped
+      - local common-subexpression elimination: a repeated computation on unchanged operands
+        becomes a copy of the earlier result
+      - local copy propagation: reads of the destination of an ASSIGN read its source instead
+      - dead code elimination: quads computing a value nothing reads afterwards, found by a
+        liveness analysis over the control-flow graph, and blocks no entry can reach
+      - coalescing: 't = a + b; v = t' becomes 'v = a + b' when t is dead after the copy
+
+    Globals are live at the end of every function and are read by every call, since the callee
+    may use them. A dead quad is only removed when it cannot raise, so the program fails at the
+    same point with or without -O: a DIV needs a nonzero constant divisor, and an ITOF, a DIV or
+    an operation mixing an int with a float needs each of its int operands to be a constant that
+    converts to a float (a variable may hold an int beyond 1e308). Int arithmetic is removed
+    freely: it only overflows the 64-bit storage of --compact.
+    """
+
+    def __init__(self, program):
+        self.program = program
+        self.globals = frozenset(GLOBAL_SEGMENT + TYPE_INDEX[type] * TYPE_RANGE + offset
+                                 for type, count in program.global_type_counts.items()
+                                 for offset in range(count))
+        self.quads_before = len(program.quads)
+        self.eliminated = 0  # Common subexpressions replaced by copies
+        self.propagated = 0  # Operand reads redirected to a copy's source
+        self.removed = 0     # Quads deleted
+        self.coalesced = 0   # Results written straight into the variable they were copied to
+        self.rounds = 0
+
+    def optimize(self):
+        program = self.program
+        lines = program.quads.lines or [0] * len(program.quads)
+        # The source line rides along as a fifth field, so kept quads keep theirs
+        code = [list(quad) for quad in zip(program.quads.ops, program.quads.arg1,
+                                           program.quads.arg2, program.quads.result, lines)]
+        for _ in range(MAX_ROUNDS):
+            self.rounds += 1
+            entries = [0] + [func.start_quad for func in program.functions]
+            changed = self.fold_branches(code)
+            blocks = build_blocks(code, entries)
+            for block in blocks:
+                changed |= self.local_pass(code, block)
+            changed |= self.remove_dead_code(code, blocks, entries)
+            code = self.compact(code)
+            if not changed:
+                break
+
+        quads = QuadrupleStore()
+        for op, arg1, arg2, result, line in code:
+            quads.emit(op, arg1, arg2, result, line)
+        program.quads = quads
+        return program
+
+    def stats(self):
+        after = len(self.program.quads)
+        return (f"{self.quads_before} -> {after} quads ({self.quads_before - after} removed): "
+                f"{self.eliminated} common subexpressions, {self.propagated} copies propagated, "
+                f"{self.coalesced} temps coalesced, {self.rounds} rounds")
+
+    # --- Constants ---
+
+    def constant_value(self, address):
+        """(True, value) for an address in the const segment, else (False, None)."""
+        if address < 0 or segment_of(address) != CONST_SEGMENT:
+            return False, None
+        return True, self.program.constants[type_of(address)][address % TYPE_RANGE]
+
+    def fold_branches(self, code):
+        changed = False
+        for index, quad in enumerate(code):
+            op = quad[0]
+            if op == OpCode.GOTOF:
+                known, value = self.constant_value(quad[1])
+                if known:
+                    if value:
+                        quad[0] = None
+                    else:
+                        quad[0], quad[1] = OpCode.GOTO, NO_OPERAND
+                    changed = True
+            elif op == OpCode.GOTO and quad[3] == index + 1:
+                quad[0] = None
+                changed = True
+        return changed
+
+    # --- Local: common subexpressions and copies ---
+
+    def local_pass(self, code, block):
+        copies = {}     # destination -> source of the ASSIGNs still valid
+        available = {}  # (op, arg1, arg2) -> address still holding its value
+        changed = False
+        for index in range(block.start, block.end):
+            quad = code[index]
+            op = quad[0]
+            if op in READS_ARG1 and quad[1] in copies:
+                quad[1] = copies[quad[1]]
+                self.propagated += 1
+                changed = True
+            if op in READS_ARG2 and quad[2] in copies:
+                quad[2] = copies[quad[2]]
+                self.propagated += 1
+                changed = True
+            if op not in DEFINES:
+                continue
+
+            result = quad[3]
+            key = None
+            if op in EXPRESSIONS:
+                arg1, arg2 = quad[1], quad[2]
+                if op in COMMUTATIVE and arg2 < arg1:
+                    arg1, arg2 = arg2, arg1
+                key = (op, arg1, arg2)
+                holder = available.get(key)
+                if holder is not None:
+                    quad[0], quad[1], quad[2] = OpCode.ASSIGN, holder, NO_OPERAND
+                    op = OpCode.ASSIGN
+                    self.eliminated += 1
+                    changed = True
+
+            self.kill(result, copies, available)
+            if op == OpCode.ASSIGN:
+                if quad[1] != result:
+                    copies[result] = quad[1]
+            elif result != key[1] and result != key[2]:
+                available[key] = result
+        return changed
+
+    @staticmethod
+    def kill(address, copies, available):
+        """Forgets every copy and available expression that involves address, which is being redefined."""
+        for destination in [d for d, source in copies.items() if d == address or source == address]:
+            del copies[destination]
+        for key in [k for k, holder in available.items()
+                    if holder == address or k[1] == address or k[2] == address]:
+            del available[key]
+
+    # --- Global: liveness and dead code ---
+
+    def reads(self, quad):
+        op = quad[0]
+        used = set()
+        if op in READS_ARG1:
+            used.add(quad[1])
+        if op in READS_ARG2:
+            used.add(quad[2])
+        if op == OpCode.GOSUB:
+            used |= self.globals
+        return used
+
+    def removable(self, quad):
+        """Whether a quad whose result is dead can be dropped: it must be unable to raise."""
+        op = quad[0]
+        if op == OpCode.ITOF:
+            return self.converts(quad[1])
+        if op not in ARITHMETIC:
+            return True
+        if op == OpCode.DIV:
+            known, divisor = self.constant_value(quad[2])
+            if not known or divisor == 0:
+                return False
+        elif type_of(quad[1]) == type_of(quad[2]):
+            return True # int with int, or float with float, cannot overflow a float
+        # The int operands of a DIV, or of an operation with a float, are converted to a float
+        return all(self.converts(address) for address in quad[1:3] if type_of(address) == Type.INT)
+
+    def converts(self, address):
+        """Whether address holds a constant int that converts to a float without overflowing."""
+        known, value = self.constant_value(address)
+        if not known:
+            return False
+        try:
+            float(value)
+        except OverflowError:
+            return False
+        return True
+
+    def liveness(self, code, blocks):
+        """Addresses live on exit of each block, by iterating the dataflow equations to a fixed point."""
+        uses, defs = [], []
+        for block in blocks:
+            used, defined = set(), set()
+            for index in range(block.start, block.end):
+                quad = code[index]
+                if quad[0] is None:
+                    continue
+                used |= self.reads(quad) - defined
+                if quad[0] in DEFINES:
+                    defined.add(quad[3])
+            uses.append(used)
+            defs.append(defined)
+
+        live_in = [set() for _ in blocks]
+        live_out = [set() for _ in blocks]
+        changed = True
+        while changed:
+            changed = False
+            for index in reversed(range(len(blocks))):
+                block = blocks[index]
+                out = set(self.globals) if code[block.end - 1][0] == OpCode.ENDFUNC else set()
+                for successor in block.successors:
+                    out |= live_in[successor]
+                new_in = uses[index] | (out - defs[index])
+                if new_in != live_in[index] or out != live_out[index]:
+                    live_in[index], live_out[index] = new_in, out
+                    changed = True
+        return live_out
+
+    def reachable(self, blocks, entries):
+        block_at = {block.start: index for index, block in enumerate(blocks)}
+        stack = [block_at[entry] for entry in entries if entry in block_at]
+        seen = set(stack)
+        while stack:
+            for successor in blocks[stack.pop()].successors:
+                if successor not in seen:
+                    seen.add(successor)
+                    stack.append(successor)
+        return seen
+
+    def remove_dead_code(self, code, blocks, entries):
+        changed = False
+        reachable = self.reachable(blocks, entries)
+        live_out = self.liveness(code, blocks)
+        for index, block in enumerate(blocks):
+            if index not in reachable:
+                for quad in code[block.start:block.end]:
+                    if quad[0] is not None:
+                        quad[0] = None
+                        changed = True
+                continue
+            live = set(live_out[index])
+            for position in reversed(range(block.start, block.end)):
+                quad = code[position]
+                op = quad[0]
+                if op is None:
+                    continue
+                if op in DEFINES:
+                    if quad[3] not in live and self.removable(quad):
+                        quad[0] = None
+                        changed = True
+                        continue
+                    if op == OpCode.ASSIGN and self.coalesce(code, position, block, live):
+                        changed = True
+                        continue
+                    live.discard(quad[3])
+                live |= self.reads(quad)
+        return changed
+
+    def coalesce(self, code, position, block, live):
+        """
+        Folds 't = expr; v = t' into 'v = expr' when the ASSIGN at position copies the value the
+        previous quad just computed and nothing reads t afterwards.
+        """
+        source, destination = code[position][1], code[position][3]
+        if position == block.start or source == destination or source in live:
+            return False
+        previous = code[position - 1]
+        if previous[0] not in DEFINES or previous[3] != source:
+            return False
+        previous[3] = destination
+        code[position][0] = None
+        self.coalesced += 1
+        return True
+
+    def compact(self, code):
+        """Drops deleted quads, retargeting jumps and function starts to the next surviving quad."""
+        new_index = []
+        kept = 0
+        for quad in code:
+            new_index.append(kept)
+            if quad[0] is not None:
+                kept += 1
+        new_index.append(kept)
+        if kept == len(code):
+            return code
+
+        self.removed += len(code) - kept
+        for func in self.program.functions:
+            func.start_quad = new_index[func.start_quad]
+        compacted = []
+        for quad in code:
+            if quad[0] is None:
+                continue
+            if quad[0] == OpCode.GOTO or quad[0] == OpCode.GOTOF:
+                quad[3] = new_index[quad[3]]
+            compacted.append(quad)
+        return compacted
@@ -5,12 +5,14 @@ Este script ejecuta el analizador sintáctico generado por ANTLR para verificar
 la estructura gramatical de archivos fuente escritos en el lenguaje LittleDuck.
 
 Uso:
-  python parser_runner.py <archivo_entrada> [--tree] [--tokens] [--verbose]
+  python parser_runner.py <archivo_entrada> [--tree] [--tokens] [--verbose] [--fast-lexer] [--mmap]
 
 Opciones:
-  --tree    : Muestra el árbol de análisis sintáctico
-  --tokens  : Muestra los tokens identificados
-  --verbose : Muestra información detallada del proceso de análisis
+  --tree       : Muestra el árbol de análisis sintáctico
+  --tokens     : Muestra los tokens identificados
+  --verbose    : Muestra información detallada del proceso de análisis
+  --fast-lexer : Usa el lexer nativo basado en expresiones regulares (fast_lexer.FastLexer)
+  --mmap       : Lee el archivo con mmap y lo decodifica por bloques
 """
 
 import sys
@@ -21,9 +23,13 @@ sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 import antlr4
 from antlr4 import *
-from gen.LittleDuckLexer import LittleDuckLexer
-from gen.LittleDuckParser import LittleDuckParser
 from gen.LittleDuckListener import LittleDuckListener
+from two_stage_parser import ParseStats
+from compilation import Compilation, Diagnostic
+
+
+def format_syntax_error(diagnostic):
+    return f"Error sintáctico en línea {diagnostic.line}:{diagnostic.column} - {diagnostic.message}"
 
 
 class ErrorListener(antlr4.DiagnosticErrorListener):
@@ -37,7 +43,7 @@ class ErrorListener(antlr4.DiagnosticErrorListener):
         self.verbose = verbose
 
     def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-        error_message = f"Error sintáctico en línea {line}:{column} - {msg}"
+        error_message = format_syntax_error(Diagnostic(line, column, msg))
         self.errors.append(error_message)
         if self.verbose:
             print(error_message)
@@ -76,7 +82,7 @@ class LittleDuckTreeListener(LittleDuckListener):
         self.depth -= 1
 
 
-def parse_file(input_file, show_tree=False, show_tokens=False, verbose=False):
+def parse_file(input_file, show_tree=False, show_tokens=False, verbose=False, fast_lexer=False, use_mmap=False):
     """
     Analiza un archivo de entrada utilizando el parser de LittleDuck.
     Toma:
@@ -84,74 +90,58 @@ def parse_file(input_file, show_tree=False, show_tokens=False, verbose=False):
         show_tree (bool): Si es True, muestra el árbol sintáctico
         show_tokens (bool): Si es True, muestra los tokens
         verbose (bool): Si es True, muestra información adicional durante el análisis
+        fast_lexer (bool): Si es True, usa FastLexer en lugar del lexer generado por ANTLR
+        use_mmap (bool): Si es True, lee el archivo con MmapCharStream en lugar de FileStream
     """
     print(f"Analizando sintácticamente el archivo: {input_file}\n")
 
-    # Crear un stream de caracteres a partir del archivo
-    input_stream = FileStream(input_file, encoding='utf-8')
-
-    # Crear el lexer
-    lexer = LittleDuckLexer(input_stream)
-
-    # Configurar el listener de errores para el lexer
-    lexer_error_listener = ErrorListener(verbose)
-    lexer.removeErrorListeners()
-    lexer.addErrorListener(lexer_error_listener)
-
-    # Obtener el stream de tokens
-    token_stream = CommonTokenStream(lexer)
+    # En modo verbose los errores y ambigüedades se imprimen en cuanto se detectan
+    verbose_listeners = [ErrorListener(verbose)] if verbose else []
+    compilation = Compilation(input_file, fast_lexer=fast_lexer, use_mmap=use_mmap,
+                              lexer_listeners=verbose_listeners, parser_listeners=verbose_listeners)
 
-    # Mostrar los tokens si se solicita
+    # Mostrar los tokens si se solicita (el parser reutiliza estos mismos tokens, no se vuelve a tokenizar)
     if show_tokens:
-        token_stream.fill()
         print("TOKENS ENCONTRADOS:")
         print("-------------------")
         print(f"{'TOKEN':<12} {'TYPE':<8} {'LINE':<8} {'POS':<8} {'TEXT'}")
         print("-" * 70)
 
-        for token in token_stream.tokens:
+        symbolic_names = compilation.lexer.symbolicNames
+        for token in compilation.tokens:
             if token.type == Token.EOF:
                 continue
 
-            token_type_name = lexer.symbolicNames[token.type]
+            token_type_name = symbolic_names[token.type]
             print(f"{token_type_name:<12} {token.type:<8} {token.line:<8} {token.column:<8} '{token.text}'")
 
         print("\n")
 
-        # Reset token stream para el parser
-        token_stream = CommonTokenStream(lexer)
-
-    # Crear el parser
-    parser = LittleDuckParser(token_stream)
-
-    # Configurar el listener de errores para el parser
-    parser_error_listener = ErrorListener(verbose)
-    parser.removeErrorListeners()
-    parser.addErrorListener(parser_error_listener)
-
-    # Activar SLL para mejor rendimiento (puede cambiarse a LL si hay problemas)
-    parser._interp.predictionMode = PredictionMode.SLL
-
     try:
-        # Comenzar el análisis desde la regla 'program'
-        tree = parser.program()
+        # Comenzar el análisis desde la regla 'program': primero SLL, LL completo solo si SLL falla
+        parse_stats = ParseStats()
+        compilation.parse_stats = parse_stats
+        tree = compilation.tree
+        if verbose and parse_stats.last_used_fallback:
+            print("La predicción SLL falló; se reanalizó con LL completo.")
+        syntax_errors = [format_syntax_error(d) for d in compilation.syntax_errors]
 
         # Mostrar estadísticas
         print("\nESTADÍSTICAS DE ANÁLISIS SINTÁCTICO:")
-        print(f"Número de errores sintácticos: {len(parser_error_listener.errors)}")
+        print(f"Número de errores sintácticos: {len(syntax_errors)}")
 
         # Mostrar el árbol si se solicita
-        if show_tree and len(parser_error_listener.errors) == 0:
+        if show_tree and len(syntax_errors) == 0:
             print("\nÁRBOL SINTÁCTICO:")
             print("-----------------")
-            listener = LittleDuckTreeListener(parser)
+            listener = LittleDuckTreeListener(compilation.parser)
             walker = ParseTreeWalker()
             walker.walk(listener, tree)
 
         # Verificar si hubo errores
-        if len(parser_error_listener.errors) > 0:
+        if len(syntax_errors) > 0:
             print("\nERRORES SINTÁCTICOS DETECTADOS:")
-            for error in parser_error_listener.errors:
+            for error in syntax_errors:
                 print(f"  • {error}")
             return False
         else:
@@ -168,7 +158,7 @@ def main():
     Función principal que procesa argumentos de línea de comandos
     """
     if len(sys.argv) < 2:
-        print("Uso: python parser_runner.py <archivo_entrada> [--tree] [--tokens] [--verbose]")
+        print("Uso: python parser_runner.py <archivo_entrada> [--tree] [--tokens] [--verbose] [--fast-lexer] [--mmap]")
         sys.exit(1)
 
     input_file = sys.argv[1]
@@ -180,8 +170,10 @@ def main():
     show_tree = "--tree" in sys.argv
     show_tokens = "--tokens" in sys.argv
     verbose = "--verbose" in sys.argv
+    fast_lexer = "--fast-lexer" in sys.argv
+    use_mmap = "--mmap" in sys.argv
 
-    success = parse_file(input_file, show_tree, show_tokens, verbose)
+    success = parse_file(input_file, show_tree, show_tokens, verbose, fast_lexer, use_mmap)
 
     if not success:
         sys.exit(1)
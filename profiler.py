@@ -0,0 +1,153 @@
+# profiler.py
+import json
+
+from quadruples import OpCode
+
+# Rows shown per section of the text report
+REPORT_LIMIT = 10
+
+
+class Profile:
+    """
+    Executions and time of every quad of one VirtualMachine.run(profile=True), filled in by the
+    profiling loop of the virtual machine. Times are perf_counter_ns nanoseconds from the end of
+    the previous quad to the end of this one, so they include the dispatch and add up to the
+    whole run; call_times holds, per GOSUB, the time spent inside the calls it made.
+
+    The counts are rolled up to source lines (from the quads' lines, when the program has them),
+    to functions (each owns the quads from its start_quad to the next function's), and to while
+    loops: every GOTO jumping back is the end of a loop running from its target to that GOTO.
+    A loop's time is that of its quads plus the calls made from them; calls in a loop of a
+    recursive function count once per nesting level.
+    """
+
+    def __init__(self, program):
+        self.program = program
+        size = len(program.quads)
+        self.counts = [0] * size
+        self.times = [0] * size
+        self.call_times = [0] * size
+
+    @property
+    def instructions(self):
+        return sum(self.counts)
+
+    @property
+    def total_time(self):
+        return sum(self.times)
+
+    # --- Roll-ups ---
+
+    def function_of(self):
+        """Index into program.functions of the function owning each quad (the GOTO to main is main's)."""
+        functions = self.program.functions
+        owners = [self.program.main_index] * len(self.counts)
+        starts = sorted((func.start_quad, index) for index, func in enumerate(functions))
+        for position, (start, index) in enumerate(starts):
+            end = starts[position + 1][0] if position + 1 < len(starts) else len(owners)
+            owners[start:end] = [index] * (end - start)
+        return owners
+
+    def quads(self):
+        """One row per executed quad: index, opcode, line, function, count and time."""
+        quads = self.program.quads
+        lines = quads.lines
+        functions = self.program.functions
+        owners = self.function_of()
+        return [{'quad': index, 'op': OpCode(quads.ops[index]).name,
+                 'line': lines[index] if lines is not None else None,
+                 'function': functions[owners[index]].name,
+                 'count': count, 'ns': self.times[index]}
+                for index, count in enumerate(self.counts) if count]
+
+    def lines(self):
+        """Executed quads and time per source line, or [] when the program has no line information."""
+        lines = self.program.quads.lines
+        if lines is None:
+            return []
+        totals = {}
+        for index, count in enumerate(self.counts):
+            if count:
+                row = totals.setdefault(lines[index], [0, 0])
+                row[0] += count
+                row[1] += self.times[index]
+        return [{'line': line, 'count': count, 'ns': ns} for line, (count, ns) in sorted(totals.items())]
+
+    def functions(self):
+        """Calls, executed quads and self time per function (main is entered once, without a GOSUB)."""
+        functions = self.program.functions
+        quads = self.program.quads
+        rows = [{'function': func.name, 'calls': 0, 'count': 0, 'ns': 0} for func in functions]
+        rows[self.program.main_index]['calls'] = 1
+        for index, owner in enumerate(self.function_of()):
+            count = self.counts[index]
+            if count:
+                rows[owner]['count'] += count
+                rows[owner]['ns'] += self.times[index]
+                if quads.ops[index] == OpCode.GOSUB:
+                    rows[quads.result[index]]['calls'] += count
+        return rows
+
+    def loops(self):
+        """Every while loop that ran, from the backward GOTO closing it: span, line, iterations and time."""
+        quads = self.program.quads
+        lines = quads.lines
+        functions = self.program.functions
+        owners = self.function_of()
+        rows = []
+        for end, count in enumerate(self.counts):
+            start = quads.result[end]
+            if quads.ops[end] != OpCode.GOTO or start > end or not self.counts[start]:
+                continue
+            span = range(start, end + 1)
+            rows.append({'start': start, 'end': end,
+                         'line': lines[start] if lines is not None else None,
+                         'function': functions[owners[start]].name,
+                         'iterations': count,
+                         'count': sum(self.counts[index] for index in span),
+                         'ns': sum(self.times[index] + self.call_times[index] for index in span)})
+        return rows
+
+    # --- Reports ---
+
+    def as_dict(self):
+        return {'program': self.program.name, 'instructions': self.instructions, 'ns': self.total_time,
+                'functions': self.functions(), 'loops': self.loops(), 'lines': self.lines(),
+                'quads': self.quads()}
+
+    def to_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def report(self, limit=REPORT_LIMIT):
+        """Text report: functions, then the hottest loops, lines and quads by time."""
+        total = self.total_time or 1
+
+        def share(ns):
+            return f"{ns / 1e6:>10.3f} {100 * ns / total:>6.1f}%"
+
+        def hottest(rows):
+            return sorted(rows, key=lambda row: row['ns'], reverse=True)[:limit]
+
+        def where(row):
+            return f"{row['function']}:{row['line']}" if row['line'] is not None else row['function']
+
+        out = [f"Profile of {self.program.name}: {self.instructions} quads executed in {self.total_time / 1e6:.3f} ms", ""]
+        out.append(f"{'FUNCTION':<20} {'CALLS':>10} {'QUADS':>12} {'SELF (ms)':>10} {'SHARE':>7}")
+        for row in hottest(row for row in self.functions() if row['count']):
+            out.append(f"{row['function']:<20} {row['calls']:>10} {row['count']:>12} {share(row['ns'])}")
+
+        out += ["", f"{'LOOP':<20} {'QUADS':>11} {'ITERATIONS':>10} {'EXECUTED':>12} {'TIME (ms)':>10} {'SHARE':>7}"]
+        for row in hottest(self.loops()):
+            span = f"{row['start']}-{row['end']}"
+            out.append(f"{where(row):<20} {span:>11} {row['iterations']:>10} {row['count']:>12} {share(row['ns'])}")
+
+        if self.program.quads.lines is not None:
+            out += ["", f"{'LINE':<20} {'EXECUTED':>12} {'TIME (ms)':>10} {'SHARE':>7}"]
+            for row in hottest(self.lines()):
+                out.append(f"{row['line']:<20} {row['count']:>12} {share(row['ns'])}")
+
+        out += ["", f"{'QUAD':<8} {'OP':<8} {'AT':<20} {'EXECUTED':>12} {'TIME (ms)':>10} {'SHARE':>7}"]
+        for row in hottest(self.quads()):
+            out.append(f"{row['quad']:<8} {row['op']:<8} {where(row):<20} {row['count']:>12} {share(row['ns'])}")
+        return "\n".join(out)
@@ -0,0 +1,349 @@
+# python_backend.py
+import math
+import sys
+
+from semantic_cube import Type, Operator
+from symbol_table import GLOBAL_LEVEL, LOCAL_LEVEL
+from ast_nodes import Assign, If, While, StringLiteral, BinaryOp, UnaryOp, Paren, IntLiteral, FloatLiteral
+from virtual_machine import MAX_CALL_DEPTH
+
+# File name of the generated code in tracebacks
+FILENAME = '<littleduck>'
+# Printed pieces buffered before they are joined and written out
+FLUSH_PIECES = 4096
+
+PYTHON_OPERATORS = {
+    Operator.PLUS: '+', Operator.MINUS: '-', Operator.MULT: '*', Operator.DIV: '/',
+    Operator.LESS: '<', Operator.GREATER: '>', Operator.EQUAL: '==', Operator.NOT_EQUAL: '!=',
+}
+# Binding strength of the generated Python expressions, to parenthesize only where needed
+_COMPARISON, _ADDITIVE, _MULTIPLICATIVE, _UNARY, _ATOM = range(1, 6)
+PRECEDENCE = {
+    Operator.LESS: _COMPARISON, Operator.GREATER: _COMPARISON,
+    Operator.EQUAL: _COMPARISON, Operator.NOT_EQUAL: _COMPARISON,
+    Operator.PLUS: _ADDITIVE, Operator.MINUS: _ADDITIVE,
+    Operator.MULT: _MULTIPLICATIVE, Operator.DIV: _MULTIPLICATIVE,
+}
+ZERO_LITERALS = {Type.INT: '0', Type.FLOAT: '0.0', Type.BOOL: 'False'}
+# Operators that convert an int operand to a float when the other one is a float (DIV always)
+ARITHMETIC_OPERATORS = frozenset({Operator.PLUS, Operator.MINUS, Operator.MULT, Operator.DIV})
+
+
+class PythonRuntimeError(Exception):
+    def __init__(self, message, line):
+        super().__init__(f"Runtime error at line {line}: {message}")
+        self.line = line
+
+
+def converts(expr):
+    """Whether expr is an int literal that converts to a float without overflowing."""
+    if not isinstance(expr, IntLiteral):
+        return False
+    try:
+        float(expr.value)
+    except OverflowError:
+        return False
+    return True
+
+
+def _stack_depth():
+    depth, frame = 0, sys._getframe(1)
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+class PythonProgram:
+    """
+    A LittleDuck program translated to Python source and compiled to a code object. The source
+    defines one function, littleduck(_out, _flush, _init), whose locals are the program's globals and
+    whose nested functions are the LittleDuck functions. line_map holds the LittleDuck line of
+    every generated line, so runtime errors point at the source statement.
+    """
+
+    def __init__(self, name, source, line_map):
+        self.name = name
+        self.source = source
+        self.line_map = line_map
+        try:
+            self.code = compile(source, FILENAME, 'exec')
+        except (SyntaxError, RecursionError, MemoryError) as e:
+            # Python limits nesting: more than 20 nested loops, or very deep expressions
+            raise ValueError(f"'{name}' is nested too deeply for the Python backend: {e}") from None
+
+    def run(self, output=None, initial_globals=None):
+        """
+        Runs the program, writing what it prints to output (sys.stdout by default) in buffered
+        chunks. initial_globals maps global names to the values (of the variable's type) they
+        hold when main starts instead of zero. Errors the virtual machine reports are raised as
+        PythonRuntimeError.
+        """
+        output = output if output is not None else sys.stdout
+        namespace = {}
+        exec(self.code, namespace)
+        pieces = []
+        write = output.write
+
+        def flush():
+            write(''.join(pieces))
+            pieces.clear()
+
+        # Every LittleDuck call is one Python frame; Python 3.11+ does not recurse in C for them
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(_stack_depth() + MAX_CALL_DEPTH + 1)
+        try:
+            namespace['littleduck'](pieces, flush, initial_globals or {})
+        except ZeroDivisionError as e:
+            raise self._error("division by zero", e) from None
+        except RecursionError as e:
+            raise self._error(f"call depth exceeded {MAX_CALL_DEPTH}", e) from None
+        except OverflowError as e:
+            raise self._error("integer overflow", e) from None
+        finally:
+            sys.setrecursionlimit(limit)
+            flush()
+
+    def _error(self, message, exception):
+        line = 0
+        traceback = exception.__traceback__
+        while traceback is not None:
+            if traceback.tb_frame.f_code.co_filename == FILENAME:
+                line = self.line_map[traceback.tb_lineno - 1]
+            traceback = traceback.tb_next
+        return PythonRuntimeError(message, line)
+
+
+class PythonGenerator:
+    """
+    Translates a semantically valid AST into Python source, the second backend next to
+    CodeGenerator. Globals become locals of the outer littleduck() function and LittleDuck
+    functions become functions nested in it, so every variable is a fast local or a closure
+    cell; functions declare nonlocal the globals they assign. Each statement maps to the same
+    Python statement: while ... do to while, if/else to if/else, calls to calls, and print to
+    one f-string appended to the output buffer.
+
+    Values follow SemanticCube exactly as the virtual machine does: Python int and float
+    arithmetic, / always a float division, and float() wherever the quads widen with ITOF (an
+    int assigned to a float variable or passed to a float parameter). Variables start at 0, 0.0
+    or False on every call, like a zeroed activation record. Expression visitors return
+    (source, Type, precedence).
+    """
+
+    def __init__(self, symbol_table, semantic_cube):
+        self.symbol_table = symbol_table
+        self.semantic_cube = semantic_cube
+        self.current_function = None
+        self.scopes = None # symbol_table.scopes(current_function), indexed by variable slots
+        self.lines = []
+        self.line_map = []
+        self.indent = 0
+
+    def generate(self, program):
+        self.emit("def littleduck(_out, _flush, _init):", program.line)
+        self.indent += 1
+        self.emit("_append = _out.append", program.line)
+        self.emit("_inf = float('inf')", program.line)
+        self.emit("_nan = float('nan')", program.line)
+        for var in self.symbol_table.global_vars.values():
+            self.emit(f"g_{var.name} = _init.get({var.name!r}, {ZERO_LITERALS[var.type]})", program.line)
+
+        for function in program.functions:
+            self.generate_function(function)
+
+        self.current_function = self.symbol_table.get_function('main')
+        self.scopes = self.symbol_table.scopes(self.current_function)
+        self.declare_locals(self.current_function, program.main_line)
+        self.indent -= 1
+        self.generate_body(program.body, program.main_line)
+        return PythonProgram(program.name, "\n".join(self.lines) + "\n", self.line_map)
+
+    def generate_function(self, function):
+        func_entry = self.symbol_table.get_function(function.name)
+        self.current_function = func_entry
+        self.scopes = self.symbol_table.scopes(func_entry)
+        params = ", ".join(f"l_{name}" for name in func_entry.param_names)
+        self.emit(f"def f_{function.name}({params}):", function.line)
+        self.indent += 1
+        assigned = sorted(self.assigned_globals(function.body))
+        if assigned:
+            self.emit(f"nonlocal {', '.join(assigned)}", function.line)
+        self.declare_locals(func_entry, function.line)
+        self.indent -= 1
+        self.generate_body(function.body, function.line)
+
+    def declare_locals(self, func_entry, line):
+        for var in func_entry.slots[func_entry.param_count:]:
+            self.emit(f"l_{var.name} = {ZERO_LITERALS[var.type]}", line)
+
+    def assigned_globals(self, statements):
+        names = set()
+        for statement in statements:
+            if isinstance(statement, Assign):
+                var = self.variable(statement)
+                if var.slot[0] == GLOBAL_LEVEL:
+                    names.add(self.name_of(var))
+            elif isinstance(statement, If):
+                names |= self.assigned_globals(statement.then_body)
+                names |= self.assigned_globals(statement.else_body or [])
+            elif isinstance(statement, While):
+                names |= self.assigned_globals(statement.body)
+        return names
+
+    def generate_body(self, statements, line):
+        """Emits statements one level deeper; an empty body becomes pass."""
+        self.indent += 1
+        if not statements:
+            self.emit("pass", line)
+        for statement in statements:
+            statement.accept(self)
+        self.indent -= 1
+
+    def emit(self, text, line):
+        self.lines.append("    " * self.indent + text)
+        self.line_map.append(line)
+
+    def name_of(self, var):
+        if var.slot[0] == LOCAL_LEVEL:
+            return f"l_{var.name}"
+        return f"g_{var.name}"
+
+    def variable(self, node):
+        """The VariableEntry of a Var or Assign node, by its slot."""
+        level, index = node.slot or self.symbol_table.slot_of(node, self.current_function)
+        return self.scopes[level][index]
+
+    # --- Statements ---
+
+    def visitAssign(self, node):
+        var = self.variable(node)
+        value = self.converted(node.expr, var.type)
+        self.emit(f"{self.name_of(var)} = {value}", node.line)
+
+    def visitIf(self, node):
+        condition, _, _ = node.condition.accept(self)
+        self.emit(f"if {condition}:", node.line)
+        self.generate_body(node.then_body, node.line)
+        if node.else_body is not None:
+            self.emit("else:", node.line)
+            self.generate_body(node.else_body, node.line)
+
+    def visitWhile(self, node):
+        condition, _, _ = node.condition.accept(self)
+        self.emit(f"while {condition}:", node.line)
+        self.generate_body(node.body, node.line)
+
+    def visitCall(self, node):
+        func_entry = self.symbol_table.get_function(node.name)
+        args = ", ".join(self.converted(arg, param_type)
+                         for arg, param_type in zip(node.args, func_entry.param_types))
+        self.emit(f"f_{node.name}({args})", node.line)
+
+    def visitPrint(self, node):
+        """
+        One f-string per print. When a later argument may raise (a division by zero, an int that
+        overflows a float) it is split into one append per argument, so the output written
+        before the error matches the quads'.
+        """
+        pieces = []
+        for arg in node.args:
+            if isinstance(arg, StringLiteral):
+                pieces.append(arg.value.replace('{', '{{').replace('}', '}}'))
+            else:
+                pieces.append(f"{{{arg.accept(self)[0]}}}")
+        if any(self.may_fail(arg) for arg in node.args[1:]):
+            texts = [piece + (' ' if i < len(pieces) - 1 else '\n') for i, piece in enumerate(pieces)]
+        else:
+            texts = [" ".join(pieces) + "\n"]
+        for text in texts:
+            self.emit(f"_append(f{text!r})", node.line)
+        self.emit(f"if len(_out) > {FLUSH_PIECES}: _flush()", node.line)
+
+    def may_fail(self, expr):
+        return self.failure(expr)[0]
+
+    def failure(self, expr):
+        """
+        (whether evaluating expr may raise, its type). It may raise on a division by zero or by a
+        variable, and where an int that is not a literal known to fit is converted to a float: by
+        a division, or by an arithmetic operation with a float (it may exceed 1e308).
+        """
+        if isinstance(expr, BinaryOp):
+            left_fails, left_type = self.failure(expr.left)
+            right_fails, right_type = self.failure(expr.right)
+            op = expr.op
+            fails = left_fails or right_fails
+            if op == Operator.DIV and not (isinstance(expr.right, (IntLiteral, FloatLiteral))
+                                           and expr.right.value != 0):
+                fails = True
+            if op in ARITHMETIC_OPERATORS and (op == Operator.DIV or left_type != right_type):
+                fails = fails or any(operand_type == Type.INT and not converts(operand)
+                                     for operand, operand_type in ((expr.left, left_type), (expr.right, right_type)))
+            return fails, self.semantic_cube.table[op.code][left_type.code][right_type.code]
+        if isinstance(expr, UnaryOp):
+            return self.failure(expr.operand)
+        if isinstance(expr, Paren):
+            return self.failure(expr.expr)
+        return False, expr.accept(self)[1]
+
+    # --- Expressions ---
+
+    def converted(self, expr, target_type):
+        """Source of expr as a value of target_type, widening ints stored into floats."""
+        text, value_type, _ = expr.accept(self)
+        if value_type == Type.INT and target_type == Type.FLOAT:
+            if isinstance(expr, IntLiteral):
+                try:
+                    return self.float_literal(float(expr.value))[0]
+                except OverflowError:
+                    pass # Left for float() to raise at run time, like ITOF
+            return f"float({text})"
+        return text
+
+    def visitBinaryOp(self, node):
+        left, left_type, left_precedence = node.left.accept(self)
+        right, right_type, right_precedence = node.right.accept(self)
+        precedence = PRECEDENCE[node.op]
+        # Operators are left-associative, and comparisons never chain as they would in Python
+        if left_precedence < precedence or left_precedence == precedence == _COMPARISON:
+            left = f"({left})"
+        if right_precedence <= precedence:
+            right = f"({right})"
+        result_type = self.semantic_cube.table[node.op.code][left_type.code][right_type.code]
+        return f"{left} {PYTHON_OPERATORS[node.op]} {right}", result_type, precedence
+
+    def visitUnaryOp(self, node):
+        operand, operand_type, precedence = node.operand.accept(self)
+        if node.op == Operator.UNARY_PLUS:
+            return operand, operand_type, precedence
+        if precedence <= _UNARY:
+            operand = f"({operand})"
+        return f"-{operand}", operand_type, _UNARY
+
+    def visitParen(self, node):
+        return node.expr.accept(self)
+
+    def visitVar(self, node):
+        var = self.variable(node)
+        return self.name_of(var), var.type, _ATOM
+
+    def visitIntLiteral(self, node):
+        text = repr(node.value)
+        return (f"({text})" if node.value < 0 else text), Type.INT, _ATOM
+
+    def visitFloatLiteral(self, node):
+        return self.float_literal(node.value)
+
+    def float_literal(self, value):
+        if math.isnan(value):
+            text = "_nan"
+        elif math.isinf(value):
+            text = "_inf" if value > 0 else "(-_inf)"
+        else:
+            text = repr(value)
+            if text.startswith('-'):
+                text = f"({text})"
+        return text, Type.FLOAT, _ATOM
+
+    def visitBoolLiteral(self, node):
+        return repr(node.value), Type.BOOL, _ATOM
@@ -0,0 +1,174 @@
+# quadruples.py
+import sys
+import struct
+from array import array
+from enum import IntEnum
+
+from semantic_cube import Operator
+
+class OpCode(IntEnum):
+    # Arithmetic and relational: OP left right result
+    ADD = 0
+    SUB = 1
+    MUL = 2
+    DIV = 3
+    LT = 4
+    GT = 5
+    EQ = 6
+    NE = 7
+    NEG = 8      # NEG operand _ result
+    ITOF = 9     # ITOF int_value _ result: assignment that widens an int into a float
+    ASSIGN = 10  # ASSIGN value _ result
+    PRINT = 11   # PRINT value _ newline: newline is 1 on the last argument of a print, else 0
+    GOTO = 12    # GOTO _ _ target
+    GOTOF = 13   # GOTOF condition _ target
+    ERA = 14     # ERA _ _ function: prepares the activation record of a call
+    PARAM = 15   # PARAM value _ param: copies value into the parameter's local address in the prepared record
+    GOSUB = 16   # GOSUB _ _ function
+    ENDFUNC = 17
+    END = 18
+
+# Placeholder for unused operands and not yet backpatched jump targets
+NO_OPERAND = -1
+
+# Opcode of each arithmetic and relational semantic_cube.Operator
+BINARY_OPCODES = {
+    Operator.PLUS: OpCode.ADD, Operator.MINUS: OpCode.SUB,
+    Operator.MULT: OpCode.MUL, Operator.DIV: OpCode.DIV,
+    Operator.LESS: OpCode.LT, Operator.GREATER: OpCode.GT,
+    Operator.EQUAL: OpCode.EQ, Operator.NOT_EQUAL: OpCode.NE,
+}
+
+
+class QuadrupleStore:
+    """
+    Quadruples stored column-wise in four signed 32-bit arrays (opcode, arg1, arg2, result),
+    16 bytes per quad instead of a tuple of boxed ints. Operands are virtual addresses, jump
+    targets are quad indices and unused fields hold NO_OPERAND.
+
+    lines holds the source line of the statement each quad was generated for (the line set in
+    line when it was emitted). It is debug information for profiles: binary dumps and records do
+    not carry it, and stores read back from them have lines None.
+    """
+
+    MAGIC = b'LDQ1'
+    _HEADER = struct.Struct('<4sI') # magic, quad count
+
+    def __init__(self):
+        self.ops = array('i')
+        self.arg1 = array('i')
+        self.arg2 = array('i')
+        self.result = array('i')
+        self.lines = array('i')
+        self.line = 0
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __getitem__(self, index):
+        return (OpCode(self.ops[index]), self.arg1[index], self.arg2[index], self.result[index])
+
+    def __iter__(self):
+        for i in range(len(self.ops)):
+            yield self[i]
+
+    def emit(self, op, arg1=NO_OPERAND, arg2=NO_OPERAND, result=NO_OPERAND, line=None):
+        """Appends a quad from source line (self.line by default) and returns its index."""
+        self.ops.append(op)
+        self.arg1.append(arg1)
+        self.arg2.append(arg2)
+        self.result.append(result)
+        if self.lines is not None:
+            self.lines.append(self.line if line is None else line)
+        return len(self.ops) - 1
+
+    def backpatch(self, index, target):
+        """Fills in the jump target of the GOTO/GOTOF at index."""
+        self.result[index] = target
+
+    # --- Binary dump ---
+
+    def to_bytes(self):
+        """Header followed by the four columns as little-endian int32."""
+        columns = [self.ops, self.arg1, self.arg2, self.result]
+        if sys.byteorder == 'big':
+            columns = [array('i', column) for column in columns]
+            for column in columns:
+                column.byteswap()
+        return self._HEADER.pack(self.MAGIC, len(self.ops)) + b''.join(column.tobytes() for column in columns)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, count = cls._HEADER.unpack_from(data, 0)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a LittleDuck quadruple dump")
+        store = cls()
+        store.lines = None
+        offset = cls._HEADER.size
+        width = count * store.ops.itemsize
+        for column in (store.ops, store.arg1, store.arg2, store.result):
+            column.frombytes(data[offset:offset + width])
+            if sys.byteorder == 'big':
+                column.byteswap()
+            offset += width
+        return store
+
+    # --- Fixed-width records ---
+
+    RECORD = struct.Struct('<iiii') # op, arg1, arg2, result
+
+    def to_records(self):
+        """One little-endian int32 record (op, arg1, arg2, result) per quad."""
+        records = array('i', [field for quad in zip(self.ops, self.arg1, self.arg2, self.result)
+                              for field in quad])
+        if sys.byteorder == 'big':
+            records.byteswap()
+        return records.tobytes()
+
+    @classmethod
+    def from_records(cls, buffer):
+        """
+        Store whose columns are strided views into buffer (bytes, mmap or memoryview holding
+        to_records() output), so no quad is copied. The store is read-only and keeps buffer alive.
+        """
+        store = cls.__new__(cls)
+        if sys.byteorder == 'big':
+            records = array('i', bytes(buffer))
+            records.byteswap()
+            view = memoryview(records)
+        else:
+            view = memoryview(buffer).cast('B').cast('i')
+        store.ops, store.arg1, store.arg2, store.result = (view[field::4] for field in range(4))
+        store.lines = None
+        return store
+
+    def dump(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def __str__(self):
+        def field(value):
+            return '_' if value == NO_OPERAND else str(value)
+        width = len(str(len(self.ops)))
+        return "\n".join(f"{i:>{width}}: {OpCode(op).name:<8} {field(a1):>8} {field(a2):>8} {field(r):>8}"
+                         for i, (op, a1, a2, r) in enumerate(zip(self.ops, self.arg1, self.arg2, self.result)))
+
+
+# Example usage:
+if __name__ == '__main__':
+    quads = QuadrupleStore()
+    jump = quads.emit(OpCode.GOTOF, 1000)
+    quads.emit(OpCode.ADD, 1000, 3000, 2000)
+    quads.emit(OpCode.PRINT, 2000, NO_OPERAND, 1)
+    quads.backpatch(jump, len(quads))
+    quads.emit(OpCode.END)
+    print(quads)
+
+    data = quads.to_bytes()
+    print(f"\nBinary dump: {len(data)} bytes")
+    assert list(QuadrupleStore.from_bytes(data)) == list(quads)
@@ -0,0 +1,177 @@
+# run.py
+"""
+LittleDuck Runner
+-----------------
+Compiles a LittleDuck program to quadruples and executes it on the virtual machine. Only the
+program's own output is written to stdout; compilation errors stop before execution. A .ldo
+object written with -o runs directly: it is memory-mapped and never lexed, parsed or analyzed.
+With --batch the program runs once per row of a CSV file of initial global values, vectorized
+with NumPy where it can be.
+
+Usage:
+  python run.py <input_file> [-O] [-o <object_file>] [--python] [--fast-lexer] [--quads] [--frames] [--count] [--compact] [--profile] [--profile-json <file>]
+  python run.py <input_file> --batch <inits.csv> [--fast-lexer]
+  python run.py <object_file.ldo> [--quads] [--count] [--compact] [--profile] [--profile-json <file>]
+
+Options:
+  -o <file>    : Writes the compiled program to a .ldo object instead of running it
+  -O           : Optimizes the quadruples (common subexpressions, copies, dead code)
+  --python     : Runs the program translated to Python bytecode instead of on the virtual machine
+  --batch <f>  : Runs the program once per CSV row; the header names globals, each row sets their initial values
+  --fast-lexer : Tokenizes with fast_lexer.FastLexer
+  --quads      : Prints the compiled quadruples (with --python, the generated Python source) before running them
+  --frames     : Prints each function's frame size before and after temps share slots
+  --count      : Reports the number of executed quadruples after the run
+  --compact    : Stores ints, floats and bools unboxed in typed arrays
+  --profile    : Reports executions and time per function, while loop, source line and quad after the run
+  --profile-json <f> : Writes that profile to a JSON file
+"""
+import sys
+import os
+
+from object_file import load_object, write_object
+from python_backend import PythonRuntimeError
+from virtual_machine import VirtualMachine, VMRuntimeError
+
+OBJECT_EXTENSION = '.ldo'
+
+def compile_program(input_file, argv):
+    """The analyzed Compilation of a source file, or None after printing its errors."""
+    # Imported here so running an object never loads ANTLR; semantic_runner also switches stdout to UTF-8
+    from semantic_runner import format_lex_error, format_syntax_error
+    from compilation import Compilation
+
+    compilation = Compilation(input_file, fast_lexer="--fast-lexer" in argv, optimize="-O" in argv)
+    compilation.analyze()
+    errors = ([format_lex_error(d) for d in compilation.lex_errors]
+              + [format_syntax_error(d) for d in compilation.syntax_errors])
+    if not errors:
+        errors = compilation.semantic_errors
+    if errors:
+        print("Compilation failed:")
+        for err in errors:
+            print(err)
+        return None
+    return compilation
+
+def show_program(compilation, argv):
+    program = compilation.code
+    if "--quads" in argv:
+        print(program)
+        print(f"Constants: {compilation.constant_table.stats()}")
+        if compilation.optimizer is not None:
+            print(f"Optimizer: {compilation.optimizer.stats()}")
+        print()
+    if "--frames" in argv:
+        print("Frame sizes (slots):")
+        print(compilation.temp_allocator.report())
+        print()
+    return program
+
+def run_python(compilation, argv):
+    try:
+        python_program = compilation.python
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    if "--quads" in argv:
+        print(python_program.source)
+    try:
+        python_program.run()
+    except PythonRuntimeError as e:
+        sys.stdout.flush()
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+def run_batch(compilation, argv):
+    from vector_machine import VectorMachine, read_initial_globals
+
+    index = argv.index("--batch")
+    if index + 1 >= len(argv):
+        print("Error: --batch needs a CSV file of initial values.")
+        return 1
+    try:
+        machine = VectorMachine(compilation)
+        results = machine.run(read_initial_globals(argv[index + 1]))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    status = 0
+    for lane, result in enumerate(results):
+        print(f"=== Lane {lane} ===")
+        sys.stdout.write(result.output)
+        if result.error is not None:
+            sys.stdout.flush()
+            print(result.error, file=sys.stderr)
+            status = 1
+    print(f"\nBatch: {machine.stats()}")
+    return status
+
+def main(argv):
+    if len(argv) < 2:
+        print("Usage: python run.py <input_file> [-O] [-o <object_file>] [--python | --batch <inits.csv>] [--fast-lexer] [--quads] [--frames] [--count] [--compact] [--profile] [--profile-json <file>]")
+        return 1
+
+    input_file = argv[1]
+    if not os.path.exists(input_file):
+        print(f"Error: File '{input_file}' not found.")
+        return 1
+
+    if input_file.endswith(OBJECT_EXTENSION):
+        sys.stdout.reconfigure(encoding='utf-8')
+        try:
+            program = load_object(input_file)
+        except ValueError as e:
+            print(f"Error: {input_file}: {e}")
+            return 1
+        if "--quads" in argv:
+            print(program)
+            print()
+    else:
+        compilation = compile_program(input_file, argv)
+        if compilation is None:
+            return 1
+        if "--batch" in argv:
+            return run_batch(compilation, argv)
+        if "--python" in argv:
+            return run_python(compilation, argv)
+        program = show_program(compilation, argv)
+        if "-o" in argv:
+            index = argv.index("-o")
+            if index + 1 >= len(argv):
+                print("Error: -o needs an output file.")
+                return 1
+            try:
+                write_object(program, argv[index + 1])
+            except ValueError as e:
+                print(f"Error: {e}")
+                return 1
+            return 0
+
+    count = "--count" in argv
+    profile_path = None
+    if "--profile-json" in argv:
+        index = argv.index("--profile-json")
+        if index + 1 >= len(argv):
+            print("Error: --profile-json needs an output file.")
+            return 1
+        profile_path = argv[index + 1]
+    vm = VirtualMachine(program, compact="--compact" in argv)
+    try:
+        vm.run(count_instructions=count, profile="--profile" in argv or profile_path is not None)
+    except VMRuntimeError as e:
+        sys.stdout.flush()
+        print(e, file=sys.stderr)
+        return 1
+    if count:
+        print(f"\nExecuted quadruples: {vm.instructions_executed}")
+    if "--profile" in argv:
+        print()
+        print(vm.profile.report())
+    if profile_path is not None:
+        vm.profile.to_json(profile_path)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -1,8 +1,17 @@
 # semantic_cube.py
 from enum import Enum
 
+class CodedEnum(Enum):
+    """Enum whose members also carry a small integer code, 0, 1, 2... in definition order."""
+
+    def __new__(cls, value):
+        member = object.__new__(cls)
+        member._value_ = value
+        member.code = len(cls.__members__) # Index into SemanticCube.table
+        return member
+
 # Define type constants using Enum
-class Type(Enum):
+class Type(CodedEnum):
     INT = 'int'
     FLOAT = 'float'
     STRING = 'string' # For string literals, if needed for print
@@ -11,7 +20,7 @@ class Type(Enum):
     ERROR = 'error' # To represent a type mismatch
 
 # Define operator constants using Enum
-class Operator(Enum):
+class Operator(CodedEnum):
     PLUS = '+'
     MINUS = '-'
     MULT = '*'
@@ -26,6 +35,13 @@ class Operator(Enum):
     # Add more operators as needed (AND, OR, etc.)
 
 class SemanticCube:
+    """
+    Result type of every operator on every pair of operand types. The rules are written into the
+    cube dict and compiled once into table, a dense nested tuple indexed by codes:
+    table[operator.code][type1.code][type2.code] is the result type, Type.ERROR where no rule
+    exists. Hot paths index table directly; get_type keeps the original signature.
+    """
+
     def __init__(self):
         self.cube = {}
         # Initialize the semantic cube rules
@@ -95,15 +111,29 @@ class SemanticCube:
         self._add_rule(Type.INT, Type.VOID, Operator.UNARY_MINUS, Type.INT)
         self._add_rule(Type.FLOAT, Type.VOID, Operator.UNARY_MINUS, Type.FLOAT)
 
+        self.table = self._compile()
+
     def _add_rule(self, type1: Type, type2: Type, operator: Operator, result_type: Type):
         self.cube[(type1, type2, operator)] = result_type
 
+    def _compile(self):
+        return tuple(tuple(tuple(self.cube.get((type1, type2, operator), Type.ERROR) for type2 in Type)
+                           for type1 in Type)
+                     for operator in Operator)
+
+    def results(self, operator: Operator):
+        """The rows of table for one operator: results(operator)[type1.code][type2.code]."""
+        return self.table[operator.code]
+
     def get_type(self, type1: Type, type2: Type, operator: Operator) -> Type:
         """
         Gets the result type for a binary operation.
         For unary operations, type2 should be Type.VOID.
         """
-        return self.cube.get((type1, type2, operator), Type.ERROR)
+        try:
+            return self.table[operator.code][type1.code][type2.code]
+        except AttributeError: # Not a Type or Operator, as None: no rule, as with the dict
+            return Type.ERROR
 
 # Example usage:
 if __name__ == '__main__':
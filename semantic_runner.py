@@ -5,39 +5,18 @@ import io
 
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
-from antlr4 import *
-from gen.LittleDuckLexer import LittleDuckLexer
-from gen.LittleDuckParser import LittleDuckParser
-from semantic_analyzer import SemanticAnalyzer
-from symbol_table import SymbolTable
-from semantic_cube import SemanticCube
-from antlr4.error.ErrorListener import ErrorListener
+from compilation import Compilation
+from analysis_cache import AnalysisCache
 
-class LexerErrorListener(ErrorListener):
-    def __init__(self):
-        super().__init__()
-        self.errors = []
+def format_lex_error(diagnostic):
+    return f"Lexical Error at Line {diagnostic.line}:{diagnostic.column} - {diagnostic.message}"
 
-    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-        self.errors.append(f"Lexical Error at Line {line}:{column} - {msg}")
-
-    def get_errors(self):
-        return self.errors
-
-class ParserErrorListener(ErrorListener):
-    def __init__(self):
-        super().__init__()
-        self.errors = []
-
-    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-        self.errors.append(f"Syntax Error at Line {line}:{column} - {msg}")
-
-    def get_errors(self):
-        return self.errors
+def format_syntax_error(diagnostic):
+    return f"Syntax Error at Line {diagnostic.line}:{diagnostic.column} - {diagnostic.message}"
 
 def main(argv):
     if len(argv) < 2:
-        print("Usage: python semantic_runner.py <input_file>")
+        print("Usage: python semantic_runner.py <input_file> [--mmap] [--cache] [--quads]")
         return
 
     input_file = argv[1]
@@ -45,25 +24,19 @@ def main(argv):
         print(f"Error: File '{input_file}' not found.")
         return
 
-    print(f"Analyzing file: {input_file}\n")
-    input_stream = FileStream(input_file, encoding='utf-8')
-
-    # Lexer
-    lexer = LittleDuckLexer(input_stream)
-    lexer_error_listener = LexerErrorListener()
-    lexer.removeErrorListeners()
-    lexer.addErrorListener(lexer_error_listener)
-    stream = CommonTokenStream(lexer)
+    use_mmap = "--mmap" in argv
+    show_quads = "--quads" in argv
+    # Reuses the stored results when this exact content was analyzed before
+    cache = AnalysisCache() if "--cache" in argv else None
 
-    # Parser
-    parser = LittleDuckParser(stream)
-    parser_error_listener = ParserErrorListener()
-    parser.removeErrorListeners()
-    parser.addErrorListener(parser_error_listener)
-    tree = parser.program() # Start parsing from the 'program' rule
+    print(f"Analyzing file: {input_file}\n")
+    # Lexer and parser (SLL first, LL on failure) share one token buffer; the file is lexed once
+    compilation = Compilation(input_file, use_mmap=use_mmap, cache=cache)
+    if cache is not None:
+        compilation.analyze()
 
-    lex_errors = lexer_error_listener.get_errors()
-    par_errors = parser_error_listener.get_errors()
+    par_errors = [format_syntax_error(d) for d in compilation.syntax_errors]
+    lex_errors = [format_lex_error(d) for d in compilation.lex_errors]
 
     if lex_errors:
         print("Lexical Errors Found:")
@@ -82,16 +55,12 @@ def main(argv):
     if not lex_errors and not par_errors:
         print("Lexical and Syntax analysis successful.\n")
         # Semantic Analysis
-        symbol_table = SymbolTable()
-        semantic_cube = SemanticCube()
-        analyzer = SemanticAnalyzer(symbol_table, semantic_cube)
-        
         print("--- Starting Semantic Analysis ---")
-        semantic_errors = analyzer.visit(tree) # Use the generic visit method for the visitor
+        semantic_errors = compilation.semantic_errors # Walks the parse tree built above
         print("--- Finished Semantic Analysis ---")
 
         print("\n--- Symbol Table ---")
-        print(symbol_table)
+        print(compilation.symbol_table)
         print("--------------------\n")
 
         if semantic_errors:
@@ -100,6 +69,10 @@ def main(argv):
                 print(err)
         else:
             print("Semantic analysis successful. No errors found.")
+            if show_quads:
+                print("\n--- Quadruples ---")
+                print(compilation.code)
+                print(f"Constants: {compilation.constant_table.stats()}")
     else:
         print("Compilation failed due to lexical or syntax errors.")
 
@@ -1,14 +1,32 @@
 # symbol_table.py
+from semantic_cube import Type
+
+# A variable's slot is (scope level, index): its position among the globals or among the
+# variables (params first) of its function, in declaration order
+GLOBAL_LEVEL = 0
+LOCAL_LEVEL = 1
+
+def _type_to_value(type):
+    return type.value if hasattr(type, 'value') else type
 
 class VariableEntry:
-    def __init__(self, name, type, address=None):
+    def __init__(self, name, type, address=None, slot=None):
         self.name = name
         self.type = type
         self.address = address # For memory management in later stages
+        self.slot = slot       # (scope level, index), assigned when the variable is declared
 
     def __str__(self):
         return f"Var: {self.name}, Type: {self.type.value if hasattr(self.type, 'value') else self.type}, Addr: {self.address}"
 
+    # Plain dict/list form used by the on-disk analysis cache
+    def to_dict(self):
+        return {'name': self.name, 'type': _type_to_value(self.type), 'address': self.address}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], Type(data['type']), data['address'])
+
 class FunctionEntry:
     def __init__(self, name, return_type, start_quad=None):
         self.name = name
@@ -16,38 +34,87 @@ class FunctionEntry:
         self.param_types = [] # List of types of parameters
         self.param_names = [] # List of names of parameters
         self.variables = {}   # VariableTable for local variables (maps name to VariableEntry)
+        self.slots = []       # The same VariableEntries by slot index: params, then local variables
         self.param_count = 0
         self.local_var_count = 0 # Excluding params
         self.temp_var_count = 0 
         self.start_quad = start_quad
+        # Slots per type of the activation record (Type -> count), filled in by CodeGenerator
+        self.local_type_counts = {}
+        self.temp_type_counts = {}
 
     def add_param(self, name, type):
-        if name in self.param_names or name in self.variables:
+        if name in self.variables: # Params are stored in variables too, so this also catches repeated params
             # self.add_error(f"Parameter '{name}' redeclared or conflicts with a local variable in function '{self.name}'.")
             return False # Indicate error
         
         self.param_types.append(type)
         self.param_names.append(name)
         self.param_count += 1
-        self.variables[name] = VariableEntry(name, type) # Params are also local to the function
+        self._add_slot(VariableEntry(name, type)) # Params are also local to the function
         return True
 
     def add_variable(self, name, type, address=None):
         if name in self.variables: # Checks params as well
             return False # Indicate error: redeclaration
-        self.variables[name] = VariableEntry(name, type, address)
+        self._add_slot(VariableEntry(name, type, address))
         self.local_var_count += 1
         return True # Indicate success
 
+    def _add_slot(self, var):
+        var.slot = (LOCAL_LEVEL, len(self.slots))
+        self.variables[var.name] = var
+        self.slots.append(var)
+
     def get_variable(self, name):
         return self.variables.get(name)
 
+    def copy(self):
+        """An independent entry with the same contents; code generation can fill in either one alone."""
+        func = FunctionEntry(self.name, self.return_type, self.start_quad)
+        func.param_types = list(self.param_types)
+        func.param_names = list(self.param_names)
+        for var in self.slots:
+            func._add_slot(VariableEntry(var.name, var.type, var.address))
+        func.param_count = self.param_count
+        func.local_var_count = self.local_var_count
+        func.temp_var_count = self.temp_var_count
+        func.local_type_counts = dict(self.local_type_counts)
+        func.temp_type_counts = dict(self.temp_type_counts)
+        return func
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'return_type': _type_to_value(self.return_type),
+            'param_types': [_type_to_value(t) for t in self.param_types],
+            'param_names': list(self.param_names),
+            'variables': [var.to_dict() for var in self.variables.values()],
+            'param_count': self.param_count,
+            'local_var_count': self.local_var_count,
+            'temp_var_count': self.temp_var_count,
+            'start_quad': self.start_quad,
+            'local_type_counts': {t.value: n for t, n in self.local_type_counts.items()},
+            'temp_type_counts': {t.value: n for t, n in self.temp_type_counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        func = cls(data['name'], Type(data['return_type']), data['start_quad'])
+        func.param_types = [Type(t) for t in data['param_types']]
+        func.param_names = list(data['param_names'])
+        for var in data['variables']:
+            func._add_slot(VariableEntry.from_dict(var))
+        func.param_count = data['param_count']
+        func.local_var_count = data['local_var_count']
+        func.temp_var_count = data['temp_var_count']
+        func.local_type_counts = {Type(t): n for t, n in data.get('local_type_counts', {}).items()}
+        func.temp_type_counts = {Type(t): n for t, n in data.get('temp_type_counts', {}).items()}
+        return func
+
     def __str__(self):
         params_str = ", ".join([f"{p_name}:{p_type.value if hasattr(p_type, 'value') else p_type}" for p_name, p_type in zip(self.param_names, self.param_types)])
-        # Filter out params from local vars for display if desired, or show all
-        local_vars_only_str = "\n".join([f"\t{str(var)}" for var_name, var in self.variables.items() if var_name not in self.param_names])
-        
-        # Displaying params as part of local vars is also fine and simpler:
+        # Params are displayed as part of the local vars
         all_local_vars_str = "\n".join([f"\t{str(var)}" for var in self.variables.values()])
 
         return_type_str = self.return_type.value if hasattr(self.return_type, 'value') else self.return_type
@@ -56,6 +123,7 @@ class FunctionEntry:
 class SymbolTable:
     def __init__(self):
         self.global_vars = {} 
+        self.global_slots = [] # The global VariableEntries by slot index
         self.functions = {}   
         self.current_scope_name = 'global' # Tracks the name of the current scope ('global' or function name)
 
@@ -72,28 +140,63 @@ class SymbolTable:
     def add_global_variable(self, name, type, address=None):
         if name in self.global_vars:
             return False 
-        self.global_vars[name] = VariableEntry(name, type, address)
+        self._add_global_slot(VariableEntry(name, type, address))
         return True 
 
+    def _add_global_slot(self, var):
+        var.slot = (GLOBAL_LEVEL, len(self.global_slots))
+        self.global_vars[var.name] = var
+        self.global_slots.append(var)
+
     def get_global_variable(self, name):
         return self.global_vars.get(name)
 
     def get_variable_in_scope(self, var_name, scope_name=None):
         # If scope_name is provided, use it. Otherwise, use self.current_scope_name.
         active_scope_name = scope_name if scope_name is not None else self.current_scope_name
-
-        if active_scope_name and active_scope_name != 'global':
-            current_func_entry = self.get_function(active_scope_name)
-            if current_func_entry:
-                var = current_func_entry.get_variable(var_name)
-                if var:
-                    return var
-        
-        return self.get_global_variable(var_name)
+        scope = self.get_function(active_scope_name) if active_scope_name != 'global' else None
+        return self.resolve(var_name, scope)
+
+    def resolve(self, var_name, scope):
+        """The VariableEntry var_name refers to inside scope (a FunctionEntry, or None at global level), or None."""
+        if scope is not None:
+            var = scope.variables.get(var_name)
+            if var is not None:
+                return var
+        return self.global_vars.get(var_name)
+
+    def scopes(self, scope):
+        """The slot lists a slot (level, index) indexes inside scope: scopes(scope)[level][index]."""
+        return (self.global_slots, scope.slots)
+
+    def slot_of(self, node, scope):
+        """
+        The slot of a Var or Assign node inside scope. SemanticAnalyzer records it on the node;
+        bodies whose analysis was reused by incremental analysis are resolved here, once.
+        """
+        if node.slot is None:
+            node.slot = self.resolve(node.name, scope).slot
+        return node.slot
 
     def set_current_scope(self, scope_name):
         self.current_scope_name = scope_name
 
+    def to_dict(self):
+        return {
+            'global_vars': [var.to_dict() for var in self.global_vars.values()],
+            'functions': [func.to_dict() for func in self.functions.values()],
+            'current_scope_name': self.current_scope_name,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        table = cls()
+        for var in data['global_vars']:
+            table._add_global_slot(VariableEntry.from_dict(var))
+        table.functions = {func['name']: FunctionEntry.from_dict(func) for func in data['functions']}
+        table.current_scope_name = data['current_scope_name']
+        return table
+
     def __str__(self):
         global_vars_str = "\n".join([f"  {str(var)}" for var in self.global_vars.values()])
         funcs_str = "\n".join([str(func) for func in self.functions.values()])
@@ -101,8 +204,6 @@ class SymbolTable:
 
 # Example Usage
 if __name__ == '__main__':
-    from semantic_cube import Type # Assuming Type enum is in semantic_cube
-
     st = SymbolTable()
     try:
         st.add_global_variable("count", Type.INT)
@@ -0,0 +1,195 @@
+# temp_allocator.py
+from optimizer import DEFINES, READS_ARG1, READS_ARG2, build_blocks
+from virtual_memory import MEMORY_TYPES, TYPE_INDEX, TYPE_RANGE, TEMP_SEGMENT, segment_of, type_of
+
+
+def is_temp(address):
+    return address >= 0 and segment_of(address) == TEMP_SEGMENT
+
+
+class LiveInterval:
+    """
+    Quads start..end (inclusive) over which a temp holds a value. dies_at_end is set when the
+    temp is only read at end, so a temp defined by that same quad may take its slot: the virtual
+    machine reads every operand before it writes the result.
+    """
+    __slots__ = ('temp', 'start', 'end', 'dies_at_end')
+
+    def __init__(self, temp, position):
+        self.temp = temp
+        self.start = position
+        self.end = position
+        self.dies_at_end = False
+
+
+class TempAllocator:
+    """
+    Shrinks activation records by letting temps share slots. For each function it runs a
+    liveness analysis over the control-flow graph of its quads, turns every temp's live range
+    into an interval of quad positions (loops are covered because a temp live around a back
+    edge is live at both ends), and colors the intervals of each type greedily by start: an
+    interval reuses the first slot whose previous interval has ended. Coloring an interval
+    graph this way needs no more slots than the most temps of a type live at once.
+
+    Temp addresses in the quads are rewritten in place, and every FunctionEntry gets the reduced
+    temp_type_counts and temp_var_count; frame_sizes keeps (name, before, after) for reporting.
+    """
+
+    def __init__(self, program):
+        self.program = program
+        self.frame_sizes = []
+
+    def allocate(self):
+        program = self.program
+        quads = program.quads
+        code = [list(quad) for quad in zip(quads.ops, quads.arg1, quads.arg2, quads.result)]
+        blocks = build_blocks(code, [0] + [func.start_quad for func in program.functions])
+        live_after = self.live_after(code, blocks)
+
+        starts = sorted(func.start_quad for func in program.functions)
+        bounds = dict(zip(starts, starts[1:] + [len(code)]))
+        for func in program.functions:
+            end = bounds[func.start_quad]
+            before = func.temp_var_count
+            mapping = self.color(code, live_after, func, func.start_quad, end)
+            self.rewrite(code, func.start_quad, end, mapping)
+            self.frame_sizes.append((func.name, len(func.variables) + before,
+                                     len(func.variables) + func.temp_var_count))
+
+        for index, (_, arg1, arg2, result) in enumerate(code):
+            quads.arg1[index] = arg1
+            quads.arg2[index] = arg2
+            quads.result[index] = result
+        return program
+
+    # --- Liveness ---
+
+    @staticmethod
+    def temp_reads(quad):
+        op = quad[0]
+        reads = []
+        if op in READS_ARG1 and is_temp(quad[1]):
+            reads.append(quad[1])
+        if op in READS_ARG2 and is_temp(quad[2]):
+            reads.append(quad[2])
+        return reads
+
+    @staticmethod
+    def temp_defined(quad):
+        if quad[0] in DEFINES and is_temp(quad[3]):
+            return quad[3]
+        return None
+
+    def live_after(self, code, blocks):
+        """
+        Temps live after each quad. Control flow never leaves a function (GOSUB falls through),
+        so one analysis over the whole program's graph serves every function.
+        """
+        uses, defs = [], []
+        for block in blocks:
+            used, defined = set(), set()
+            for position in range(block.start, block.end):
+                quad = code[position]
+                used.update(temp for temp in self.temp_reads(quad) if temp not in defined)
+                temp = self.temp_defined(quad)
+                if temp is not None:
+                    defined.add(temp)
+            uses.append(used)
+            defs.append(defined)
+
+        live_in = [set() for _ in blocks]
+        live_out = [set() for _ in blocks]
+        changed = True
+        while changed:
+            changed = False
+            for index in reversed(range(len(blocks))):
+                out = set()
+                for successor in blocks[index].successors:
+                    out |= live_in[successor]
+                new_in = uses[index] | (out - defs[index])
+                if new_in != live_in[index] or out != live_out[index]:
+                    live_in[index], live_out[index] = new_in, out
+                    changed = True
+
+        after = [None] * len(code)
+        for block, out in zip(blocks, live_out):
+            live = set(out)
+            for position in reversed(range(block.start, block.end)):
+                after[position] = frozenset(live)
+                quad = code[position]
+                defined = self.temp_defined(quad)
+                if defined is not None:
+                    live.discard(defined)
+                live.update(self.temp_reads(quad))
+        return after
+
+    # --- Coloring ---
+
+    def intervals(self, code, live_after, start, end):
+        intervals = {}
+        for position in range(start, end):
+            quad = code[position]
+            touched = set(live_after[position])
+            touched.update(self.temp_reads(quad))
+            defined = self.temp_defined(quad)
+            if defined is not None:
+                touched.add(defined)
+            for temp in touched:
+                interval = intervals.get(temp)
+                if interval is None:
+                    intervals[temp] = LiveInterval(temp, position)
+                else:
+                    interval.end = position
+        for interval in intervals.values():
+            interval.dies_at_end = interval.temp not in live_after[interval.end]
+        return intervals
+
+    def color(self, code, live_after, func, start, end):
+        intervals = self.intervals(code, live_after, start, end)
+        mapping = {}
+        counts = {}
+        for type in MEMORY_TYPES:
+            typed = sorted((interval for interval in intervals.values() if type_of(interval.temp) == type),
+                           key=lambda interval: (interval.start, interval.end))
+            slots = []  # Interval that occupied each slot last
+            for interval in typed:
+                for slot, occupant in enumerate(slots):
+                    if self.can_follow(code, occupant, interval):
+                        slots[slot] = interval
+                        break
+                else:
+                    slot = len(slots)
+                    slots.append(interval)
+                mapping[interval.temp] = TEMP_SEGMENT + TYPE_INDEX[type] * TYPE_RANGE + slot
+            counts[type] = len(slots)
+
+        func.temp_type_counts = counts
+        func.temp_var_count = sum(counts.values())
+        return mapping
+
+    def can_follow(self, code, occupant, interval):
+        """Whether interval may reuse the slot occupant held: it ends before, or dies in the quad defining interval's temp."""
+        if occupant.end < interval.start:
+            return True
+        return (occupant.end == interval.start and occupant.dies_at_end
+                and self.temp_defined(code[interval.start]) == interval.temp)
+
+    @staticmethod
+    def rewrite(code, start, end, mapping):
+        for position in range(start, end):
+            quad = code[position]
+            if quad[1] in mapping:
+                quad[1] = mapping[quad[1]]
+            if quad[2] in mapping:
+                quad[2] = mapping[quad[2]]
+            if quad[0] in DEFINES and quad[3] in mapping:
+                quad[3] = mapping[quad[3]]
+
+    def report(self):
+        lines = [f"{'FUNCTION':<20} {'BEFORE':>8} {'AFTER':>8}"]
+        for name, before, after in self.frame_sizes:
+            lines.append(f"{name:<20} {before:>8} {after:>8}")
+        total_before = sum(before for _, before, _ in self.frame_sizes)
+        total_after = sum(after for _, _, after in self.frame_sizes)
+        lines.append(f"{'total':<20} {total_before:>8} {total_after:>8}")
+        return "\n".join(lines)
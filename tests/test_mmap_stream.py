@@ -0,0 +1,63 @@
+# test_mmap_stream.py
+"""
+Pruebas del stream de caracteres con mmap (mmap_stream.py): size debe ser el número de
+caracteres del archivo, antes de leerlo, a mitad de la lectura y al llegar al final.
+
+Uso:
+  python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from antlr4.Token import Token
+
+from mmap_stream import MmapCharStream
+
+
+class MmapCharStreamSizeTest(unittest.TestCase):
+    # Caracteres de varios bytes que cruzan los límites de bloque de chunk_size=7
+    TEXT = 'program año; var π : float; main { print("ñandú"); } end\n' * 5
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'program.ld')
+        with open(self.path, 'w', encoding='utf-8', newline='') as f:
+            f.write(self.TEXT)
+
+    def open_stream(self):
+        stream = MmapCharStream(self.path, encoding='utf-8', chunk_size=7)
+        self.addCleanup(stream.close)
+        return stream
+
+    def test_size_before_reading(self):
+        self.assertEqual(self.open_stream().size, len(self.TEXT))
+
+    def test_size_while_reading_keeps_position(self):
+        stream = self.open_stream()
+        for _ in range(20):
+            stream.consume()
+        self.assertEqual(stream.size, len(self.TEXT))
+        self.assertEqual(stream.index, 20)
+        self.assertEqual(stream.LA(1), ord(self.TEXT[20]))
+
+    def test_size_at_end_of_file(self):
+        stream = self.open_stream()
+        while stream.LA(1) != Token.EOF:
+            stream.consume()
+        self.assertEqual(stream.size, len(self.TEXT))
+        self.assertEqual(stream.index, stream.size)
+
+    def test_size_of_empty_file(self):
+        with open(self.path, 'w', encoding='utf-8'):
+            pass
+        self.assertEqual(self.open_stream().size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
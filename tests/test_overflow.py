@@ -0,0 +1,131 @@
+# test_overflow.py
+"""
+Pruebas de desbordamiento: un programa válido con enteros demasiado grandes debe compilar y
+reportar "integer overflow" en tiempo de ejecución, en la máquina virtual, con -O y en el
+backend de Python, después de imprimir lo mismo que sin optimizar.
+
+Uso:
+  python -m unittest discover tests
+"""
+
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compilation import Compilation
+from python_backend import PythonRuntimeError
+from virtual_machine import VirtualMachine, VMRuntimeError
+
+HUGE = ' * '.join(['99999999999999999999'] * 17) # Más de 10**308: no cabe en un float
+
+
+def compile_source(source, optimize=False):
+    compilation = Compilation(source=source, optimize=optimize)
+    compilation.analyze()
+    assert not compilation.semantic_errors, compilation.semantic_errors
+    return compilation
+
+
+def run_vm(source, optimize=False, compact=False):
+    """(salida, mensaje de error o None) de la máquina virtual."""
+    output = io.StringIO()
+    vm = VirtualMachine(compile_source(source, optimize).code, output=output, compact=compact)
+    try:
+        vm.run()
+    except VMRuntimeError as e:
+        return output.getvalue(), str(e)
+    return output.getvalue(), None
+
+
+def run_python(source):
+    """(salida, mensaje de error o None) del backend de Python."""
+    output = io.StringIO()
+    try:
+        compile_source(source).python.run(output)
+    except PythonRuntimeError as e:
+        return output.getvalue(), str(e)
+    return output.getvalue(), None
+
+
+class OverflowTest(unittest.TestCase):
+
+    def assert_overflows(self, source, expected_output=''):
+        for name, (output, error) in (("vm", run_vm(source)), ("vm -O", run_vm(source, optimize=True)),
+                                      ("python", run_python(source))):
+            with self.subTest(name):
+                self.assertEqual(output, expected_output)
+                self.assertIsNotNone(error)
+                self.assertIn("integer overflow", error)
+
+
+class ConstantFoldingOverflowTest(OverflowTest):
+    """Las operaciones entre literales cuyo entero no cabe en un float no se pliegan."""
+
+    def test_int_times_float_literal(self):
+        self.assert_overflows(f'program p; var f : float; main {{ print(1); f = {HUGE} * 1.0; print(f); }} end',
+                              "1\n")
+
+    def test_int_division_too_large_for_a_float(self):
+        self.assert_overflows(f'program p; var f : float; main {{ print(1); f = {HUGE} / 3; print(f); }} end',
+                              "1\n")
+
+    def test_operation_is_left_unfolded(self):
+        compilation = compile_source(f'program p; var f : float; main {{ f = {HUGE} * 1.0; }} end')
+        self.assertIn(" MUL ", str(compilation.code))
+
+
+class DeadCodeOverflowTest(OverflowTest):
+    """-O no elimina un cuádruplo muerto que puede desbordar: el error ocurre en el mismo punto."""
+
+    POWER = ' * '.join(['x'] * 16)
+
+    def test_dead_int_to_float_conversion(self):
+        self.assert_overflows(f'program p; var x : int; f : float; main {{ x = 99999999999999999999; '
+                              f'x = {self.POWER}; f = x; print(1, x); }} end')
+
+    def test_dead_mixed_operation(self):
+        self.assert_overflows(f'program p; var x : int; f : float; main {{ x = 99999999999999999999; '
+                              f'x = {self.POWER}; f = x * 2.0; print(1, x); }} end')
+
+    def test_dead_int_division(self):
+        self.assert_overflows(f'program p; var x : int; f : float; main {{ x = 99999999999999999999; '
+                              f'x = {self.POWER}; f = x / 3; print(1, x); }} end')
+
+
+class PrintOverflowTest(OverflowTest):
+    """Un print cuyo argumento desborda escribe lo mismo que la máquina virtual antes del error."""
+
+    POWER = ' * '.join(['x'] * 16)
+
+    def test_mixed_operation_in_print(self):
+        self.assert_overflows(f'program p; var x : int; main {{ x = 99999999999999999999; '
+                              f'x = {self.POWER}; print(1, x * 1.0); }} end', "1 ")
+
+    def test_int_division_in_print(self):
+        self.assert_overflows(f'program p; var x : int; main {{ x = 99999999999999999999; '
+                              f'x = {self.POWER}; print("x", 2, x / 3); }} end', "x 2 ")
+
+
+class CompactStorageOverflowTest(unittest.TestCase):
+    """Con --compact, una constante int fuera de 64 bits se reporta al cargar el programa."""
+
+    def test_int_constant_beyond_64_bits(self):
+        source = 'program p; var a : int; main { print(1); a = 99999999999999999999; print(a); } end'
+        self.assertEqual(run_vm(source), ("1\n99999999999999999999\n", None))
+        output, error = run_vm(source, compact=True)
+        self.assertEqual(output, "")
+        self.assertEqual(error, "Runtime error at quad 2: integer overflow")
+
+    def test_unassigned_variables_read_as_zero(self):
+        source = ('program p; var a : int; b : float; void f(x : int) [ var l : int; m : float; '
+                  '{ print(l, m, x); } ]; main { print(a, b); f(3); } end')
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                self.assertEqual(run_vm(source, compact=compact), ("0 0.0\n0 0.0 3\n", None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# test_semantic_cube.py
+"""
+Pruebas del cubo semántico denso (semantic_cube.py). Las reglas del lenguaje se escriben aquí de
+nuevo, como texto, sin leer el diccionario del cubo: para cada par de tipos y cada operador, la
+tabla compilada, get_type y results deben dar el tipo que esas reglas indican, y Type.ERROR
+donde no hay regla.
+
+Uso:
+  python -m unittest discover tests
+"""
+
+import itertools
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from semantic_cube import SemanticCube, Type, Operator
+
+# (tipo izquierdo, tipo derecho, operador, resultado) de LittleDuck; los unarios usan 'void' a la derecha
+RULES = [
+    ('int', 'int', '+', 'int'), ('int', 'float', '+', 'float'),
+    ('float', 'int', '+', 'float'), ('float', 'float', '+', 'float'),
+    ('int', 'int', '-', 'int'), ('int', 'float', '-', 'float'),
+    ('float', 'int', '-', 'float'), ('float', 'float', '-', 'float'),
+    ('int', 'int', '*', 'int'), ('int', 'float', '*', 'float'),
+    ('float', 'int', '*', 'float'), ('float', 'float', '*', 'float'),
+    ('int', 'int', '/', 'float'), ('int', 'float', '/', 'float'),
+    ('float', 'int', '/', 'float'), ('float', 'float', '/', 'float'),
+    ('int', 'int', '<', 'bool'), ('int', 'float', '<', 'bool'),
+    ('float', 'int', '<', 'bool'), ('float', 'float', '<', 'bool'),
+    ('int', 'int', '>', 'bool'), ('int', 'float', '>', 'bool'),
+    ('float', 'int', '>', 'bool'), ('float', 'float', '>', 'bool'),
+    ('int', 'int', '==', 'bool'), ('int', 'float', '==', 'bool'),
+    ('float', 'int', '==', 'bool'), ('float', 'float', '==', 'bool'), ('bool', 'bool', '==', 'bool'),
+    ('int', 'int', '!=', 'bool'), ('int', 'float', '!=', 'bool'),
+    ('float', 'int', '!=', 'bool'), ('float', 'float', '!=', 'bool'), ('bool', 'bool', '!=', 'bool'),
+    ('int', 'int', '=', 'int'), ('float', 'float', '=', 'float'),
+    ('float', 'int', '=', 'float'), ('bool', 'bool', '=', 'bool'),
+    ('int', 'void', 'unary+', 'int'), ('float', 'void', 'unary+', 'float'),
+    ('int', 'void', 'unary-', 'int'), ('float', 'void', 'unary-', 'float'),
+]
+EXPECTED = {(Type(left), Type(right), Operator(op)): Type(result) for left, right, op, result in RULES}
+
+
+class SemanticCubeTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cube = SemanticCube()
+
+    def test_table_matches_language_rules_exhaustively(self):
+        combinations = list(itertools.product(Type, Type, Operator))
+        self.assertEqual(len(combinations), 396)
+        for type1, type2, operator in combinations:
+            with self.subTest(type1=type1, type2=type2, operator=operator):
+                expected = EXPECTED.get((type1, type2, operator), Type.ERROR)
+                self.assertIs(self.cube.get_type(type1, type2, operator), expected)
+                self.assertIs(self.cube.table[operator.code][type1.code][type2.code], expected)
+                self.assertIs(self.cube.results(operator)[type1.code][type2.code], expected)
+
+    def test_float_is_not_assignable_to_int(self):
+        self.assertIs(self.cube.get_type(Type.INT, Type.FLOAT, Operator.ASSIGN), Type.ERROR)
+
+    def test_codes_are_dense(self):
+        self.assertEqual([member.code for member in Type], list(range(len(Type))))
+        self.assertEqual([member.code for member in Operator], list(range(len(Operator))))
+
+    def test_non_members_have_no_rule(self):
+        for type1, type2, operator in ((None, Type.INT, Operator.PLUS), (Type.INT, None, Operator.PLUS),
+                                       (Type.INT, Type.INT, None), (Type.INT, Type.INT, '+')):
+            with self.subTest(type1=type1, type2=type2, operator=operator):
+                self.assertIs(self.cube.get_type(type1, type2, operator), Type.ERROR)
+
+
+if __name__ == '__main__':
+    unittest.main()
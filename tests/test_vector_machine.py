@@ -0,0 +1,59 @@
+# test_vector_machine.py
+"""
+Pruebas de los barridos vectorizados (vector_machine.py): cada carril debe imprimir lo mismo que
+el backend de Python ejecutando ese carril solo. Sin NumPy todos los carriles usan el backend de
+Python y solo se verifica la salida.
+
+Uso:
+  python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compilation import Compilation
+import vector_machine
+from vector_machine import VectorMachine
+
+
+def run_batch(source, initial_globals):
+    compilation = Compilation(source=source)
+    compilation.analyze()
+    assert not compilation.semantic_errors, compilation.semantic_errors
+    machine = VectorMachine(compilation)
+    return machine, machine.run(initial_globals)
+
+
+class IntConditionTest(unittest.TestCase):
+    """Las condiciones int se cumplen cuando el valor es distinto de cero, también en los carriles."""
+
+    def check(self, source, initial_globals, expected_outputs):
+        machine, results = run_batch(source, initial_globals)
+        self.assertEqual([result.output for result in results], expected_outputs)
+        for result, values in zip(results, initial_globals):
+            reference = machine.run_lane(machine.initial_values([values])[0])
+            self.assertEqual((result.output, result.error), (reference.output, reference.error))
+        if vector_machine.np is not None:
+            self.assertEqual(machine.vectorized_lanes, len(initial_globals))
+
+    def test_if_with_uniform_int_condition(self):
+        source = ('program p; var k : int; main { k = 2; '
+                  'if (k) { print("then"); } else { print("else"); }; } end')
+        self.check(source, [{'k': '0'}, {'k': '0'}], ["then\n", "then\n"])
+
+    def test_if_with_int_condition_differing_across_lanes(self):
+        source = 'program p; var n, k : int; main { if (n) { k = 5; }; print(k); } end'
+        self.check(source, [{'n': '1'}, {'n': '0'}, {'n': '3'}, {'n': '-2'}], ["5\n", "0\n", "5\n", "5\n"])
+
+    def test_while_with_int_condition(self):
+        source = 'program p; var k : int; main { while (k) do { print("loop", k); k = k - 1; }; } end'
+        # Lanes that loop alike: a loop left running on a single lane hands it to the fallback
+        self.check(source, [{'k': '2'}, {'k': '0'}, {'k': '2'}],
+                   ["loop 2\nloop 1\n", "", "loop 2\nloop 1\n"])
+
+
+if __name__ == '__main__':
+    unittest.main()
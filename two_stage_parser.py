@@ -0,0 +1,71 @@
+# two_stage_parser.py
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorStrategy import BailErrorStrategy
+from antlr4.error.Errors import ParseCancellationException, RecognitionException
+
+
+class ParseStats:
+    """Counts how parses were resolved by parse_program."""
+
+    def __init__(self):
+        self.sll_parses = 0    # Parses completed by the fast SLL stage
+        self.ll_fallbacks = 0  # Parses that had to be redone with full LL
+        self.last_used_fallback = False
+
+    @property
+    def total_parses(self):
+        return self.sll_parses + self.ll_fallbacks
+
+    def __str__(self):
+        return f"Parses: {self.total_parses}, SLL: {self.sll_parses}, LL fallbacks: {self.ll_fallbacks}"
+
+
+# Process-wide counters used when the caller does not supply its own ParseStats
+PARSE_STATS = ParseStats()
+
+
+def parse_program(parser, stats=None):
+    """
+    Parses the 'program' rule with the standard ANTLR two-stage strategy.
+
+    Stage 1 uses SLL prediction with a BailErrorStrategy and no error listeners: it is the fast
+    path and succeeds for every valid input. If it bails out, the token stream is rewound and
+    stage 2 re-parses with full LL prediction, the default error recovery and the parser's own
+    listeners, so invalid input gets exactly the diagnostics a plain LL parse would report.
+    Tokens are only lexed once; the re-parse reuses the buffered token stream.
+    """
+    stats = stats if stats is not None else PARSE_STATS
+    tree = parse_sll(parser, parser.program)
+    if tree is not None:
+        stats.sll_parses += 1
+        stats.last_used_fallback = False
+        return tree
+
+    parser.reset() # Rewinds the token stream and clears the error recovery state
+    stats.ll_fallbacks += 1
+    stats.last_used_fallback = True
+    return parser.program()
+
+
+def parse_sll(parser, rule):
+    """
+    Stage 1 of parse_program alone: parses rule (a bound parser method such as parser.funcs)
+    with SLL prediction and a BailErrorStrategy, reporting nothing. Returns the tree, or None
+    if the input has a syntax error or needs full LL prediction.
+    """
+    interp = parser._interp
+    listeners = parser._listeners
+    error_handler = parser._errHandler
+
+    interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    parser._listeners = []
+    try:
+        return rule()
+    except (ParseCancellationException, RecognitionException):
+        return None
+    finally:
+        # Either way the parser is left as a plain LL parser with its own handler and listeners
+        parser._listeners = listeners
+        parser._errHandler = error_handler
+        interp.predictionMode = PredictionMode.LL
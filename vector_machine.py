@@ -0,0 +1,354 @@
+# vector_machine.py
+import csv
+import io
+
+try:
+    import numpy as np
+except ImportError: # Optional: without NumPy every lane runs on the Python backend
+    np = None
+
+from semantic_cube import Type, Operator
+from symbol_table import LOCAL_LEVEL
+from ast_nodes import StringLiteral
+from python_backend import PythonRuntimeError
+
+# Nested calls run vectorized; lanes that recurse deeper finish on the per-lane fallback
+VECTOR_CALL_DEPTH = 64
+# A while loop still running on at most 1/STRAGGLER_FRACTION of the lanes hands them to the fallback
+STRAGGLER_FRACTION = 32
+# Ints beyond 2**53 are not exact as floats, where Python and NumPy may round differently
+EXACT_FLOAT_INT = 2 ** 53
+# |a * b| at or past this estimate may not fit int64 (the exact product is checked per lane instead)
+INT64_PRODUCT_LIMIT = 2.0 ** 62
+
+DTYPES = {Type.INT: 'int64', Type.FLOAT: 'float64', Type.BOOL: 'bool'}
+
+
+def to_int(value):
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(value)
+    return int(value)
+
+
+def inexact_as_float(values):
+    return (values > EXACT_FLOAT_INT) | (values < -EXACT_FLOAT_INT)
+
+
+CONVERTERS = {Type.INT: to_int, Type.FLOAT: float}
+
+
+class _Unvectorizable(Exception):
+    """The program cannot run vectorized at all, e.g. an int literal beyond int64."""
+
+
+class LaneResult:
+    """What one lane printed, its runtime error message (or None), and whether it ran vectorized."""
+    __slots__ = ('output', 'error', 'vectorized')
+
+    def __init__(self, output, error, vectorized):
+        self.output = output
+        self.error = error
+        self.vectorized = vectorized
+
+
+def read_initial_globals(path):
+    """Rows of a CSV file whose header names globals, as one {name: text} dict per lane."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [{name.strip(): value.strip() for name, value in row.items()} for row in csv.DictReader(f)]
+
+
+class VectorMachine:
+    """
+    Runs one analyzed program over N sets of initial global values at once. Every variable is
+    a NumPy array with one lane per set, and the AST is interpreted under an active-lane mask:
+    an if runs each branch for the lanes its condition selects, a while loop iterates until no
+    lane's condition holds, and a call runs the function body for the calling lanes with fresh
+    zeroed locals. Prints are formatted per lane.
+
+    Lanes whose execution cannot stay exact in int64/float64 leave the vector run and are
+    re-run from the start on the Python backend, which follows the virtual machine's
+    semantics. These are lanes that divide by zero, overflow int64, mix ints beyond 2**53 with
+    floats, call deeper than VECTOR_CALL_DEPTH, or straggle in a loop after most lanes left it
+    (divergent control flow). Without NumPy every lane takes that path.
+    """
+
+    def __init__(self, compilation):
+        self.python_program = compilation.python # Also folds the AST, as for the quadruples
+        self.program = compilation.ast
+        self.symbol_table = compilation.symbol_table
+        self.semantic_cube = compilation.semantic_cube
+        self.functions = {function.name: function for function in self.program.functions}
+        self.vectorized_lanes = 0
+        self.fallback_lanes = 0
+
+    def initial_values(self, initial_globals):
+        """initial_globals converted to each global's type; raises ValueError for unknown names or bad values."""
+        global_vars = self.symbol_table.global_vars
+        lanes = []
+        for index, row in enumerate(initial_globals):
+            values = {}
+            for name, value in row.items():
+                var = global_vars.get(name)
+                if var is None:
+                    raise ValueError(f"Lane {index}: '{name}' is not a global variable")
+                try:
+                    values[name] = CONVERTERS[var.type](value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Lane {index}: {value!r} is not a valid {var.type.value} for '{name}'") from None
+            lanes.append(values)
+        return lanes
+
+    def run(self, initial_globals):
+        """Runs every lane and returns one LaneResult per entry of initial_globals."""
+        lanes = self.initial_values(initial_globals)
+        count = len(lanes)
+        outputs = [[] for _ in range(count)]
+        fallback = [True] * count
+        if np is not None and count:
+            try:
+                fallback = self.run_vectorized(lanes, outputs)
+            except (_Unvectorizable, RecursionError):
+                fallback = [True] * count
+
+        results = []
+        for lane, values in enumerate(lanes):
+            if fallback[lane]:
+                results.append(self.run_lane(values))
+            else:
+                results.append(LaneResult(''.join(outputs[lane]), None, True))
+        self.fallback_lanes = sum(fallback)
+        self.vectorized_lanes = count - self.fallback_lanes
+        return results
+
+    def run_lane(self, values):
+        output = io.StringIO()
+        try:
+            self.python_program.run(output, values)
+        except PythonRuntimeError as e:
+            return LaneResult(output.getvalue(), str(e), False)
+        return LaneResult(output.getvalue(), None, False)
+
+    def stats(self):
+        return f"{self.vectorized_lanes} lanes vectorized, {self.fallback_lanes} on the per-lane fallback"
+
+    # --- Vectorized execution ---
+
+    def run_vectorized(self, lanes, outputs):
+        count = len(lanes)
+        self.count = count
+        self.outputs = outputs
+        self.alive = np.ones(count, dtype=bool)
+        self.mask = None # Active lanes; None means every alive lane
+        self.depth = 0
+        self.globals = []  # Arrays by global slot index
+        for var in self.symbol_table.global_slots:
+            values = [lane.get(var.name, 0) for lane in lanes]
+            if var.type == Type.INT:
+                fits = [-2 ** 63 <= value < 2 ** 63 for value in values]
+                self.alive &= np.array(fits, dtype=bool)
+                values = [value if ok else 0 for value, ok in zip(values, fits)]
+            self.globals.append(np.array(values, dtype=DTYPES[var.type]))
+        self.current_function = self.symbol_table.get_function('main')
+        self.scopes = self.symbol_table.scopes(self.current_function)
+        self.locals = self.zeroed_locals(self.current_function)
+        with np.errstate(all='ignore'):
+            self.execute(self.program.body)
+        return (~self.alive).tolist()
+
+    def zeroed_locals(self, func_entry):
+        """Arrays by local slot index, the params' left as None for the caller to fill in."""
+        return ([None] * func_entry.param_count
+                + [np.zeros(self.count, dtype=DTYPES[var.type]) for var in func_entry.slots[func_entry.param_count:]])
+
+    def execute(self, statements):
+        for statement in statements:
+            statement.accept(self)
+
+    def lanes(self):
+        """Boolean array of the lanes the current statement runs for."""
+        return self.alive if self.mask is None else self.mask & self.alive
+
+    def drop(self, lanes):
+        """Hands lanes (a boolean array) to the per-lane fallback."""
+        self.alive &= ~lanes
+
+    def failing(self, condition):
+        """Drops the active lanes where condition holds."""
+        failed = condition & self.lanes()
+        if failed.any():
+            self.drop(failed)
+
+    def variable(self, node):
+        """The lanes and type of the variable a Var or Assign node names, by its slot."""
+        level, index = node.slot or self.symbol_table.slot_of(node, self.current_function)
+        arrays = self.locals if level == LOCAL_LEVEL else self.globals
+        return arrays[index], self.scopes[level][index].type
+
+    def store(self, node, value):
+        """Writes value into the variable's lanes in place; every variable owns its array."""
+        array, _ = self.variable(node)
+        if self.mask is None:
+            np.copyto(array, value)
+        else:
+            np.copyto(array, value, where=self.mask)
+
+    def with_mask(self, mask, statements):
+        """Runs statements for the alive lanes of mask; returns False if there were none."""
+        active = mask & self.alive
+        active_count = np.count_nonzero(active)
+        if not active_count:
+            return False
+        saved = self.mask
+        self.mask = None if active_count == np.count_nonzero(self.alive) else active
+        self.execute(statements)
+        self.mask = saved
+        return True
+
+    # --- Statements ---
+
+    def visitAssign(self, node):
+        value, _ = node.expr.accept(self)
+        self.store(node, value)
+
+    def condition(self, node):
+        """The condition of an if or while node per lane, as booleans: int conditions hold when nonzero."""
+        condition, condition_type = node.condition.accept(self)
+        if condition_type == Type.INT:
+            condition = np.not_equal(condition, 0)
+        return np.broadcast_to(condition, (self.count,))
+
+    def visitIf(self, node):
+        condition = self.condition(node)
+        lanes = self.lanes()
+        self.with_mask(lanes & condition, node.then_body)
+        if node.else_body is not None:
+            self.with_mask(lanes & ~condition, node.else_body)
+
+    def visitWhile(self, node):
+        saved = self.mask
+        entering = self.lanes()
+        stragglers = max(1, self.count // STRAGGLER_FRACTION)
+        while True:
+            active = entering & self.condition(node) & self.alive
+            active_count = np.count_nonzero(active)
+            if not active_count:
+                break
+            alive_count = np.count_nonzero(self.alive)
+            if active_count < alive_count and active_count <= stragglers:
+                self.drop(active)
+                break
+            entering = active
+            self.mask = None if active_count == alive_count else active
+            self.execute(node.body)
+            self.mask = saved
+        self.mask = saved
+
+    def visitCall(self, node):
+        func_entry = self.symbol_table.get_function(node.name)
+        args = [self.converted(arg, param_type) for arg, param_type in zip(node.args, func_entry.param_types)]
+        if self.depth >= VECTOR_CALL_DEPTH:
+            self.drop(self.lanes())
+            return
+        frame = self.zeroed_locals(func_entry)
+        for index, (value, param_type) in enumerate(zip(args, func_entry.param_types)):
+            frame[index] = np.broadcast_to(np.asarray(value, dtype=DTYPES[param_type]), (self.count,)).copy()
+        saved = self.current_function, self.scopes, self.locals
+        self.current_function, self.scopes, self.locals = func_entry, self.symbol_table.scopes(func_entry), frame
+        self.depth += 1
+        self.execute(self.functions[node.name].body)
+        self.depth -= 1
+        self.current_function, self.scopes, self.locals = saved
+
+    def visitPrint(self, node):
+        indices = np.flatnonzero(self.lanes())
+        if not len(indices):
+            return
+        columns = []
+        for arg in node.args:
+            if isinstance(arg, StringLiteral):
+                columns.append([arg.value] * len(indices))
+            else:
+                value, _ = arg.accept(self)
+                # tolist() gives Python ints, floats and bools, so str() formats as the virtual machine does
+                columns.append([str(item) for item in np.broadcast_to(value, (self.count,))[indices].tolist()])
+        # Lanes dropped while evaluating the arguments get their whole output from the fallback
+        outputs = self.outputs
+        for lane, pieces in zip(indices.tolist(), zip(*columns)):
+            outputs[lane].append(' '.join(pieces) + '\n')
+
+    # --- Expressions ---
+
+    def converted(self, expr, target_type):
+        value, value_type = expr.accept(self)
+        if value_type == Type.INT and target_type == Type.FLOAT:
+            return np.asarray(value, dtype='float64')
+        return value
+
+    def visitBinaryOp(self, node):
+        left, left_type = node.left.accept(self)
+        right, right_type = node.right.accept(self)
+        op = node.op
+        result_type = self.semantic_cube.table[op.code][left_type.code][right_type.code]
+        if left_type == Type.INT and right_type == Type.INT:
+            return self.int_operation(op, left, right), result_type
+        if Type.INT in (left_type, right_type) and Type.FLOAT in (left_type, right_type):
+            # Python compares and converts big ints exactly; keep only lanes where float64 is exact
+            self.failing(inexact_as_float(left if left_type == Type.INT else right))
+        if op == Operator.DIV:
+            return self.divide(left, right), result_type
+        return BINARY_UFUNCS[op](left, right), result_type
+
+    def int_operation(self, op, left, right):
+        if op == Operator.PLUS:
+            result = left + right
+            self.failing(((left ^ result) & (right ^ result)) < 0)
+        elif op == Operator.MINUS:
+            result = left - right
+            self.failing(((left ^ result) & (left ^ right)) < 0)
+        elif op == Operator.MULT:
+            result = left * right
+            self.failing(np.abs(np.multiply(left, right, dtype='float64')) >= INT64_PRODUCT_LIMIT)
+        elif op == Operator.DIV:
+            self.failing(inexact_as_float(left) | inexact_as_float(right))
+            result = self.divide(left, right)
+        else:
+            result = BINARY_UFUNCS[op](left, right)
+        return result
+
+    def divide(self, left, right):
+        zero = right == 0
+        self.failing(zero)
+        return np.true_divide(left, np.where(zero, 1, right))
+
+    def visitUnaryOp(self, node):
+        operand, operand_type = node.operand.accept(self)
+        if node.op == Operator.UNARY_PLUS:
+            return operand, operand_type
+        if operand_type == Type.INT:
+            self.failing(operand == np.iinfo('int64').min)
+        return np.negative(operand), operand_type
+
+    def visitParen(self, node):
+        return node.expr.accept(self)
+
+    def visitVar(self, node):
+        return self.variable(node)
+
+    def visitIntLiteral(self, node):
+        if not -2 ** 63 <= node.value < 2 ** 63:
+            raise _Unvectorizable(node.value)
+        return np.int64(node.value), Type.INT
+
+    def visitFloatLiteral(self, node):
+        return np.float64(node.value), Type.FLOAT
+
+    def visitBoolLiteral(self, node):
+        return np.bool_(node.value), Type.BOOL
+
+
+# NumPy function computing each arithmetic and relational semantic_cube.Operator elementwise
+BINARY_UFUNCS = {} if np is None else {
+    Operator.PLUS: np.add, Operator.MINUS: np.subtract, Operator.MULT: np.multiply,
+    Operator.LESS: np.less, Operator.GREATER: np.greater,
+    Operator.EQUAL: np.equal, Operator.NOT_EQUAL: np.not_equal,
+}
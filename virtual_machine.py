@@ -0,0 +1,291 @@
+# virtual_machine.py
+import sys
+import time
+
+from quadruples import OpCode
+from virtual_memory import (MEMORY_TYPES, TYPE_INDEX, TYPE_RANGE, GLOBAL_SEGMENT, CONST_SEGMENT,
+                            FRAME_FIRST_REGION, FRAME_END_REGION, REGION_COUNT,
+                            region_of, type_of, new_region)
+from semantic_cube import Type
+from profiler import Profile
+
+# Recursion depth at which a runaway LittleDuck program is stopped
+MAX_CALL_DEPTH = 100_000
+
+# Load-time specialization of PRINT for bool operands, which are stored as bytes
+_PRINT_BOOL = len(OpCode)
+
+
+class VMRuntimeError(Exception):
+    def __init__(self, message, quad_index):
+        super().__init__(f"Runtime error at quad {quad_index}: {message}")
+        self.quad_index = quad_index
+
+
+class VirtualMachine:
+    """
+    Executes a CompiledProgram. Memory is a table of regions, one per (segment, type), each holding
+    only values of its type: lists by default, or with compact=True typed arrays (int64, double,
+    byte for bools) that store values unboxed but box them again on every read. Every operand
+    is decoded once at load time into a region number and an offset, and the main loop dispatches
+    through a table holding one handler per opcode:
+
+        while ip >= 0:
+            ip = handlers[ops[ip]](ip)
+
+    Each handler returns the index of the next quad (END returns -1). Calls push an activation
+    record on an explicit call stack, so recursion depth is not limited by Python's own stack.
+    An activation record is the list of the function's local and temp regions, swapped into the
+    frame slots of the region table on GOSUB and ENDFUNC. Storage starts zeroed, so a variable
+    read before its first assignment is 0 (or 0.0).
+    """
+
+    def __init__(self, program, output=None, compact=False):
+        self.program = program
+        self.output = output if output is not None else sys.stdout
+        self.compact = compact
+        quads = program.quads
+        self.ops = [_PRINT_BOOL if op == OpCode.PRINT and type_of(address) == Type.BOOL else op
+                    for op, address in zip(quads.ops, quads.arg1)]
+        self.seg1, self.off1 = self._decode(quads.arg1)
+        self.seg2, self.off2 = self._decode(quads.arg2)
+        self.segr, self.offr = self._decode(quads.result)
+        # PARAM writes into the prepared record, whose regions start at FRAME_FIRST_REGION
+        for i, op in enumerate(self.ops):
+            if op == OpCode.PARAM:
+                self.segr[i] -= FRAME_FIRST_REGION
+        # Jump targets, function indices and PRINT flags are plain integers
+        self.targets = list(quads.result)
+        # Zeroed local and temp regions of each function, with the positions of the non-empty
+        # ones: ERA copies only those, empty regions are never written and can be shared
+        self.frame_templates = [self._frame_template(func) for func in program.functions]
+        self.instructions_executed = 0
+        self.profile = None
+
+    @staticmethod
+    def _decode(addresses):
+        regions = [region_of(address) if address >= 0 else 0 for address in addresses]
+        offsets = [address % TYPE_RANGE if address >= 0 else 0 for address in addresses]
+        return regions, offsets
+
+    def _frame_template(self, func_entry):
+        sizes = ([func_entry.local_type_counts.get(type, 0) for type in MEMORY_TYPES]
+                 + [func_entry.temp_type_counts.get(type, 0) for type in MEMORY_TYPES])
+        regions = [new_region(type, size, compact=self.compact)
+                   for type, size in zip(MEMORY_TYPES + MEMORY_TYPES, sizes)]
+        return regions, [index for index, size in enumerate(sizes) if size]
+
+    @staticmethod
+    def _new_frame(template):
+        regions, used = template
+        frame = regions[:]
+        for index in used:
+            frame[index] = regions[index][:]
+        return frame
+
+    def _new_memory(self):
+        program = self.program
+        mem = [None] * REGION_COUNT
+        for index, type in enumerate(MEMORY_TYPES):
+            mem[region_of(GLOBAL_SEGMENT) + index] = new_region(type, program.global_type_counts.get(type, 0),
+                                                                compact=self.compact)
+            # Each constant type is loaded in one bulk copy
+            mem[region_of(CONST_SEGMENT) + index] = new_region(type, values=program.constants.get(type, ()),
+                                                               compact=self.compact)
+        mem[FRAME_FIRST_REGION:FRAME_END_REGION] = self._new_frame(self.frame_templates[program.main_index])
+        return mem
+
+    def _load_memory(self):
+        """
+        _new_memory, where an int constant too large for compact 64-bit storage is reported as
+        an overflow at the first quad that reads it.
+        """
+        try:
+            return self._new_memory()
+        except OverflowError:
+            pass
+        ints = self.program.constants.get(Type.INT, ())
+        index = next(i for i, value in enumerate(ints) if not -2 ** 63 <= value < 2 ** 63)
+        address = CONST_SEGMENT + TYPE_INDEX[Type.INT] * TYPE_RANGE + index
+        quads = self.program.quads
+        ip = next((i for i, (arg1, arg2) in enumerate(zip(quads.arg1, quads.arg2)) if address in (arg1, arg2)), 0)
+        raise VMRuntimeError("integer overflow", ip)
+
+    def run(self, count_instructions=False, profile=False):
+        """
+        Runs the program from quad 0 until END. With count_instructions the same handlers run
+        in a second loop that also counts every executed quad into instructions_executed; with
+        profile a third loop also times every quad into a profiler.Profile left in self.profile.
+        The default loop carries no counting or timing cost.
+        """
+        functions = self.program.functions
+        frame_templates = self.frame_templates
+        mem = self._load_memory()
+
+        ops = self.ops
+        seg1, off1 = self.seg1, self.off1
+        seg2, off2 = self.seg2, self.off2
+        segr, offr = self.segr, self.offr
+        targets = self.targets
+        write = self.output.write
+        frame_regions = slice(FRAME_FIRST_REGION, FRAME_END_REGION)
+        frame = mem[frame_regions]  # Activation record of the running function
+        call_stack = []
+        pending = []  # Activation records prepared by ERA and not yet entered by GOSUB
+
+        def op_add(ip):
+            mem[segr[ip]][offr[ip]] = mem[seg1[ip]][off1[ip]] + mem[seg2[ip]][off2[ip]]
+            return ip + 1
+
+        def op_sub(ip):
+            mem[segr[ip]][offr[ip]] = mem[seg1[ip]][off1[ip]] - mem[seg2[ip]][off2[ip]]
+            return ip + 1
+
+        def op_mul(ip):
+            mem[segr[ip]][offr[ip]] = mem[seg1[ip]][off1[ip]] * mem[seg2[ip]][off2[ip]]
+            return ip + 1
+
+        def op_div(ip):
+            # int / int is a float, as SemanticCube types it
+            mem[segr[ip]][offr[ip]] = mem[seg1[ip]][off1[ip]] / mem[seg2[ip]][off2[ip]]
+            return ip + 1
+
+        def op_lt(ip):
+            mem[segr[ip]][offr[ip]] = mem[seg1[ip]][off1[ip]] < mem[seg2[ip]][off2[ip]]
+            return ip + 1
+
+        def op_gt(ip):
+            mem[segr[ip]][offr[ip]] = mem[seg1[ip]][off1[ip]] > mem[seg2[ip]][off2[ip]]
+            return ip + 1
+
+        def op_eq(ip):
+            mem[segr[ip]][offr[ip]] = mem[seg1[ip]][off1[ip]] == mem[seg2[ip]][off2[ip]]
+            return ip + 1
+
+        def op_ne(ip):
+            mem[segr[ip]][offr[ip]] = mem[seg1[ip]][off1[ip]] != mem[seg2[ip]][off2[ip]]
+            return ip + 1
+
+        def op_neg(ip):
+            mem[segr[ip]][offr[ip]] = -mem[seg1[ip]][off1[ip]]
+            return ip + 1
+
+        def op_itof(ip):
+            mem[segr[ip]][offr[ip]] = float(mem[seg1[ip]][off1[ip]])
+            return ip + 1
+
+        def op_assign(ip):
+            mem[segr[ip]][offr[ip]] = mem[seg1[ip]][off1[ip]]
+            return ip + 1
+
+        def op_print(ip):
+            write(str(mem[seg1[ip]][off1[ip]]))
+            write('\n' if targets[ip] else ' ')
+            return ip + 1
+
+        def op_print_bool(ip):
+            write('True' if mem[seg1[ip]][off1[ip]] else 'False')
+            write('\n' if targets[ip] else ' ')
+            return ip + 1
+
+        def op_goto(ip):
+            return targets[ip]
+
+        def op_gotof(ip):
+            if mem[seg1[ip]][off1[ip]]:
+                return ip + 1
+            return targets[ip]
+
+        def op_era(ip):
+            regions, used = frame_templates[targets[ip]]
+            record = regions[:]
+            for index in used:
+                record[index] = regions[index][:]
+            pending.append(record)
+            return ip + 1
+
+        def op_param(ip):
+            pending[-1][segr[ip]][offr[ip]] = mem[seg1[ip]][off1[ip]]
+            return ip + 1
+
+        def op_gosub(ip):
+            if len(call_stack) >= MAX_CALL_DEPTH:
+                raise RecursionError(f"call depth exceeded {MAX_CALL_DEPTH}")
+            nonlocal frame
+            call_stack.append((ip + 1, frame))
+            mem[frame_regions] = frame = pending.pop()
+            return functions[targets[ip]].start_quad
+
+        def op_endfunc(ip):
+            nonlocal frame
+            return_ip, frame = call_stack.pop()
+            mem[frame_regions] = frame
+            return return_ip
+
+        def op_end(ip):
+            return -1
+
+        handlers = [None] * (len(OpCode) + 1)
+        handlers[OpCode.ADD] = op_add
+        handlers[OpCode.SUB] = op_sub
+        handlers[OpCode.MUL] = op_mul
+        handlers[OpCode.DIV] = op_div
+        handlers[OpCode.LT] = op_lt
+        handlers[OpCode.GT] = op_gt
+        handlers[OpCode.EQ] = op_eq
+        handlers[OpCode.NE] = op_ne
+        handlers[OpCode.NEG] = op_neg
+        handlers[OpCode.ITOF] = op_itof
+        handlers[OpCode.ASSIGN] = op_assign
+        handlers[OpCode.PRINT] = op_print
+        handlers[OpCode.GOTO] = op_goto
+        handlers[OpCode.GOTOF] = op_gotof
+        handlers[OpCode.ERA] = op_era
+        handlers[OpCode.PARAM] = op_param
+        handlers[OpCode.GOSUB] = op_gosub
+        handlers[OpCode.ENDFUNC] = op_endfunc
+        handlers[OpCode.END] = op_end
+        handlers[_PRINT_BOOL] = op_print_bool
+
+        ip = 0
+        try:
+            if profile:
+                # Each quad is charged the time since the previous one ended, dispatch included;
+                # a GOSUB is also charged, in call_times, the time until its ENDFUNC
+                self.profile = Profile(self.program)
+                counts, times = self.profile.counts, self.profile.times
+                call_times = self.profile.call_times
+                clock = time.perf_counter_ns
+                calls = []  # (GOSUB index, entry time) of every running call
+                last = clock()
+                while ip >= 0:
+                    current = ip
+                    op = ops[ip]
+                    ip = handlers[op](ip)
+                    now = clock()
+                    times[current] += now - last
+                    counts[current] += 1
+                    last = now
+                    if op == OpCode.GOSUB:
+                        calls.append((current, now))
+                    elif op == OpCode.ENDFUNC:
+                        site, entered = calls.pop()
+                        call_times[site] += now - entered
+                self.instructions_executed = self.profile.instructions
+            elif count_instructions:
+                executed = 0
+                while ip >= 0:
+                    executed += 1
+                    ip = handlers[ops[ip]](ip)
+                self.instructions_executed = executed
+            else:
+                while ip >= 0:
+                    ip = handlers[ops[ip]](ip)
+        except ZeroDivisionError:
+            raise VMRuntimeError("division by zero", ip) from None
+        except RecursionError as e:
+            raise VMRuntimeError(str(e), ip) from None
+        except OverflowError:
+            # An int result that does not fit compact 64-bit int storage
+            raise VMRuntimeError("integer overflow", ip) from None
+
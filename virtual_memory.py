@@ -0,0 +1,92 @@
+# virtual_memory.py
+from array import array
+
+from semantic_cube import Type
+
+# Types that get their own address range inside every segment
+MEMORY_TYPES = (Type.INT, Type.FLOAT, Type.BOOL, Type.STRING)
+TYPE_INDEX = {type: index for index, type in enumerate(MEMORY_TYPES)}
+
+# Value a fresh slot of each type holds
+ZERO = {Type.INT: 0, Type.FLOAT: 0.0, Type.BOOL: False, Type.STRING: ''}
+
+# Compact storage of each type: 64-bit ints, doubles, bytes for bools; strings stay in a list
+TYPECODES = {Type.INT: 'q', Type.FLOAT: 'd', Type.BOOL: 'b', Type.STRING: None}
+
+# Addresses a segment can hand out for each type
+TYPE_RANGE = 1_000_000
+SEGMENT_SIZE = TYPE_RANGE * len(MEMORY_TYPES)
+
+GLOBAL_SEGMENT = 1 * SEGMENT_SIZE
+LOCAL_SEGMENT = 2 * SEGMENT_SIZE
+TEMP_SEGMENT = 3 * SEGMENT_SIZE
+CONST_SEGMENT = 4 * SEGMENT_SIZE
+
+# A region is the address range of one type in one segment: address // TYPE_RANGE. Region
+# numbers run from FIRST_REGION (global int) up to REGION_COUNT - 1 (const string); the locals
+# and temps regions of the running function form the contiguous frame range.
+FIRST_REGION = GLOBAL_SEGMENT // TYPE_RANGE
+FRAME_FIRST_REGION = LOCAL_SEGMENT // TYPE_RANGE
+FRAME_END_REGION = CONST_SEGMENT // TYPE_RANGE
+REGION_COUNT = (CONST_SEGMENT + SEGMENT_SIZE) // TYPE_RANGE
+
+SEGMENT_NAMES = {GLOBAL_SEGMENT: 'global', LOCAL_SEGMENT: 'local', TEMP_SEGMENT: 'temp', CONST_SEGMENT: 'const'}
+
+
+def region_of(address):
+    return address // TYPE_RANGE
+
+def type_of(address):
+    return MEMORY_TYPES[region_of(address) % len(MEMORY_TYPES)]
+
+def segment_of(address):
+    return address - address % SEGMENT_SIZE
+
+def new_region(type, size=0, values=None, compact=False):
+    """
+    Storage for size zeroed slots of type, or holding values. A list by default; with compact,
+    a typed array that keeps every value unboxed (8 bytes per int or float, 1 per bool) at the
+    cost of boxing on each read.
+    """
+    typecode = TYPECODES[type] if compact else None
+    if typecode is None:
+        return list(values) if values is not None else [ZERO[type]] * size
+    if values is not None:
+        return array(typecode, values)
+    return array(typecode, bytes(size * array(typecode).itemsize))
+
+
+class AddressAllocator:
+    """Hands out consecutive addresses per type within one segment."""
+
+    def __init__(self, segment):
+        self.segment = segment
+        self.counts = {type: 0 for type in MEMORY_TYPES}
+
+    def allocate(self, type):
+        count = self.counts[type]
+        if count >= TYPE_RANGE:
+            raise OverflowError(f"{SEGMENT_NAMES[self.segment]} segment is out of {type.value} addresses")
+        self.counts[type] = count + 1
+        return self.segment + TYPE_INDEX[type] * TYPE_RANGE + count
+
+    def reset(self):
+        for type in MEMORY_TYPES:
+            self.counts[type] = 0
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+# Example usage:
+if __name__ == '__main__':
+    allocator = AddressAllocator(GLOBAL_SEGMENT)
+    a = allocator.allocate(Type.INT)
+    b = allocator.allocate(Type.FLOAT)
+    c = allocator.allocate(Type.INT)
+    for address in (a, b, c):
+        print(f"{address}: {SEGMENT_NAMES[segment_of(address)]} {type_of(address).value}, region {region_of(address)}")
+
+    ints = new_region(Type.INT, allocator.counts[Type.INT], compact=True)
+    print(f"compact int storage: {ints!r}, {ints.itemsize * len(ints)} bytes")